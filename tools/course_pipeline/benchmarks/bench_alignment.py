@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for timestamp-overlap subtitle alignment.
+
+Builds a synthetic English track and a Chinese track derived from it. Some lines are
+split in two, some are merged with the next line, some are dropped, and some extra cues
+are added; every timing is jittered. Reports cues/sec for the overlap sweep, and how many
+English lines get the right Chinese text, compared with pairing by index.
+
+    python3 tools/course_pipeline/benchmarks/bench_alignment.py --cues 50000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import course_pipeline_ops as ops  # noqa: E402
+
+
+def synthetic_tracks(count: int, rng: random.Random) -> tuple[list[dict], list[dict], list[str]]:
+    """Return (en cues, zh cues, expected zh text per en cue)."""
+    en: list[dict] = []
+    at = 0
+    for i in range(count):
+        length = rng.randint(1200, 4000)
+        en.append({"start_ms": at, "end_ms": at + length, "text": f"line {i}"})
+        at += length + rng.randint(100, 800)
+
+    def jitter(ms: int) -> int:
+        return max(0, ms + rng.randint(-150, 150))
+
+    zh: list[dict] = []
+    expected = [""] * count
+    i = 0
+    while i < count:
+        e = en[i]
+        roll = rng.random()
+        if roll < 0.05:
+            i += 1
+            continue
+        if roll < 0.15:
+            middle = (e["start_ms"] + e["end_ms"]) // 2
+            zh.append({"start_ms": jitter(e["start_ms"]), "end_ms": middle, "text": f"前{i}"})
+            zh.append({"start_ms": middle, "end_ms": jitter(e["end_ms"]), "text": f"后{i}"})
+            expected[i] = f"前{i} 后{i}"
+            i += 1
+            continue
+        if roll < 0.25 and i + 1 < count:
+            text = f"合{i}"
+            zh.append({"start_ms": jitter(e["start_ms"]), "end_ms": jitter(en[i + 1]["end_ms"]), "text": text})
+            expected[i] = expected[i + 1] = text
+            i += 2
+            continue
+        zh.append({"start_ms": jitter(e["start_ms"]), "end_ms": jitter(e["end_ms"]), "text": f"译{i}"})
+        expected[i] = f"译{i}"
+        if roll > 0.97:
+            # A stray cue in the gap after this line, e.g. a sound effect caption.
+            gap_start = e["end_ms"] + 20
+            zh.append({"start_ms": gap_start, "end_ms": gap_start + 60, "text": "（音乐）"})
+        i += 1
+    return en, zh, expected
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cues", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    en, zh, expected = synthetic_tracks(args.cues, random.Random(7))
+
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        alignment = ops.build_alignment_map(en, zh)
+        timings.append(time.perf_counter() - started)
+    seconds = sorted(timings)[len(timings) // 2]
+
+    paired = [text for text, _ in ops.zh_for_en_cues(alignment)]
+    by_index = [zh[i]["text"] if i < len(zh) else "" for i in range(len(en))]
+    result = {
+        "en_cues": len(en),
+        "zh_cues": len(zh),
+        "seconds": round(seconds, 4),
+        "cues_per_sec": round((len(en) + len(zh)) / seconds),
+        "groups": alignment["stats"],
+        "correct": {
+            "overlap": round(sum(a == b for a, b in zip(paired, expected)) / len(en), 4),
+            "by_index": round(sum(a == b for a, b in zip(by_index, expected)) / len(en), 4),
+        },
+    }
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
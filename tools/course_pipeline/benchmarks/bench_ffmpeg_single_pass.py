@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Compare the single-pass and two-pass ffmpeg lesson paths.
+
+Generates a synthetic mp4 with lavfi test sources, normalizes it with both modes and
+reports wall-clock and child CPU seconds per lesson.
+
+    python3 tools/course_pipeline/benchmarks/bench_ffmpeg_single_pass.py --duration 120 --repeat 3
+"""
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import course_pipeline_ops as ops  # noqa: E402
+
+
+def make_source(raw: Path, duration: int) -> None:
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-f",
+        "lavfi",
+        "-i",
+        f"testsrc2=size=1280x720:rate=30:duration={duration}",
+        "-f",
+        "lavfi",
+        "-i",
+        f"sine=frequency=440:sample_rate=48000:duration={duration}",
+        "-c:v",
+        "mpeg4",
+        "-q:v",
+        "5",
+        "-c:a",
+        "aac",
+        "-shortest",
+        str(raw / "01_bench.mp4"),
+    ]
+    subprocess.run(cmd, check=True, capture_output=True)
+
+
+def child_cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_mode(raw: Path, work: Path, single_pass: bool, repeat: int) -> dict:
+    walls, cpus = [], []
+    for idx in range(repeat):
+        out_root = work / f"{'single' if single_pass else 'two'}_{idx}"
+        cpu_before = child_cpu_seconds()
+        started = time.perf_counter()
+        ops.process_ffmpeg_lesson(raw, out_root, "01", single_pass=single_pass)
+        walls.append(time.perf_counter() - started)
+        cpus.append(child_cpu_seconds() - cpu_before)
+    return {"wall_s": statistics.median(walls), "cpu_s": statistics.median(cpus), "runs": repeat}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=int, default=60, help="Synthetic lesson length in seconds.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as td:
+        raw = Path(td) / "raw"
+        raw.mkdir()
+        make_source(raw, args.duration)
+        two_pass = run_mode(raw, Path(td), single_pass=False, repeat=args.repeat)
+        single_pass = run_mode(raw, Path(td), single_pass=True, repeat=args.repeat)
+
+    result = {
+        "media_seconds": args.duration,
+        "two_pass": two_pass,
+        "single_pass": single_pass,
+        "wall_saving_s": round(two_pass["wall_s"] - single_pass["wall_s"], 3),
+        "cpu_saving_s": round(two_pass["cpu_s"] - single_pass["cpu_s"], 3),
+    }
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Throughput benchmark for the grammar/usage/summary rule engine.
+
+Generates a seeded English corpus, classifies it lesson by lesson with the compiled rule
+engine and with the keyword scans it replaced, checks that both give the same output and
+reports sentences/sec.
+
+    python3 tools/course_pipeline/benchmarks/bench_inference_rules.py --sentences 1000000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import course_pipeline_ops as ops  # noqa: E402
+
+COMMON_WORDS = (
+    "the a an and of to in on at for with my your our their his her its is are be been can could would "
+    "should do does make take give find know see look come tell ask work play live feel try leave call "
+    "need want like love help start show hear day time year people way man woman child world school "
+    "family student question answer house room door window street car bus city friend teacher class "
+    "good new first last long great little old big small right next early young now then here there "
+    "today yesterday always never often sometimes again still just only also even back up out down after"
+).split()
+# Words that fire rules, plus some that contain a keyword by accident (shave, this, life).
+RULE_WORDS = (
+    "i you we they he she it this that hello hi welcome station train town woods walk have has had "
+    "was were did went got will going because when if which very really quite so shave whistle life"
+).split()
+RULE_WORD_SHARE = 0.2
+ENDINGS = [".", ".", ".", "?", "!", ""]
+
+
+def legacy_infer_grammar(en: str) -> dict:
+    """infer_grammar as it was before the rule engine, kept as the regression baseline."""
+    text = (en or "").strip()
+    low = text.lower()
+    points: list[str] = []
+
+    if "?" in text:
+        pattern = "疑问句结构"
+        points.append("使用直接提问句式。")
+    elif "!" in text:
+        pattern = "感叹句结构"
+        points.append("表达强调或强烈情绪。")
+    elif any(k in low for k in ["have ", "has ", "had "]):
+        pattern = "完成时表达"
+        points.append("用完成时连接过去与现在。")
+    elif any(k in low for k in [" was ", " were ", " did ", " went ", "got "]):
+        pattern = "一般过去时"
+        points.append("描述已经完成的过去事件。")
+    elif any(k in low for k in [" will ", "going to "]):
+        pattern = "将来表达"
+        points.append("描述将来的计划或预测。")
+    else:
+        pattern = "陈述句结构"
+        points.append("使用常见主谓结构表达信息。")
+
+    if any(k in low for k in ["because", "when", "if", "that", "which"]):
+        points.append("包含从句连接词，补充细节信息。")
+    if any(k in low for k in ["very", "really", "quite", "so "]):
+        points.append("包含程度副词用于加强语气。")
+
+    difficulty = "A2" if len(text.split()) > 10 else "A1"
+    return {"pattern": pattern, "points": points[:3], "difficulty": difficulty}
+
+
+def legacy_infer_usage(en: str, zh: str) -> dict:
+    """infer_usage as it was before the rule engine."""
+    low = (en or "").lower()
+    if any(k in low for k in ["hello", "welcome", "hi"]):
+        scene = "greeting"
+        tone = "friendly"
+    elif any(k in low for k in ["train", "station", "walk", "woods", "town"]):
+        scene = "daily_life_narration"
+        tone = "neutral"
+    elif "?" in (en or ""):
+        scene = "questioning"
+        tone = "curious"
+    else:
+        scene = "daily_conversation"
+        tone = "neutral"
+    return {
+        "scene": scene,
+        "tone": tone,
+        "formality": "informal",
+        "alternatives": [zh] if zh else [],
+        "caution": "",
+    }
+
+
+def legacy_generate_summary_and_highlights(sentences: list[dict]) -> tuple[str, list[str]]:
+    """generate_summary_and_highlights as it was before the rule engine."""
+    zh_texts = [str(s.get("zh", "")).strip() for s in sentences if str(s.get("zh", "")).strip()]
+    en_texts = [str(s.get("en", "")).strip() for s in sentences if str(s.get("en", "")).strip()]
+
+    preview = "；".join(zh_texts[:3]) if zh_texts else "；".join(en_texts[:2])
+    if not preview:
+        preview = "本课涵盖基础日常表达。"
+    summary = f"本课重点围绕日常表达与叙事句型，核心内容包括：{preview}。"
+
+    highlights: list[str] = []
+    all_en = " ".join(en_texts).lower()
+    if any(k in all_en for k in [" was ", " were ", " did ", "went ", "got "]):
+        highlights.append("一般过去时叙事表达")
+    if any(k in all_en for k in ["because", "which", "that", "when", "if"]):
+        highlights.append("从句连接词与句子扩展")
+    if any(k in all_en for k in ["?", "!"]):
+        highlights.append("疑问/感叹语气表达")
+    if not highlights:
+        highlights.append("基础陈述句与高频词汇表达")
+    return summary, highlights[:3]
+
+
+def synthetic_corpus(count: int, rng: random.Random) -> list[str]:
+    corpus = []
+    for _ in range(count):
+        words = [rng.choice(RULE_WORDS if rng.random() < RULE_WORD_SHARE else COMMON_WORDS) for _ in range(rng.randint(2, 16))]
+        corpus.append(" ".join(words).capitalize() + rng.choice(ENDINGS))
+    return corpus
+
+
+def legacy_classify(sentences: list[dict]) -> list[dict]:
+    return [{"grammar": legacy_infer_grammar(s["en"]), "usage": legacy_infer_usage(s["en"], s["zh"])} for s in sentences]
+
+
+def run(corpus: list[str], lesson_size: int, classify, summarize) -> tuple[float, list]:
+    outputs = []
+    started = time.perf_counter()
+    for at in range(0, len(corpus), lesson_size):
+        lesson = [{"en": en, "zh": ""} for en in corpus[at : at + lesson_size]]
+        outputs.append((classify(lesson), summarize(lesson)))
+    return time.perf_counter() - started, outputs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sentences", type=int, default=1000000)
+    parser.add_argument("--lesson-size", type=int, default=200, help="Sentences per lesson.")
+    args = parser.parse_args()
+    corpus = synthetic_corpus(args.sentences, random.Random(7))
+
+    engine_s, engine_out = run(corpus, args.lesson_size, ops.classify_sentences, ops.generate_summary_and_highlights)
+    legacy_s, legacy_out = run(corpus, args.lesson_size, legacy_classify, legacy_generate_summary_and_highlights)
+    result = {
+        "sentences": len(corpus),
+        "lesson_size": args.lesson_size,
+        "rule_engine": {"seconds": round(engine_s, 3), "sentences_per_sec": round(len(corpus) / engine_s)},
+        "legacy": {"seconds": round(legacy_s, 3), "sentences_per_sec": round(len(corpus) / legacy_s)},
+        "identical_output": engine_out == legacy_out,
+    }
+    print(json.dumps(result, indent=2))
+    return 0 if result["identical_output"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
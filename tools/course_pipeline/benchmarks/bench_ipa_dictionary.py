@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for the offline IPA dictionary index.
+
+Builds an index from a CMUdict file (or a synthetic word list), then reports open time,
+RSS after load and lookups/sec for hits and misses.
+
+    python3 tools/course_pipeline/benchmarks/bench_ipa_dictionary.py --source cmudict.dict
+    python3 tools/course_pipeline/benchmarks/bench_ipa_dictionary.py --synthetic 135000
+"""
+import argparse
+import json
+import random
+import resource
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import course_pipeline_ops as ops  # noqa: E402
+
+
+def current_rss_kb() -> int:
+    status = Path("/proc/self/status")
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    # ru_maxrss is KiB on Linux and bytes on macOS; only a peak, but better than nothing.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def write_synthetic_source(path: Path, count: int, rng: random.Random) -> None:
+    phones = ["AH0", "B", "K", "D", "EH1", "F", "IY1", "L", "M", "N", "OW1", "P", "S", "T", "UW1"]
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))))
+    with path.open("w", encoding="utf-8") as f:
+        for word in sorted(words):
+            f.write(f"{word.upper()}  {' '.join(rng.choices(phones, k=rng.randint(2, 7)))}\n")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", help="CMUdict-style file to index.")
+    parser.add_argument("--synthetic", type=int, default=135000, help="Synthetic word count when --source is absent.")
+    parser.add_argument("--lookups", type=int, default=200000)
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    with tempfile.TemporaryDirectory() as td:
+        source = Path(args.source) if args.source else Path(td) / "synthetic.dict"
+        if not args.source:
+            write_synthetic_source(source, args.synthetic, rng)
+        index = Path(td) / "ipa_dict.bin"
+
+        started = time.perf_counter()
+        words = ops.build_ipa_dictionary(source, index)
+        build_s = time.perf_counter() - started
+
+        rss_before = current_rss_kb()
+        started = time.perf_counter()
+        dictionary = ops.IpaDictionary(index)
+        open_ms = (time.perf_counter() - started) * 1000
+        rss_after = current_rss_kb()
+
+        hits = [ops.parse_pronunciation_line(line) for line in source.read_text(encoding="utf-8", errors="replace").splitlines()]
+        hits = [h[0] for h in hits if h]
+        queries = [rng.choice(hits) for _ in range(args.lookups // 2)]
+        queries += ["zz" + rng.choice(hits) for _ in range(args.lookups // 2)]
+        rng.shuffle(queries)
+
+        started = time.perf_counter()
+        found = sum(1 for q in queries if dictionary.lookup(q) is not None)
+        lookup_s = time.perf_counter() - started
+        dictionary.close()
+
+        result = {
+            "words": words,
+            "index_bytes": index.stat().st_size,
+            "build_s": round(build_s, 3),
+            "open_ms": round(open_ms, 3),
+            "rss_kb_before_open": rss_before,
+            "rss_kb_after_open": rss_after,
+            "lookups": len(queries),
+            "found": found,
+            "lookups_per_sec": round(len(queries) / lookup_s),
+        }
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""Run every pipeline step on a synthetic course and report per-step throughput.
+
+Translation and IPA lookups go to local stand-in servers, so runs are offline and
+reproducible. Results are written as JSON; pass an earlier result as --baseline to
+compare two commits.
+
+    python3 tools/course_pipeline/benchmarks/bench_pipeline.py --lessons 8 --media-seconds 120 --sentences 60 \
+        --output /tmp/bench_$(git rev-parse --short HEAD).json
+    python3 tools/course_pipeline/benchmarks/bench_pipeline.py --baseline /tmp/bench_abc1234.json --max-regression 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from shutil import which
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import course_pipeline_ops as ops  # noqa: E402
+from stub_servers import StubDictionaryServer, StubTranslateServer  # noqa: E402
+from synthetic_course import generate_course  # noqa: E402
+
+RESULT_FORMAT = 1
+# Compared between runs; the others are reported for context.
+THROUGHPUT_FIELDS = ["lessons_per_min", "sentences_per_sec", "media_seconds_per_wall_second"]
+
+
+@contextmanager
+def scoped_env(values: dict[str, str]):
+    saved = {name: os.environ.get(name) for name in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def git_revision() -> str | None:
+    try:
+        proc = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=Path(__file__).resolve().parent, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return proc.stdout.strip()
+
+
+def ffmpeg_version() -> str | None:
+    if which("ffmpeg") is None:
+        return None
+    proc = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True)
+    return proc.stdout.splitlines()[0] if proc.stdout else None
+
+
+def environment_info() -> dict:
+    return {
+        "git_revision": git_revision(),
+        "code_version": ops.pipeline_code_version()[:12],
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "ffmpeg": ffmpeg_version(),
+    }
+
+
+def create_task(runtime_dir: Path, raw: Path, skip_ffmpeg: bool) -> str:
+    lesson_keys, err = ops.scan_raw_lessons(raw)
+    if err:
+        raise RuntimeError(err)
+    task_id = f"task_{uuid.uuid4().hex[:8]}"
+    steps = {s: "pending" for s in ops.STEP_ORDER}
+    if skip_ffmpeg:
+        steps["ffmpeg"] = "done"
+    ops.save_task(
+        runtime_dir,
+        {
+            "task_id": task_id,
+            "course_id": ops.normalize_course_id(raw),
+            "course_path": str(raw),
+            "status": "processing",
+            "current_step": "asr" if skip_ffmpeg else "ffmpeg",
+            "steps": steps,
+            "lesson_keys": lesson_keys,
+            "error": None,
+            "created_at": ops.now_iso(),
+            "updated_at": ops.now_iso(),
+        },
+    )
+    return task_id
+
+
+def step_throughput(metrics: dict, lessons: int, sentences: int, media_seconds: float) -> dict:
+    wall_s = max(metrics["wall_ms"], 0.001) / 1000
+    return {
+        "wall_s": round(wall_s, 3),
+        "cpu_s": round(metrics["cpu_ms"] / 1000, 3),
+        "child_cpu_s": round(metrics["child_cpu_ms"] / 1000, 3),
+        "process_peak_rss_kb": metrics["process_high_water"]["rss_kb"],
+        "bytes_in": metrics["bytes_in"],
+        "bytes_out": metrics["bytes_out"],
+        "network_requests": metrics["network"]["requests"],
+        "lessons_per_min": round(lessons * 60 / wall_s, 2),
+        "sentences_per_sec": round(sentences / wall_s, 2),
+        "media_seconds_per_wall_second": round(media_seconds / wall_s, 2),
+    }
+
+
+def run_pipeline_once(raw: Path, course: dict, jobs: int | None, env: dict[str, str]) -> dict:
+    """Run every step once in a fresh project, so caches, TM and the task store start cold."""
+    ops.IPA_CACHE.clear()
+    lessons = course["lessons"]
+    sentences = lessons * course["sentences"]
+    media_seconds = lessons * course["media_seconds"] if course["media"] else 0.0
+    with tempfile.TemporaryDirectory() as td, scoped_env(env):
+        runtime_dir = ops.project_runtime_dir(Path(td))
+        task_id = create_task(runtime_dir, raw, skip_ffmpeg=not course["media"])
+        steps = {}
+        started = time.perf_counter()
+        for step in ops.STEP_ORDER:
+            if step == "ffmpeg" and not course["media"]:
+                continue
+            code, payload = ops._run_single_step(runtime_dir, task_id, step, jobs=jobs)
+            if code != 0:
+                raise RuntimeError(f"{step}: {payload['error']['message']}")
+            output = json.loads(Path(payload["output_file"]).read_text(encoding="utf-8"))
+            steps[step] = step_throughput(output["metrics"], lessons, sentences, media_seconds)
+        total_s = time.perf_counter() - started
+        ops.flush_event_logs()
+    steps["total"] = {
+        "wall_s": round(total_s, 3),
+        "lessons_per_min": round(lessons * 60 / total_s, 2),
+        "sentences_per_sec": round(sentences / total_s, 2),
+        "media_seconds_per_wall_second": round(media_seconds / total_s, 2),
+    }
+    return steps
+
+
+def median_runs(runs: list[dict]) -> dict:
+    """Per step, the run with the median wall time (kept whole so its fields stay consistent)."""
+    merged = {}
+    for step in runs[0]:
+        ordered = sorted((run[step] for run in runs), key=lambda r: r["wall_s"])
+        merged[step] = {**ordered[(len(ordered) - 1) // 2], "wall_s_all": [run[step]["wall_s"] for run in runs]}
+    return merged
+
+
+def run_benchmark(
+    course: dict,
+    jobs: int | None = None,
+    repeat: int = 1,
+    translate_latency: float = 0.0,
+    ipa_latency: float = 0.0,
+) -> dict:
+    with tempfile.TemporaryDirectory() as td:
+        raw = Path(td) / "raw"
+        generate_course(raw, **course)
+        with StubTranslateServer(latency=translate_latency) as translate_stub, StubDictionaryServer(
+            latency=ipa_latency
+        ) as ipa_stub:
+            env = {
+                "COURSE_PIPELINE_TASK_STORE": "sqlite",
+                "COURSE_PIPELINE_TRANSLATE_PROVIDER": "google_gtx",
+                "COURSE_PIPELINE_TRANSLATE_ENDPOINT": translate_stub.endpoint,
+                "COURSE_PIPELINE_IPA_ENDPOINT": ipa_stub.endpoint,
+                "COURSE_PIPELINE_IPA_OFFLINE": "0",
+            }
+            runs = [run_pipeline_once(raw, course, jobs, env) for _ in range(max(1, repeat))]
+            stubs = {"translate_requests": translate_stub.requests, "ipa_requests": ipa_stub.requests}
+    return {
+        "format": RESULT_FORMAT,
+        "benchmark": "pipeline",
+        "generated_at": ops.now_iso(),
+        "environment": environment_info(),
+        "course": course,
+        "settings": {"jobs": ops.resolve_jobs(jobs), "repeat": len(runs), "translate_latency_s": translate_latency, "ipa_latency_s": ipa_latency},
+        "steps": median_runs(runs),
+        "stubs": stubs,
+    }
+
+
+def compare_results(current: dict, baseline: dict, max_regression: float | None = None) -> dict:
+    """Throughput ratio current/baseline per step and field; > 1 means faster."""
+    steps = {}
+    regressions = []
+    for step, row in current["steps"].items():
+        base = baseline.get("steps", {}).get(step)
+        if not base:
+            continue
+        ratios = {}
+        for field in THROUGHPUT_FIELDS:
+            if base.get(field):
+                ratios[field] = round(row[field] / base[field], 3)
+        steps[step] = ratios
+        if max_regression is not None and ratios.get("sentences_per_sec", 1.0) < 1 - max_regression:
+            regressions.append(step)
+    return {
+        "baseline_revision": baseline.get("environment", {}).get("git_revision"),
+        "comparable": baseline.get("course") == current["course"] and baseline.get("settings", {}).get("jobs") == current["settings"]["jobs"],
+        "steps": steps,
+        "regressions": regressions,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lessons", type=int, default=4)
+    parser.add_argument("--media-seconds", type=float, default=60, help="Length of each lesson's media.")
+    parser.add_argument("--sentences", type=int, default=40, help="Sentences per lesson.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-media", action="store_true", help="Skip ffmpeg: generate placeholders and time the other steps only.")
+    parser.add_argument("--with-zh", action="store_true", help="Provide Chinese subtitles instead of machine-translating.")
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=1, help="Fresh runs per step; the median run is reported.")
+    parser.add_argument("--translate-latency", type=float, default=0.0, help="Simulated translation round trip in seconds.")
+    parser.add_argument("--ipa-latency", type=float, default=0.0, help="Simulated dictionary round trip in seconds.")
+    parser.add_argument("--output", help="Write the result JSON here as well as to stdout.")
+    parser.add_argument("--baseline", help="Earlier result JSON to compare throughput against.")
+    parser.add_argument("--max-regression", type=float, default=None, help="Exit 1 if any step's sentences/sec drops by more than this fraction.")
+    args = parser.parse_args()
+
+    course = {
+        "lessons": args.lessons,
+        "media_seconds": args.media_seconds,
+        "sentences": args.sentences,
+        "seed": args.seed,
+        "media": not args.no_media,
+        "with_zh": args.with_zh,
+    }
+    if course["media"] and which("ffmpeg") is None:
+        print(json.dumps({"ok": False, "error": {"code": "FFMPEG_NOT_FOUND", "message": "install ffmpeg or pass --no-media"}}))
+        return 2
+    result = run_benchmark(
+        course,
+        jobs=args.jobs,
+        repeat=args.repeat,
+        translate_latency=args.translate_latency,
+        ipa_latency=args.ipa_latency,
+    )
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        result["comparison"] = compare_results(result, baseline, args.max_regression)
+    text = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    print(text)
+    if result.get("comparison", {}).get("regressions"):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for SRT parsing and writing.
+
+Writes a synthetic SRT file, then reports cues/sec and peak traced memory for the
+streaming reader/writer against the previous whole-file implementation.
+
+    python3 tools/course_pipeline/benchmarks/bench_subtitle_io.py --cues 100000
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import course_pipeline_ops as ops  # noqa: E402
+
+WORDS = ["we", "will", "meet", "at", "the", "station", "tomorrow", "morning", "please", "bring", "your", "ticket"]
+
+
+def legacy_parse_srt(path: Path) -> list[dict]:
+    """parse_srt as it was before the streaming reader, kept for comparison."""
+    if not path.exists():
+        return []
+    content = path.read_text(encoding="utf-8").strip()
+    if not content:
+        return []
+    blocks = re.split(r"\n\s*\n", content)
+    items: list[dict] = []
+    ts_pattern = re.compile(
+        r"(?P<s_h>\d{2}):(?P<s_m>\d{2}):(?P<s_s>\d{2}),(?P<s_ms>\d{3})\s+-->\s+"
+        r"(?P<e_h>\d{2}):(?P<e_m>\d{2}):(?P<e_s>\d{2}),(?P<e_ms>\d{3})"
+    )
+    for b in blocks:
+        lines = [l for l in b.splitlines() if l.strip()]
+        if len(lines) < 2:
+            continue
+        ts_line = lines[1] if lines[0].isdigit() else lines[0]
+        m = ts_pattern.search(ts_line)
+        if not m:
+            continue
+        text_lines = lines[2:] if lines[0].isdigit() else lines[1:]
+        text = " ".join(text_lines).strip()
+        start_ms = int(m.group("s_h")) * 3600000 + int(m.group("s_m")) * 60000 + int(m.group("s_s")) * 1000 + int(m.group("s_ms"))
+        end_ms = int(m.group("e_h")) * 3600000 + int(m.group("e_m")) * 60000 + int(m.group("e_s")) * 1000 + int(m.group("e_ms"))
+        items.append({"start_ms": start_ms, "end_ms": end_ms, "text": text})
+    return items
+
+
+def legacy_write_srt(path: Path, entries: list[dict]) -> None:
+    """write_srt as it was before the streaming writer, kept for comparison."""
+    def format_ms(ms: int) -> str:
+        return f"{ms // 3600000:02}:{(ms % 3600000) // 60000:02}:{(ms % 60000) // 1000:02},{ms % 1000:03}"
+
+    lines: list[str] = []
+    for idx, e in enumerate(entries, start=1):
+        lines.append(str(idx))
+        lines.append(f"{format_ms(e['start_ms'])} --> {format_ms(e['end_ms'])}")
+        lines.append(e["text"])
+        lines.append("")
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+
+def synthetic_cues(count: int, rng: random.Random) -> list[dict]:
+    cues = []
+    at = 0
+    for _ in range(count):
+        length = rng.randint(800, 4000)
+        cues.append({"start_ms": at, "end_ms": at + length, "text": " ".join(rng.choices(WORDS, k=rng.randint(3, 12)))})
+        at += length + rng.randint(0, 600)
+    return cues
+
+
+def measure(fn) -> dict:
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"cues": count, "seconds": round(elapsed, 3), "cues_per_sec": round(count / elapsed), "peak_kb": peak // 1024}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cues", type=int, default=100000)
+    args = parser.parse_args()
+    cues = synthetic_cues(args.cues, random.Random(7))
+
+    with tempfile.TemporaryDirectory() as td:
+        source = Path(td) / "input.srt"
+        ops.write_srt(source, cues)
+        result = {
+            "cues": args.cues,
+            "file_bytes": source.stat().st_size,
+            "parse": {
+                "legacy": measure(lambda: len(legacy_parse_srt(source))),
+                "parse_srt": measure(lambda: len(ops.parse_srt(source))),
+                # Consumed one cue at a time, the way package converts SRT to WebVTT.
+                "iter_srt": measure(lambda: sum(1 for _ in ops.iter_srt(source))),
+            },
+            "write": {
+                "legacy": measure(lambda: legacy_write_srt(Path(td) / "legacy.srt", cues) or len(cues)),
+                "write_srt": measure(lambda: ops.write_srt(Path(td) / "stream.srt", cues)),
+                "write_vtt": measure(lambda: ops.write_vtt(Path(td) / "stream.vtt", ops.iter_srt(source))),
+            },
+        }
+        result["write"]["identical_output"] = (Path(td) / "legacy.srt").read_bytes() == (Path(td) / "stream.srt").read_bytes()
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
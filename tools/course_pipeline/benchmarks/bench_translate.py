@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Compare per-sentence and batched machine translation against a local stand-in server.
+
+    python3 tools/course_pipeline/benchmarks/bench_translate.py --sentences 600 --latency 0.08
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import course_pipeline_ops as ops  # noqa: E402
+from stub_servers import StubTranslateServer  # noqa: E402
+
+
+def run(endpoint: str, texts: list[str], concurrency: int, max_items: int) -> dict:
+    provider = ops.GoogleGtxProvider(endpoint=endpoint)
+    started = time.perf_counter()
+    try:
+        result = ops.translate_batch_en_to_zh(texts, provider, concurrency=concurrency, max_items=max_items)
+    finally:
+        provider.close()
+    wall = time.perf_counter() - started
+    return {
+        "wall_s": round(wall, 3),
+        "sentences_per_sec": round(len(texts) / wall, 1),
+        "translated": sum(1 for r in result if r),
+        **provider.stats(),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sentences", type=int, default=600)
+    parser.add_argument("--latency", type=float, default=0.08, help="Simulated server round trip in seconds.")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    texts = [f"This is sentence number {i} of the synthetic lesson." for i in range(args.sentences)]
+    with StubTranslateServer(latency=args.latency) as stub:
+        serial = run(stub.endpoint, texts, concurrency=1, max_items=1)
+        batched = run(stub.endpoint, texts, concurrency=args.concurrency, max_items=50)
+    print(json.dumps({"sentences": args.sentences, "latency_s": args.latency, "serial": serial, "batched": batched}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
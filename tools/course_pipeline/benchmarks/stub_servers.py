@@ -0,0 +1,138 @@
+"""Local stand-ins for the online services the pipeline talks to.
+
+Used by tests and benchmarks so translation runs are reproducible and offline.
+"""
+import abc
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+
+def fake_translate(text: str) -> str:
+    return f"译:{text}"
+
+
+class _BackloggedHTTPServer(ThreadingHTTPServer):
+    # The default backlog of 5 drops SYNs under concurrent clients and adds 1 s retransmit stalls.
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class _StubServer(abc.ABC):
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.server = _BackloggedHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Send headers and body in one segment; otherwise Nagle + delayed ACK add ~40 ms per keep-alive reply.
+            disable_nagle_algorithm = True
+            wbufsize = 64 * 1024
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests += 1
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    if stub.latency:
+                        time.sleep(stub.latency)
+                    status, body = stub.respond(urlsplit(self.path))
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    @abc.abstractmethod
+    def respond(self, url) -> tuple[int, object]:
+        """(HTTP status, JSON body) for a GET of url."""
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class StubTranslateServer(_StubServer):
+    """Speaks the translate_a/single (client=gtx) reply format; every line becomes "译:<line>"."""
+
+    def __init__(self, latency: float = 0.0, keep_newlines: bool = True):
+        super().__init__(latency)
+        self.keep_newlines = keep_newlines
+        self.endpoint = f"{self.base_url}/translate_a/single"
+
+    def respond(self, url) -> tuple[int, object]:
+        text = parse_qs(url.query).get("q", [""])[0]
+        lines = text.split("\n")
+        rows = []
+        for idx, line in enumerate(lines):
+            tail = "\n" if idx < len(lines) - 1 and self.keep_newlines else (" " if idx < len(lines) - 1 else "")
+            rows.append([fake_translate(line) + tail, line, None, None, 1])
+        return 200, [rows, None, "en"]
+
+
+def fake_ipa(word: str) -> str:
+    return f"/{word.lower()}/"
+
+
+class StubDictionaryServer(_StubServer):
+    """Speaks the dictionaryapi.dev entries format and records each word asked for.
+
+    With entries, only those words are known, with the given IPA; otherwise every word is
+    known unless listed in unknown.
+    """
+
+    def __init__(self, latency: float = 0.0, unknown: set[str] | None = None, entries: dict[str, str] | None = None):
+        super().__init__(latency)
+        self.unknown = {w.lower() for w in unknown or ()}
+        self.entries = entries
+        self.words: list[str] = []
+        self.endpoint = f"{self.base_url}/api/v2/entries/en/"
+
+    def respond(self, url) -> tuple[int, object]:
+        word = unquote(url.path.rsplit("/", 1)[-1])
+        with self._lock:
+            self.words.append(word)
+        if self.entries is not None:
+            ipa = self.entries.get(word)
+        else:
+            ipa = None if word.lower() in self.unknown else fake_ipa(word)
+        if ipa is None:
+            return 404, {"title": "No Definitions Found"}
+        return 200, [{"word": word, "phonetic": ipa}]
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Generate a synthetic raw course folder for benchmarks.
+
+Each lesson gets an NN_lesson.mp4 built from lavfi test sources and an NN.en.srt of
+seeded, reproducible sentences spread evenly over the media length.
+
+    python3 tools/course_pipeline/benchmarks/synthetic_course.py /tmp/raw --lessons 8 --media-seconds 120 --sentences 60
+"""
+import argparse
+import json
+import random
+import subprocess
+import sys
+from pathlib import Path
+from shutil import which
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import course_pipeline_ops as ops  # noqa: E402
+
+SUBJECTS = ["I", "We", "They", "She", "He", "My friend", "The teacher", "Our neighbour", "The driver", "Everyone"]
+OPENERS = ["Hello", "Hi", "Welcome back", "Well", "So", "Look", "Okay", "Now"]
+VERBS = ["walk to", "look at", "talk about", "wait for", "think about", "ask about", "travel to", "clean", "open", "visit"]
+PAST_VERBS = ["went to", "looked at", "talked about", "waited for", "asked about", "visited", "cleaned", "opened", "got to"]
+OBJECTS = [
+    "the station",
+    "the old train",
+    "the small town",
+    "the woods",
+    "a quiet cafe",
+    "the market",
+    "the library",
+    "the river",
+    "a new bookshop",
+    "the city museum",
+    "the bus stop",
+    "the morning news",
+]
+TAILS = [
+    "because it was raining",
+    "when the sun came out",
+    "if we have time",
+    "which was really busy",
+    "that everyone likes",
+    "before dinner",
+    "after work",
+    "with a few friends",
+    "very early",
+    "quite slowly",
+]
+
+
+def synthetic_sentence(rng: random.Random) -> str:
+    """One sentence mixing the tenses, clauses and scenes the grammar/usage rules look for."""
+    subject, obj = rng.choice(SUBJECTS), rng.choice(OBJECTS)
+    tail = f" {rng.choice(TAILS)}" if rng.random() < 0.5 else ""
+    shape = rng.randrange(6)
+    if shape == 0:
+        return f"Do you want to {rng.choice(VERBS)} {obj}{tail}?"
+    if shape == 1:
+        return f"{rng.choice(OPENERS)}, {subject.lower() if subject != 'I' else subject} {rng.choice(PAST_VERBS)} {obj}{tail}."
+    if shape == 2:
+        return f"{subject} will {rng.choice(VERBS)} {obj}{tail}."
+    if shape == 3:
+        return f"{subject} {'have' if subject in {'I', 'We', 'They'} else 'has'} been to {obj}{tail}."
+    if shape == 4:
+        return f"What a day at {obj}!"
+    return f"{subject} {rng.choice(PAST_VERBS)} {obj}{tail}."
+
+
+def lesson_cues(rng: random.Random, sentences: int, media_seconds: float) -> list[dict]:
+    slot_ms = int(media_seconds * 1000 / max(1, sentences))
+    return [
+        {"start_ms": idx * slot_ms, "end_ms": idx * slot_ms + max(1, slot_ms - 100), "text": synthetic_sentence(rng)}
+        for idx in range(sentences)
+    ]
+
+
+def make_lesson_media(path: Path, media_seconds: float, size: str = "640x360") -> None:
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-f",
+        "lavfi",
+        "-i",
+        f"testsrc2=size={size}:rate=25:duration={media_seconds}",
+        "-f",
+        "lavfi",
+        "-i",
+        f"sine=frequency=440:sample_rate=48000:duration={media_seconds}",
+        "-c:v",
+        "mpeg4",
+        "-q:v",
+        "5",
+        "-c:a",
+        "aac",
+        "-shortest",
+        str(path),
+    ]
+    subprocess.run(cmd, check=True, capture_output=True)
+
+
+def generate_course(
+    raw: Path,
+    lessons: int,
+    media_seconds: float,
+    sentences: int,
+    seed: int = 0,
+    media: bool = True,
+    with_zh: bool = False,
+) -> dict:
+    """Write a raw course folder and return a description of what was generated.
+
+    Without media, lessons get empty .mp4 placeholders: enough for the naming rules and every
+    step after ffmpeg, which then has nothing to process. Chinese subtitles are left out by
+    default so translate goes through the (stand-in) translation service.
+    """
+    if media and which("ffmpeg") is None:
+        raise RuntimeError("FFMPEG_NOT_FOUND")
+    raw.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    for idx in range(1, lessons + 1):
+        key = f"{idx:02d}"
+        media_file = raw / f"{key}_lesson.mp4"
+        if media:
+            make_lesson_media(media_file, media_seconds)
+        else:
+            media_file.write_bytes(b"")
+        cues = lesson_cues(rng, sentences, media_seconds)
+        ops.write_srt(raw / f"{key}.en.srt", cues)
+        if with_zh:
+            ops.write_srt(raw / f"{key}.zh.srt", [{**cue, "text": f"中文:{cue['text']}"} for cue in cues])
+    return {
+        "lessons": lessons,
+        "media_seconds": media_seconds,
+        "sentences_per_lesson": sentences,
+        "seed": seed,
+        "media": media,
+        "with_zh": with_zh,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("folder")
+    parser.add_argument("--lessons", type=int, default=4)
+    parser.add_argument("--media-seconds", type=float, default=60)
+    parser.add_argument("--sentences", type=int, default=40, help="Sentences per lesson.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-media", action="store_true", help="Write empty media placeholders instead of calling ffmpeg.")
+    parser.add_argument("--with-zh", action="store_true", help="Also write NN.zh.srt so translate needs no service.")
+    args = parser.parse_args()
+
+    spec = generate_course(
+        Path(args.folder).expanduser().resolve(),
+        args.lessons,
+        args.media_seconds,
+        args.sentences,
+        seed=args.seed,
+        media=not args.no_media,
+        with_zh=args.with_zh,
+    )
+    print(json.dumps({"folder": str(Path(args.folder).expanduser().resolve()), **spec}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,16 +1,34 @@
 #!/usr/bin/env python3
+import abc
 import argparse
+import atexit
+import hashlib
+import http.client
 import json
+import mmap
+import multiprocessing
 import os
 import re
+import shutil
+import signal
+import socket
+import sqlite3
+import struct
 import subprocess
 import sys
+import threading
 import time
 import uuid
+import wave
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
 from datetime import datetime, timezone
 from pathlib import Path
 from shutil import which
-from urllib.parse import quote
+from typing import Iterable
+from urllib.error import HTTPError
+from urllib.parse import quote, urlencode, urlsplit
 from urllib.request import Request, urlopen
 
 STATUSES = {"uploaded", "processing", "paused", "ready", "failed", "stopped"}
@@ -21,6 +39,7 @@ TERMINAL_STATUSES = {"ready", "failed", "stopped"}
 MEDIA_PATTERN = re.compile(r"^(\d{2})_.*\.(mp4|mp3)$", re.IGNORECASE)
 WORD_PATTERN = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)?")
 IPA_CACHE: dict[str, str | None] = {}
+IOS_H264_PROFILES = {"High", "Main", "Constrained Baseline", "Baseline"}
 
 
 def now_iso() -> str:
@@ -43,9 +62,205 @@ def task_file(runtime_dir: Path, task_id: str) -> Path:
 
 
 def events_file(runtime_dir: Path) -> Path:
+    """The active event segment. Sealed segments live in events/ next to a small index."""
     return runtime_dir / "events.log"
 
 
+def events_segments_dir(runtime_dir: Path) -> Path:
+    return runtime_dir / "events"
+
+
+def event_segment_max_bytes() -> int:
+    return int(os.getenv("COURSE_PIPELINE_EVENT_SEGMENT_BYTES", str(16 * 1024 * 1024)))
+
+
+def event_segment_max_seconds() -> float:
+    return float(os.getenv("COURSE_PIPELINE_EVENT_SEGMENT_HOURS", "24")) * 3600
+
+
+def event_retention_segments() -> int:
+    return int(os.getenv("COURSE_PIPELINE_EVENT_KEEP_SEGMENTS", "30"))
+
+
+def event_flush_seconds() -> float:
+    return float(os.getenv("COURSE_PIPELINE_EVENT_FLUSH_SECONDS", "0.2"))
+
+
+EVENT_BUFFER_MAX = 256
+
+
+def build_event_index(segment: Path) -> dict:
+    index = {"segment": segment.name, "count": 0, "first_ts": None, "last_ts": None, "tasks": {}}
+    for record in _iter_event_lines(segment):
+        ts, task_id = record.get("ts", ""), record.get("task_id", "-")
+        index["count"] += 1
+        index["first_ts"] = index["first_ts"] or ts
+        index["last_ts"] = index["last_ts"] or ts
+        entry = index["tasks"].setdefault(task_id, {"count": 0, "first_ts": ts, "last_ts": ts})
+        entry["count"] += 1
+        # Buffered writers in different processes can interleave slightly out of order.
+        entry["first_ts"], entry["last_ts"] = min(entry["first_ts"], ts), max(entry["last_ts"], ts)
+        index["first_ts"], index["last_ts"] = min(index["first_ts"], ts), max(index["last_ts"], ts)
+    return index
+
+
+def _iter_event_lines(segment: Path, offset: int = 0):
+    try:
+        with segment.open("rb") as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # a writer is mid-append; the line is picked up on the next read
+                try:
+                    yield json.loads(raw)
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        return
+
+
+def _first_event_ts(segment: Path) -> float | None:
+    try:
+        with segment.open("rb") as f:
+            return _parse_iso(json.loads(f.readline()).get("ts"))
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class EventLog:
+    """Buffered, size/time-segmented writer for one runtime dir.
+
+    Records are batched in memory and written together by a background flusher, so a burst
+    of events costs one open/lock/write. Segment rotation and retention run under an
+    exclusive lock on events/.lock, which makes concurrent writer processes safe.
+    """
+
+    def __init__(self, runtime_dir: Path):
+        self.runtime_dir = runtime_dir
+        self._buffer: list[bytes] = []
+        self._cond = threading.Condition()
+        self._flusher: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def append(self, record: dict) -> None:
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._cond:
+            self._buffer.append(line)
+            if len(self._buffer) >= EVENT_BUFFER_MAX or event_flush_seconds() <= 0:
+                self._flush_locked()
+                return
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, args=(self._stop,), name="event-log", daemon=True)
+                self._flusher.start()
+            self._cond.notify()
+
+    def flush(self) -> None:
+        with self._cond:
+            self._flush_locked()
+
+    def close(self) -> None:
+        """Write out buffered records and stop the flusher; a later append starts a new one."""
+        with self._cond:
+            flusher, stop = self._flusher, self._stop
+            self._flusher, self._stop = None, threading.Event()
+            stop.set()
+            self._cond.notify_all()
+            self._flush_locked()
+        if flusher is not None:
+            flusher.join()
+
+    def _flush_loop(self, stop: threading.Event) -> None:
+        while True:
+            with self._cond:
+                while not self._buffer and not stop.is_set():
+                    self._cond.wait()
+            if stop.wait(event_flush_seconds()):
+                return
+            self.flush()
+
+    def _flush_locked(self) -> None:
+        if not self._buffer:
+            return
+        data = b"".join(self._buffer)
+        self._buffer.clear()
+        try:
+            with _events_dir_lock(self.runtime_dir):
+                rotate_event_segment(self.runtime_dir)
+                with events_file(self.runtime_dir).open("ab") as f:
+                    f.write(data)
+        except FileNotFoundError:
+            pass  # the runtime dir was deleted under us; nothing left to log into
+
+
+@contextmanager
+def _events_dir_lock(runtime_dir: Path):
+    with _file_lock(events_segments_dir(runtime_dir) / ".lock"):
+        yield
+
+
+def sealed_event_segments(runtime_dir: Path) -> list[Path]:
+    return sorted(events_segments_dir(runtime_dir).glob("events-*.log"))
+
+
+def rotate_event_segment(runtime_dir: Path, force: bool = False) -> Path | None:
+    """Seal events.log when it is too big or too old, index it and apply retention. Caller holds the dir lock."""
+    active = events_file(runtime_dir)
+    try:
+        size = active.stat().st_size
+    except FileNotFoundError:
+        return None
+    first_ts = _first_event_ts(active)
+    too_old = first_ts is not None and time.time() - first_ts >= event_segment_max_seconds()
+    if size == 0 or not (force or too_old or size >= event_segment_max_bytes()):
+        return None
+    sealed = sealed_event_segments(runtime_dir)
+    seq = _segment_seq(sealed[-1]) + 1 if sealed else 1
+    segment = events_segments_dir(runtime_dir) / f"events-{seq:06d}.log"
+    os.replace(active, segment)
+    write_json_atomic(segment.with_suffix(".idx.json"), build_event_index(segment))
+    for old in sealed_event_segments(runtime_dir)[: -event_retention_segments() or None]:
+        old.unlink(missing_ok=True)
+        old.with_suffix(".idx.json").unlink(missing_ok=True)
+    return segment
+
+
+def _load_event_index(segment: Path) -> dict:
+    try:
+        return json.loads(segment.with_suffix(".idx.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        index = build_event_index(segment)
+        write_json_atomic(segment.with_suffix(".idx.json"), index)
+        return index
+
+
+_EVENT_LOGS: dict[str, EventLog] = {}
+_EVENT_LOGS_GUARD = threading.Lock()
+
+
+def event_log(runtime_dir: Path) -> EventLog:
+    key = f"{os.getpid()}:{runtime_dir}"
+    with _EVENT_LOGS_GUARD:
+        log = _EVENT_LOGS.get(key)
+        if log is None:
+            log = _EVENT_LOGS[key] = EventLog(runtime_dir)
+        return log
+
+
+def flush_event_logs() -> None:
+    for key, log in list(_EVENT_LOGS.items()):
+        if key.startswith(f"{os.getpid()}:"):
+            log.flush()
+
+
+def close_event_logs() -> None:
+    for key, log in list(_EVENT_LOGS.items()):
+        if key.startswith(f"{os.getpid()}:"):
+            log.close()
+
+
+atexit.register(flush_event_logs)
+
+
 def append_event(runtime_dir: Path, task_id: str, event: str, payload: dict) -> None:
     record = {
         "ts": now_iso(),
@@ -53,25 +268,433 @@ def append_event(runtime_dir: Path, task_id: str, event: str, payload: dict) ->
         "event": event,
         "payload": payload,
     }
-    with events_file(runtime_dir).open("a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    event_log(runtime_dir).append(record)
+
+
+def read_events(runtime_dir: Path, task_id: str | None = None, since: str | None = None) -> list[dict]:
+    """Events for one task (or all), oldest first. Sealed segments are skipped by their index."""
+    event_log(runtime_dir).flush()
+    records = []
+    for segment in sealed_event_segments(runtime_dir):
+        index = _load_event_index(segment)
+        if since and (index.get("last_ts") or "") < since:
+            continue
+        if task_id is not None:
+            entry = index.get("tasks", {}).get(task_id)
+            if entry is None or (since and entry["last_ts"] < since):
+                continue
+        records.extend(_filter_events(_iter_event_lines(segment), task_id, since))
+    records.extend(_filter_events(_iter_event_lines(events_file(runtime_dir)), task_id, since))
+    return records
+
+
+def _filter_events(records: Iterable[dict], task_id: str | None, since: str | None) -> Iterable[dict]:
+    for record in records:
+        if task_id is not None and record.get("task_id") != task_id:
+            continue
+        if since and record.get("ts", "") < since:
+            continue
+        yield record
+
+
+def _segment_seq(segment: Path) -> int:
+    return int(segment.stem.split("-")[1])
+
+
+def follow_events(
+    runtime_dir: Path,
+    poll: float = 0.2,
+    stop: threading.Event | None = None,
+    ready: threading.Event | None = None,
+):
+    """Yield events appended to the log from now on, across segment rotations.
+
+    ready is set once the starting position is fixed; nothing logged after that is missed.
+    """
+    active = events_file(runtime_dir)
+    stop = stop or threading.Event()
+
+    def stat_active():
+        try:
+            return active.stat()
+        except FileNotFoundError:
+            return None
+
+    with _events_dir_lock(runtime_dir):
+        sealed = sealed_event_segments(runtime_dir)
+        last_seq = _segment_seq(sealed[-1]) if sealed else 0
+        st = stat_active()
+    inode, offset = (st.st_ino, st.st_size) if st else (None, 0)
+    if ready is not None:
+        ready.set()
+    while not stop.is_set():
+        st = stat_active()
+        if (st.st_ino if st else None) != inode:
+            # Rotated (possibly several times): drain sealed segments we have not read, in order.
+            with _events_dir_lock(runtime_dir):
+                backlog = [seg for seg in sealed_event_segments(runtime_dir) if _segment_seq(seg) > last_seq]
+                st = stat_active()
+            for seg in backlog:
+                yield from _iter_event_lines(seg, offset if _inode(seg) == inode else 0)
+                last_seq = _segment_seq(seg)
+            inode, offset = (st.st_ino if st else None), 0
+        if st is not None and st.st_size > offset:
+            try:
+                with active.open("rb") as f:
+                    if os.fstat(f.fileno()).st_ino != inode:
+                        continue  # rotated between stat and open; handled on the next pass
+                    f.seek(offset)
+                    chunk = f.read(st.st_size - offset)
+            except FileNotFoundError:
+                continue
+            complete = chunk[: chunk.rfind(b"\n") + 1]
+            offset += len(complete)
+            for raw in complete.splitlines():
+                try:
+                    yield json.loads(raw)
+                except ValueError:
+                    continue
+            continue
+        stop.wait(poll)
+
+
+def _inode(path: Path) -> int | None:
+    try:
+        return path.stat().st_ino
+    except FileNotFoundError:
+        return None
+
+
+def parse_since(value: str | None) -> str | None:
+    """Accept an ISO timestamp or a relative age like 30s, 15m, 2h, 7d."""
+    if not value:
+        return None
+    m = re.fullmatch(r"(\d+)([smhd])", value.strip())
+    if m:
+        seconds = int(m.group(1)) * {"s": 1, "m": 60, "h": 3600, "d": 86400}[m.group(2)]
+        return datetime.fromtimestamp(time.time() - seconds, timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+    epoch = _parse_iso(value)
+    if epoch is None:
+        raise ValueError(value)
+    return datetime.fromtimestamp(epoch, timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+class TaskConflictError(RuntimeError):
+    """Raised when a task was saved by someone else since it was loaded."""
+
+    def __init__(self, task_id: str, expected: int, current: int):
+        super().__init__(f"TASK_CONFLICT:{task_id}:expected version {expected}, found {current}")
+        self.task_id = task_id
+        self.expected = expected
+        self.current = current
+
+
+class _HeldLock:
+    def __init__(self) -> None:
+        self.guard = threading.RLock()
+        self.depth = 0
+        self.fd: int | None = None
+
+
+_FILE_LOCKS: dict[str, _HeldLock] = {}
+_FILE_LOCKS_GUARD = threading.Lock()
+_TASK_STORE_GUARD = threading.RLock()
+
+
+def shared_fs_enabled() -> bool:
+    """COURSE_PIPELINE_SHARED_FS=1: the runtime dir is on a network filesystem used by several hosts."""
+    return os.getenv("COURSE_PIPELINE_SHARED_FS", "0").strip().lower() in {"1", "true", "on", "yes"}
+
+
+def sqlite_journal_mode() -> str:
+    # WAL needs a -shm file mapped by every connection on one host, so it breaks on network filesystems.
+    return "DELETE" if shared_fs_enabled() else "WAL"
+
+
+def _lock_fd(fd: int, lock: bool) -> None:
+    try:
+        import fcntl
+    except ImportError:
+        return
+    if shared_fs_enabled():
+        # POSIX record locks go through the NFS lock manager; flock is not reliable there.
+        fcntl.lockf(fd, fcntl.LOCK_EX if lock else fcntl.LOCK_UN)
+    else:
+        fcntl.flock(fd, fcntl.LOCK_EX if lock else fcntl.LOCK_UN)
+
+
+@contextmanager
+def _file_lock(path: Path):
+    """Hold an exclusive lock on path. Re-entrant within a thread; exclusive across threads and processes.
+
+    A POSIX lock belongs to the whole process, so threads take turns on the in-process guard and
+    the file is opened once per hold.
+    """
+    with _FILE_LOCKS_GUARD:
+        held = _FILE_LOCKS.setdefault(str(path), _HeldLock())
+    with held.guard:
+        if held.depth == 0:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                _lock_fd(fd, True)
+            except BaseException:
+                os.close(fd)
+                raise
+            held.fd = fd
+        held.depth += 1
+        try:
+            yield
+        finally:
+            held.depth -= 1
+            if held.depth == 0 and held.fd is not None:
+                _lock_fd(held.fd, False)
+                os.close(held.fd)
+                held.fd = None
+
+
+@contextmanager
+def task_lock(runtime_dir: Path, task_id: str):
+    """Hold the per-task advisory lock. Re-entrant within a thread; exclusive across processes."""
+    with _file_lock(runtime_dir / "locks" / f"{task_id}.lock"):
+        yield
+
+
+def write_json_atomic(path: Path, payload: dict, durable: bool = False) -> None:
+    """Replace path in one rename; durable also fsyncs the file and its directory."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with tmp.open("w", encoding="utf-8") as f:
+            f.write(json.dumps(payload, ensure_ascii=False, indent=2))
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    if durable:
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
 
 
 def load_task(runtime_dir: Path, task_id: str) -> dict:
+    if task_store_backend() == "json":
+        return _load_task_json(runtime_dir, task_id)
+    conn = open_task_store(runtime_dir)
+    with _TASK_STORE_GUARD:
+        row = conn.execute("SELECT body FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+    if row is not None:
+        return json.loads(row[0])
+    # A task JSON written by an older pipeline build after the migration ran.
+    task = _load_task_json(runtime_dir, task_id)
+    with _TASK_STORE_GUARD:
+        _task_store_upsert(conn, task)
+    return task
+
+
+def save_task(runtime_dir: Path, task: dict) -> None:
+    """Write task if nobody saved it since it was loaded (compare-and-swap on task["version"])."""
+    task_id = task["task_id"]
+    expected = int(task.get("version", 0))
+    with task_lock(runtime_dir, task_id):
+        saved = dict(task, version=expected + 1, updated_at=now_iso())
+        if task_store_backend() == "json":
+            current = _task_json_version(runtime_dir, task_id)
+            if current is not None and current != expected:
+                raise TaskConflictError(task_id, expected, current)
+            _save_task_json(runtime_dir, saved)
+        else:
+            conn = open_task_store(runtime_dir)
+            with _TASK_STORE_GUARD:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    row = conn.execute("SELECT version FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+                    if row is not None and int(row[0]) != expected:
+                        raise TaskConflictError(task_id, expected, int(row[0]))
+                    _task_store_upsert(conn, saved)
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            if task_json_mirror_enabled():
+                _save_task_json(runtime_dir, saved)
+    task.update(version=saved["version"], updated_at=saved["updated_at"])
+
+
+def update_task(runtime_dir: Path, task_id: str, mutate) -> dict:
+    """Load, mutate and save a task under its lock, so concurrent updates are never lost."""
+    with task_lock(runtime_dir, task_id):
+        task = load_task(runtime_dir, task_id)
+        mutate(task)
+        save_task(runtime_dir, task)
+    return task
+
+
+def delete_task(runtime_dir: Path, task_id: str) -> bool:
+    with task_lock(runtime_dir, task_id):
+        removed = False
+        p = task_file(runtime_dir, task_id)
+        if p.exists():
+            # Always drop the JSON copy, or load_task would re-import the deleted task.
+            p.unlink(missing_ok=True)
+            removed = True
+        if task_store_backend() != "json":
+            conn = open_task_store(runtime_dir)
+            with _TASK_STORE_GUARD:
+                cur = conn.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+            removed = removed or cur.rowcount > 0
+    (runtime_dir / "locks" / f"{task_id}.lock").unlink(missing_ok=True)
+    return removed
+
+
+def list_tasks(runtime_dir: Path, status: str | None = None, course_id: str | None = None) -> list[dict]:
+    if task_store_backend() == "json":
+        tasks = [json.loads(p.read_text(encoding="utf-8")) for p in sorted(runtime_dir.glob("task_*.json"))]
+        return [
+            t for t in tasks
+            if (status is None or t.get("status") == status) and (course_id is None or t.get("course_id") == course_id)
+        ]
+    clauses, params = [], []
+    if status is not None:
+        clauses.append("status = ?")
+        params.append(status)
+    if course_id is not None:
+        clauses.append("course_id = ?")
+        params.append(course_id)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    conn = open_task_store(runtime_dir)
+    with _TASK_STORE_GUARD:
+        rows = conn.execute(f"SELECT body FROM tasks{where} ORDER BY task_id", params).fetchall()
+    return [json.loads(body) for (body,) in rows]
+
+
+def _load_task_json(runtime_dir: Path, task_id: str) -> dict:
     p = task_file(runtime_dir, task_id)
     if not p.exists():
         raise FileNotFoundError("TASK_NOT_FOUND")
     return json.loads(p.read_text(encoding="utf-8"))
 
 
-def save_task(runtime_dir: Path, task: dict) -> None:
-    task["updated_at"] = now_iso()
-    task_file(runtime_dir, task["task_id"]).write_text(
-        json.dumps(task, ensure_ascii=False, indent=2),
-        encoding="utf-8",
+def _save_task_json(runtime_dir: Path, task: dict) -> None:
+    write_json_atomic(task_file(runtime_dir, task["task_id"]), task, durable=True)
+
+
+def _task_json_version(runtime_dir: Path, task_id: str) -> int | None:
+    try:
+        return int(_load_task_json(runtime_dir, task_id).get("version", 0))
+    except FileNotFoundError:
+        return None
+
+
+def task_store_backend() -> str:
+    backend = os.getenv("COURSE_PIPELINE_TASK_STORE", "sqlite").strip().lower()
+    return "json" if backend == "json" else "sqlite"
+
+
+def task_json_mirror_enabled() -> bool:
+    # The Flutter loader still scans task_*.json, so the mirror stays on by default.
+    return os.getenv("COURSE_PIPELINE_TASK_JSON_MIRROR", "1").strip().lower() not in {"0", "false", "off", "no"}
+
+
+def task_store_path(runtime_dir: Path) -> Path:
+    return runtime_dir / "tasks.sqlite3"
+
+
+_TASK_STORES: dict[str, sqlite3.Connection] = {}
+
+
+def open_task_store(runtime_dir: Path) -> sqlite3.Connection:
+    """Open (once per process) the task store, importing task JSON files when it is first created."""
+    db_path = task_store_path(runtime_dir)
+    # Keyed by pid: a forked child must not reuse its parent's SQLite connection.
+    key = f"{os.getpid()}:{db_path}"
+    with _TASK_STORE_GUARD:
+        conn = _TASK_STORES.get(key)
+        if conn is not None and db_path.exists():
+            return conn
+        created = not db_path.exists()
+        runtime_dir.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(db_path), timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute(f"PRAGMA journal_mode={sqlite_journal_mode()}")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "task_id TEXT PRIMARY KEY, course_id TEXT, status TEXT, created_at TEXT, updated_at TEXT, "
+            "version INTEGER NOT NULL DEFAULT 0, body TEXT NOT NULL)"
+        )
+        if "version" not in {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}:
+            conn.execute("ALTER TABLE tasks ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        conn.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status)")
+        conn.execute("CREATE INDEX IF NOT EXISTS tasks_course_id ON tasks (course_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS tasks_updated_at ON tasks (updated_at)")
+        _TASK_STORES[key] = conn
+        if created:
+            migrate_task_json(runtime_dir, conn)
+        return conn
+
+
+def _task_store_upsert(conn: sqlite3.Connection, task: dict) -> None:
+    conn.execute(
+        "INSERT OR REPLACE INTO tasks (task_id, course_id, status, created_at, updated_at, version, body) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            task["task_id"],
+            task.get("course_id"),
+            task.get("status"),
+            task.get("created_at"),
+            task.get("updated_at"),
+            int(task.get("version", 0)),
+            json.dumps(task, ensure_ascii=False),
+        ),
     )
 
 
+def migrate_task_json(runtime_dir: Path, conn: sqlite3.Connection | None = None) -> dict:
+    """Import task_*.json into the store. A file only replaces a row it is newer than."""
+    conn = conn or open_task_store(runtime_dir)
+    imported, skipped, invalid = [], [], []
+    with _TASK_STORE_GUARD:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for p in sorted(runtime_dir.glob("task_*.json")):
+                try:
+                    task = json.loads(p.read_text(encoding="utf-8"))
+                    task_id = task["task_id"]
+                except (OSError, ValueError, KeyError, TypeError):
+                    invalid.append(p.name)
+                    continue
+                row = conn.execute("SELECT updated_at FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+                if row is not None and (row[0] or "") >= (task.get("updated_at") or ""):
+                    skipped.append(task_id)
+                    continue
+                _task_store_upsert(conn, task)
+                imported.append(task_id)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    return {"imported": imported, "skipped": skipped, "invalid": invalid}
+
+
+def export_task_json(runtime_dir: Path) -> list[str]:
+    """Write a task_*.json mirror for every task in the store."""
+    conn = open_task_store(runtime_dir)
+    with _TASK_STORE_GUARD:
+        rows = conn.execute("SELECT body FROM tasks ORDER BY task_id").fetchall()
+    exported = []
+    for (body,) in rows:
+        task = json.loads(body)
+        with task_lock(runtime_dir, task["task_id"]):
+            _save_task_json(runtime_dir, task)
+        exported.append(task["task_id"])
+    return exported
+
+
 def normalize_course_id(raw_folder: Path) -> str:
     stem = raw_folder.name.lower().strip().replace(" ", "_")
     stem = "".join(c for c in stem if c.isalnum() or c in {"_", "-"})
@@ -90,62 +713,101 @@ def find_media_for_key(raw_folder: Path, key: str) -> Path | None:
     return None
 
 
-def ffprobe_duration_ms(media_file: Path) -> int:
-    cmd = [
-        "ffprobe",
-        "-v",
-        "error",
-        "-show_entries",
-        "format=duration",
-        "-of",
-        "default=noprint_wrappers=1:nokey=1",
-        str(media_file),
-    ]
-    result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-    seconds = float(result.stdout.strip() or "0")
-    return int(seconds * 1000)
+MEDIA_PROBE_FILE = "media_probe.json"
 
 
-def extract_embedded_subtitle_to_srt(media_file: Path, out_srt: Path) -> tuple[bool, str]:
-    """Try extracting embedded subtitle stream from media into SRT.
+def media_probe(media_file: Path, cache_file: Path | None = None) -> dict:
+    """Parsed `ffprobe -show_format -show_streams` of media_file.
 
-    Returns (ok, source_tag).
+    With cache_file (one per lesson, inside the task's artifacts), the result is reused for as
+    long as the file keeps its path, size and mtime. Raises CalledProcessError/ValueError on failure.
     """
-    probe_cmd = [
-        "ffprobe",
-        "-v",
-        "error",
-        "-select_streams",
-        "s",
-        "-show_entries",
-        "stream=index:stream_tags=language",
-        "-of",
-        "json",
-        str(media_file),
+    st = media_file.stat()
+    stamp = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    cached: dict = {}
+    if cache_file is not None:
+        try:
+            cached = json.loads(cache_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            cached = {}
+        entry = cached.get(str(media_file))
+        if isinstance(entry, dict) and entry.get("stamp") == stamp:
+            return entry["probe"]
+
+    cmd = ["ffprobe", "-v", "error", "-show_format", "-show_streams", "-of", "json", str(media_file)]
+    result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+    probe = json.loads(result.stdout or "{}")
+    if cache_file is not None:
+        # One entry per path: a rewritten file replaces its stale probe.
+        cached[str(media_file)] = {"stamp": stamp, "probe": probe}
+        write_json_atomic(cache_file, cached)
+    return probe
+
+
+def probe_duration_ms(probe: dict) -> int:
+    return int(float((probe.get("format") or {}).get("duration") or 0) * 1000)
+
+
+def probe_codecs(probe: dict) -> dict[str, list[str]]:
+    codecs: dict[str, list[str]] = {}
+    for stream in probe.get("streams", []):
+        codecs.setdefault(stream.get("codec_type", "unknown"), []).append(stream.get("codec_name", "unknown"))
+    return codecs
+
+
+def probe_subtitle_streams(probe: dict) -> list[dict]:
+    return [
+        {
+            "index": s.get("index"),
+            "codec": s.get("codec_name"),
+            "language": str((s.get("tags") or {}).get("language") or "").lower(),
+        }
+        for s in probe.get("streams", [])
+        if s.get("codec_type") == "subtitle"
     ]
-    probe = subprocess.run(probe_cmd, check=False, capture_output=True, text=True)
-    if probe.returncode != 0:
-        return False, "embedded_probe_failed"
 
+
+def stream_copy_compatible(probe: dict) -> bool:
+    """True when the source already is iOS-friendly H.264 High/Main/Baseline <= 4.1, yuv420p with AAC audio."""
+    streams = probe.get("streams", [])
+    video = [
+        s
+        for s in streams
+        if s.get("codec_type") == "video" and not (s.get("disposition") or {}).get("attached_pic")
+    ]
+    audio = [s for s in streams if s.get("codec_type") == "audio"]
+    if not video or not audio:
+        return False
+    for v in video:
+        level = v.get("level")
+        if v.get("codec_name") != "h264" or v.get("profile") not in IOS_H264_PROFILES:
+            return False
+        if not isinstance(level, int) or not 0 < level <= 41:
+            return False
+        if v.get("pix_fmt") != "yuv420p":
+            return False
+    return all(a.get("codec_name") == "aac" for a in audio)
+
+
+def extract_embedded_subtitle_to_srt(media_file: Path, out_srt: Path, probe_cache: Path | None = None) -> tuple[bool, str]:
+    """Try extracting embedded subtitle stream from media into SRT.
+
+    Returns (ok, source_tag). Media without subtitle streams is rejected from the (cached)
+    probe alone, without launching ffmpeg.
+    """
     try:
-        payload = json.loads(probe.stdout or "{}")
-        streams = payload.get("streams", [])
-    except Exception:
+        probe = media_probe(media_file, probe_cache)
+    except subprocess.CalledProcessError:
+        return False, "embedded_probe_failed"
+    except ValueError:
         return False, "embedded_probe_parse_failed"
 
+    streams = probe_subtitle_streams(probe)
     if not streams:
         return False, "embedded_not_found"
 
-    selected = None
-    for s in streams:
-        lang = str(((s.get("tags") or {}).get("language") or "")).lower()
-        if lang.startswith("en"):
-            selected = s
-            break
-    if selected is None:
-        selected = streams[0]
-
-    idx = selected.get("index")
+    selected = next((s for s in streams if s["language"].startswith("en")), streams[0])
+    idx = selected["index"]
     if idx is None:
         return False, "embedded_index_missing"
 
@@ -164,19 +826,83 @@ def extract_embedded_subtitle_to_srt(media_file: Path, out_srt: Path) -> tuple[b
     return True, "embedded"
 
 
-def transcribe_with_whisper_to_srt(audio_file: Path, out_srt: Path) -> tuple[bool, str]:
-    whisper_bin = which("whisper")
-    if whisper_bin is None:
-        return False, "whisper_not_found"
+def whisper_backend() -> str:
+    """auto (Python module when importable, else the CLI), python or cli."""
+    backend = os.getenv("COURSE_PIPELINE_WHISPER_BACKEND", "auto").strip().lower()
+    return backend if backend in {"auto", "python", "cli"} else "auto"
 
-    model = os.getenv("COURSE_PIPELINE_WHISPER_MODEL", "base")
-    device = os.getenv("COURSE_PIPELINE_WHISPER_DEVICE", "").strip()
-    output_dir = out_srt.parent / ".whisper"
-    output_dir.mkdir(parents=True, exist_ok=True)
+
+def _import_whisper():
+    try:
+        import whisper
+    except ImportError:
+        return None
+    return whisper
+
+
+# Loaded models stay warm for the life of the process: every lesson of a step, and every
+# task a long-running worker picks up, share one load. Decoding holds the lock too.
+_WHISPER_MODELS: dict[tuple[str, str], object] = {}
+_WHISPER_LOCK = threading.Lock()
+
+
+def load_whisper_model(whisper, model: str, device: str) -> tuple[object, float, bool]:
+    """(model, ms spent loading it, was it already warm). Call with _WHISPER_LOCK held."""
+    cached = _WHISPER_MODELS.get((model, device))
+    if cached is not None:
+        return cached, 0.0, True
+    started = time.perf_counter()
+    loaded = whisper.load_model(model, device=device or None)
+    _WHISPER_MODELS[(model, device)] = loaded
+    return loaded, round((time.perf_counter() - started) * 1000, 1), False
+
+
+def _transcribe_with_whisper_module(whisper, items: list[tuple[str, Path, Path]], model: str, device: str, meter) -> tuple[dict, dict]:
+    results: dict[str, tuple[bool, str]] = {}
+    decode_ms: dict[str, float] = {}
+    with _WHISPER_LOCK:
+        try:
+            loaded, load_ms, warm = load_whisper_model(whisper, model, device)
+        except Exception:
+            return {key: (False, "whisper_failed") for key, _, _ in items}, {"backend": "python", "model_load_ms": 0.0}
+        fp16 = getattr(getattr(loaded, "device", None), "type", "cpu") == "cuda"
+        for key, audio_file, out_srt in items:
+            with meter.lesson(key) if meter is not None else nullcontext():
+                started = time.perf_counter()
+                try:
+                    result = loaded.transcribe(str(audio_file), language="en", task="transcribe", fp16=fp16, verbose=None)
+                except Exception:
+                    results[key] = (False, "whisper_failed")
+                    continue
+                decode_ms[key] = round((time.perf_counter() - started) * 1000, 1)
+                entries = [
+                    {"start_ms": int(seg["start"] * 1000), "end_ms": int(seg["end"] * 1000), "text": str(seg["text"]).strip()}
+                    for seg in result.get("segments", [])
+                    if str(seg.get("text", "")).strip()
+                ]
+                if not entries:
+                    results[key] = (False, "whisper_output_empty")
+                    continue
+                write_srt(out_srt, entries)
+                results[key] = (True, "whisper_local")
+    return results, {"backend": "python", "model_load_ms": load_ms, "model_warm": warm, "decode_ms": decode_ms}
+
+
+def _transcribe_with_whisper_cli(
+    whisper_bin: str, items: list[tuple[str, Path, Path]], model: str, device: str, stage_dir: Path
+) -> tuple[dict, dict]:
+    # Every lesson's audio is named audio_16k.wav, so stage them by key to keep outputs apart.
+    shutil.rmtree(stage_dir, ignore_errors=True)
+    stage_dir.mkdir(parents=True)
+    staged = []
+    for key, audio_file, _ in items:
+        link = stage_dir / f"{key}.wav"
+        link.symlink_to(audio_file.resolve())
+        staged.append(str(link))
 
     cmd = [
         whisper_bin,
-        str(audio_file),
+        *staged,
         "--task",
         "transcribe",
         "--language",
@@ -184,7 +910,7 @@ def transcribe_with_whisper_to_srt(audio_file: Path, out_srt: Path) -> tuple[boo
         "--output_format",
         "srt",
         "--output_dir",
-        str(output_dir),
+        str(stage_dir),
         "--model",
         model,
         "--verbose",
@@ -193,579 +919,2461 @@ def transcribe_with_whisper_to_srt(audio_file: Path, out_srt: Path) -> tuple[boo
     if device:
         cmd.extend(["--device", device])
 
+    started = time.perf_counter()
     run = subprocess.run(cmd, check=False, capture_output=True, text=True)
-    if run.returncode != 0:
-        return False, "whisper_failed"
+    wall_ms = round((time.perf_counter() - started) * 1000, 1)
 
-    generated_srt = output_dir / f"{audio_file.stem}.srt"
-    if not generated_srt.exists():
-        return False, "whisper_output_missing"
+    results: dict[str, tuple[bool, str]] = {}
+    for key, _, out_srt in items:
+        generated_srt = stage_dir / f"{key}.srt"
+        if not generated_srt.exists():
+            results[key] = (False, "whisper_failed" if run.returncode != 0 else "whisper_output_missing")
+            continue
+        text = generated_srt.read_text(encoding="utf-8", errors="ignore").strip()
+        if not text:
+            results[key] = (False, "whisper_output_empty")
+            continue
+        out_srt.write_text(text + "\n", encoding="utf-8")
+        results[key] = (True, "whisper_local")
+    # The CLI loads once and decodes every file, but does not report the split.
+    return results, {"backend": "cli", "invocations": 1, "model_load_ms": None, "wall_ms": wall_ms}
 
-    text = generated_srt.read_text(encoding="utf-8", errors="ignore").strip()
-    if not text:
-        return False, "whisper_output_empty"
 
-    out_srt.write_text(text + "\n", encoding="utf-8")
-    return True, "whisper_local"
+def transcribe_lessons_with_whisper(
+    items: list[tuple[str, Path, Path]], meter: "LessonMeter | None" = None, stage_dir: Path | None = None
+) -> tuple[dict, dict]:
+    """Transcribe (key, audio_file, out_srt) items with a single model load.
 
+    Returns per-key (ok, source) and timing stats for the step payload. The CLI backend stages
+    audio in stage_dir (default: .whisper next to the lesson folders).
+    """
+    if not items:
+        return {}, {}
+    model = os.getenv("COURSE_PIPELINE_WHISPER_MODEL", "base")
+    device = os.getenv("COURSE_PIPELINE_WHISPER_DEVICE", "").strip()
+    backend = whisper_backend()
+    whisper = _import_whisper() if backend in {"auto", "python"} else None
+    if whisper is not None:
+        results, stats = _transcribe_with_whisper_module(whisper, items, model, device, meter)
+    elif backend == "python":
+        results, stats = {key: (False, "whisper_not_found") for key, _, _ in items}, {"backend": "python"}
+    else:
+        whisper_bin = which("whisper")
+        if whisper_bin is None:
+            return {key: (False, "whisper_not_found") for key, _, _ in items}, {"backend": "cli", "model": model}
+        stage_dir = stage_dir or items[0][2].parent.parent / ".whisper"
+        results, stats = _transcribe_with_whisper_cli(whisper_bin, items, model, device, stage_dir)
+    return results, {**stats, "model": model, "lessons": len(items)}
 
-def write_srt(path: Path, entries: list[dict]) -> None:
-    def format_ms(ms: int) -> str:
-        h = ms // 3600000
-        m = (ms % 3600000) // 60000
-        s = (ms % 60000) // 1000
-        ms_part = ms % 1000
-        return f"{h:02}:{m:02}:{s:02},{ms_part:03}"
 
-    lines: list[str] = []
-    for idx, e in enumerate(entries, start=1):
-        lines.append(str(idx))
-        lines.append(f"{format_ms(e['start_ms'])} --> {format_ms(e['end_ms'])}")
-        lines.append(e["text"])
-        lines.append("")
-    path.write_text("\n".join(lines), encoding="utf-8")
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
 
 
-def parse_srt(path: Path) -> list[dict]:
-    if not path.exists():
-        return []
-    content = path.read_text(encoding="utf-8").strip()
-    if not content:
-        return []
-    blocks = re.split(r"\n\s*\n", content)
-    items: list[dict] = []
-    ts_pattern = re.compile(
-        r"(?P<s_h>\d{2}):(?P<s_m>\d{2}):(?P<s_s>\d{2}),(?P<s_ms>\d{3})\s+-->\s+"
-        r"(?P<e_h>\d{2}):(?P<e_m>\d{2}):(?P<e_s>\d{2}),(?P<e_ms>\d{3})"
-    )
-    for b in blocks:
-        lines = [l for l in b.splitlines() if l.strip()]
-        if len(lines) < 2:
-            continue
-        ts_line = lines[1] if lines[0].isdigit() else lines[0]
-        m = ts_pattern.search(ts_line)
-        if not m:
-            continue
-        text_lines = lines[2:] if lines[0].isdigit() else lines[1:]
-        text = " ".join(text_lines).strip()
-        start_ms = (
-            int(m.group("s_h")) * 3600000
-            + int(m.group("s_m")) * 60000
-            + int(m.group("s_s")) * 1000
-            + int(m.group("s_ms"))
-        )
-        end_ms = (
-            int(m.group("e_h")) * 3600000
-            + int(m.group("e_m")) * 60000
-            + int(m.group("e_s")) * 1000
-            + int(m.group("e_ms"))
-        )
-        items.append({"start_ms": start_ms, "end_ms": end_ms, "text": text})
-    return items
+VAD_FRAME_MS = 30
+VAD_MIN_SILENCE_MS = 300
+# Where no pause is found near the target length, chunks are hard-cut and overlap by this much.
+ASR_CHUNK_OVERLAP_MS = 1000
 
 
-def is_pending_text(text: str) -> bool:
-    value = (text or "").strip().lower()
-    if not value:
-        return True
-    markers = [
-        "[asr pending]",
-        "[zh pending]",
-        "[pending]",
-        "[待补充]",
-        "【待翻译】",
-    ]
-    return any(marker in value for marker in markers)
+def asr_chunk_mode() -> str:
+    """auto (lessons of COURSE_PIPELINE_ASR_CHUNK_MIN_SECONDS or longer), on or off."""
+    value = os.getenv("COURSE_PIPELINE_ASR_CHUNKED", "auto").strip().lower()
+    if value in {"1", "true", "on", "yes"}:
+        return "on"
+    if value in {"0", "false", "off", "no"}:
+        return "off"
+    return "auto"
 
 
-def translate_en_to_zh_ai(text: str) -> str | None:
-    value = (text or "").strip()
-    if not value or is_pending_text(value):
-        return None
-    timeout = float(os.getenv("COURSE_PIPELINE_TRANSLATE_TIMEOUT", "10"))
-    endpoint = (
-        "https://translate.googleapis.com/translate_a/single"
-        f"?client=gtx&sl=en&tl=zh-CN&dt=t&q={quote(value)}"
-    )
-    req = Request(endpoint, headers={"User-Agent": "Mozilla/5.0"})
-    try:
-        with urlopen(req, timeout=timeout) as resp:
-            payload = json.loads(resp.read().decode("utf-8", errors="ignore"))
-        rows = payload[0] if isinstance(payload, list) and payload else []
-        translated = "".join(str(row[0]) for row in rows if isinstance(row, list) and row and row[0])
-        translated = translated.strip()
-        return translated or None
-    except Exception:
-        return None
+def asr_chunk_seconds() -> float:
+    return max(10.0, float(os.getenv("COURSE_PIPELINE_ASR_CHUNK_SECONDS", "120")))
 
 
-def is_pending_ipa(value: str) -> bool:
-    text = (value or "").strip().lower()
-    if not text:
-        return True
-    return "[pending]" in text or "[ipa pending]" in text
+def asr_chunk_min_seconds() -> float:
+    return float(os.getenv("COURSE_PIPELINE_ASR_CHUNK_MIN_SECONDS", "600"))
 
 
-def fetch_word_ipa(word: str) -> str | None:
-    key = (word or "").strip().lower()
-    if not key:
-        return None
-    if key in IPA_CACHE:
-        return IPA_CACHE[key]
+def asr_chunk_jobs(jobs: int | None = None) -> int:
+    """Chunk transcription processes: --jobs, else COURSE_PIPELINE_ASR_JOBS, else COURSE_PIPELINE_JOBS."""
+    if jobs is None:
+        jobs = env_int("COURSE_PIPELINE_ASR_JOBS", 0) or resolve_jobs()
+    return max(1, jobs)
 
-    timeout = float(os.getenv("COURSE_PIPELINE_IPA_TIMEOUT", "8"))
-    endpoint = f"https://api.dictionaryapi.dev/api/v2/entries/en/{quote(key)}"
-    req = Request(endpoint, headers={"User-Agent": "Mozilla/5.0"})
-    ipa: str | None = None
-    try:
-        with urlopen(req, timeout=timeout) as resp:
-            payload = json.loads(resp.read().decode("utf-8", errors="ignore"))
-        if isinstance(payload, list) and payload:
-            first = payload[0] if isinstance(payload[0], dict) else {}
-            phonetic = first.get("phonetic")
-            if isinstance(phonetic, str) and phonetic.strip():
-                ipa = phonetic.strip()
-            if not ipa:
-                for row in first.get("phonetics", []):
-                    if not isinstance(row, dict):
-                        continue
-                    text = row.get("text")
-                    if isinstance(text, str) and text.strip():
-                        ipa = text.strip()
-                        break
-    except Exception:
-        ipa = None
 
-    IPA_CACHE[key] = ipa
-    return ipa
+def wav_frame_energy_db(np, wav_file: Path, frame_ms: int = VAD_FRAME_MS) -> tuple[object, int]:
+    """Per-frame RMS level in dBFS of a 16-bit PCM WAV, read in blocks; returns (levels, duration_ms)."""
+    with wave.open(str(wav_file), "rb") as w:
+        if w.getsampwidth() != 2:
+            raise ValueError(f"unsupported sample width: {w.getsampwidth()}")
+        channels, rate, total = w.getnchannels(), w.getframerate(), w.getnframes()
+        frame_len = max(1, rate * frame_ms // 1000) * channels
+        levels = []
+        carry = np.zeros(0, dtype=np.float32)
+        while True:
+            raw = w.readframes(frame_len // channels * 2048)
+            if not raw:
+                break
+            samples = np.concatenate([carry, np.frombuffer(raw, dtype="<i2").astype(np.float32)])
+            usable = len(samples) // frame_len * frame_len
+            carry = samples[usable:]
+            levels.append(_frame_levels_db(np, samples[:usable].reshape(-1, frame_len)))
+        if len(carry):
+            levels.append(_frame_levels_db(np, np.pad(carry, (0, frame_len - len(carry))).reshape(1, frame_len)))
+    if not levels:
+        return np.zeros(0, dtype=np.float32), 0
+    return np.concatenate(levels), int(total * 1000 / rate)
 
 
-def generate_sentence_ipa(en: str) -> str:
-    text = (en or "").strip()
-    if not text:
-        return "[pending]"
+def _frame_levels_db(np, frames):
+    rms = np.sqrt(np.mean(np.square(frames / 32768.0), axis=1))
+    return 20 * np.log10(rms + 1e-10)
 
-    has_ipa = False
-    parts: list[str] = []
-    for token in text.split():
-        matched = WORD_PATTERN.fullmatch(token.strip(".,!?;:\"()[]{}"))
-        if not matched:
-            parts.append(token)
-            continue
-        ipa = fetch_word_ipa(matched.group(0))
-        if ipa:
-            parts.append(ipa)
-            has_ipa = True
-        else:
-            parts.append(token)
 
-    if not has_ipa:
-        return "[pending]"
-    return " ".join(parts)
+def silence_spans(np, levels_db, frame_ms: int = VAD_FRAME_MS, min_silence_ms: int = VAD_MIN_SILENCE_MS) -> list[tuple[int, int]]:
+    """(start_ms, end_ms) of pauses: runs of frames quieter than the adaptive noise floor + 12 dB."""
+    if len(levels_db) == 0:
+        return []
+    threshold = min(max(float(np.percentile(levels_db, 10)) + 12, -55.0), -35.0)
+    quiet = np.concatenate([[0], (levels_db < threshold).astype(np.int8), [0]])
+    edges = np.diff(quiet)
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    keep = (ends - starts) * frame_ms >= min_silence_ms
+    return [(int(s) * frame_ms, int(e) * frame_ms) for s, e in zip(starts[keep], ends[keep])]
 
 
-def infer_grammar(en: str) -> dict:
-    text = (en or "").strip()
-    low = text.lower()
-    points: list[str] = []
-
-    if "?" in text:
-        pattern = "疑问句结构"
-        points.append("使用直接提问句式。")
-    elif "!" in text:
-        pattern = "感叹句结构"
-        points.append("表达强调或强烈情绪。")
-    elif any(k in low for k in ["have ", "has ", "had "]):
-        pattern = "完成时表达"
-        points.append("用完成时连接过去与现在。")
-    elif any(k in low for k in [" was ", " were ", " did ", " went ", "got "]):
-        pattern = "一般过去时"
-        points.append("描述已经完成的过去事件。")
-    elif any(k in low for k in [" will ", "going to "]):
-        pattern = "将来表达"
-        points.append("描述将来的计划或预测。")
-    else:
-        pattern = "陈述句结构"
-        points.append("使用常见主谓结构表达信息。")
+def plan_asr_chunks(duration_ms: int, silences: list[tuple[int, int]], target_ms: int) -> list[dict]:
+    """Split [0, duration_ms) near every target_ms, preferring the middle of a pause.
 
-    if any(k in low for k in ["because", "when", "if", "that", "which"]):
-        points.append("包含从句连接词，补充细节信息。")
-    if any(k in low for k in ["very", "really", "quite", "so "]):
-        points.append("包含程度副词用于加强语气。")
+    Each chunk transcribes [start_ms, end_ms) and owns the cues that start in
+    [owns_from_ms, next chunk's owns_from_ms). Hard cuts overlap both neighbours.
+    """
+    mids = [(s + e) // 2 for s, e in silences]
+    chunks = [{"start_ms": 0, "end_ms": duration_ms, "owns_from_ms": 0, "cut": None}]
+    pos = 0
+    while duration_ms - pos > target_ms * 1.5:
+        goal = pos + target_ms
+        candidates = [m for m in mids if pos + target_ms // 2 < m < pos + target_ms * 3 // 2]
+        if candidates:
+            cut, kind = min(candidates, key=lambda m: abs(m - goal)), "silence"
+            overlap = 0
+        else:
+            cut, kind, overlap = goal, "hard", ASR_CHUNK_OVERLAP_MS
+        chunks[-1]["end_ms"] = min(duration_ms, cut + overlap)
+        chunks.append({"start_ms": cut - overlap, "end_ms": duration_ms, "owns_from_ms": cut, "cut": kind})
+        pos = cut
+    return chunks
 
-    difficulty = "A2" if len(text.split()) > 10 else "A1"
-    return {"pattern": pattern, "points": points[:3], "difficulty": difficulty}
 
+def write_wav_span(src: Path, dst: Path, start_ms: int, end_ms: int) -> None:
+    with wave.open(str(src), "rb") as r:
+        rate = r.getframerate()
+        first = min(r.getnframes(), start_ms * rate // 1000)
+        r.setpos(first)
+        frames = r.readframes(max(0, end_ms * rate // 1000 - first))
+        with wave.open(str(dst), "wb") as w:
+            w.setparams(r.getparams())
+            w.writeframes(frames)
 
-def infer_usage(en: str, zh: str) -> dict:
-    low = (en or "").lower()
-    if any(k in low for k in ["hello", "welcome", "hi"]):
-        scene = "greeting"
-        tone = "friendly"
-    elif any(k in low for k in ["train", "station", "walk", "woods", "town"]):
-        scene = "daily_life_narration"
-        tone = "neutral"
-    elif "?" in (en or ""):
-        scene = "questioning"
-        tone = "curious"
-    else:
-        scene = "daily_conversation"
-        tone = "neutral"
-    return {
-        "scene": scene,
-        "tone": tone,
-        "formality": "informal",
-        "alternatives": [zh] if zh else [],
-        "caution": "",
-    }
 
+def _norm_cue_text(text: str) -> str:
+    return re.sub(r"[^\w']+", " ", text.lower()).strip()
 
-def generate_summary_and_highlights(sentences: list[dict]) -> tuple[str, list[str]]:
-    zh_texts = [str(s.get("zh", "")).strip() for s in sentences if str(s.get("zh", "")).strip()]
-    en_texts = [str(s.get("en", "")).strip() for s in sentences if str(s.get("en", "")).strip()]
 
-    preview = "；".join(zh_texts[:3]) if zh_texts else "；".join(en_texts[:2])
-    if not preview:
+def stitch_chunk_cues(chunks: list[tuple[dict, list[dict]]]) -> list[dict]:
+    """Merge per-chunk cues onto the lesson timeline.
+
+    Cues are shifted by their chunk's start, kept only by the chunk that owns their start
+    time, and a cue repeating the previous chunk's last line across the cut is folded into it.
+    """
+    merged: list[dict] = []
+    last_chunk = -1
+    for idx, (chunk, cues) in enumerate(chunks):
+        owns_to = chunks[idx + 1][0]["owns_from_ms"] if idx + 1 < len(chunks) else float("inf")
+        for cue in cues:
+            start, end = cue["start_ms"] + chunk["start_ms"], cue["end_ms"] + chunk["start_ms"]
+            text = cue["text"].strip()
+            if not text or not chunk["owns_from_ms"] <= start < owns_to:
+                continue
+            if merged and last_chunk != idx:
+                prev = merged[-1]
+                if _norm_cue_text(prev["text"]) == _norm_cue_text(text) and start - prev["end_ms"] < ASR_CHUNK_OVERLAP_MS:
+                    prev["end_ms"] = max(prev["end_ms"], end)
+                    last_chunk = idx
+                    continue
+            if merged and start < merged[-1]["end_ms"]:
+                merged[-1]["end_ms"] = start
+            merged.append({"start_ms": start, "end_ms": max(start, end), "text": text})
+            last_chunk = idx
+    return merged
+
+
+# Set in chunk pool processes by _init_asr_chunk_worker.
+_CHUNK_WORKER_LOAD_MS: float | None = None
+
+
+def _init_asr_chunk_worker(threads: int) -> None:
+    """Pool initializer: hold torch to this process's share of the CPUs and load the model once."""
+    global _CHUNK_WORKER_LOAD_MS
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    try:
+        import torch
+    except ImportError:
+        torch = None
+    if torch is not None:
+        torch.set_num_threads(threads)
+    whisper = _import_whisper() if whisper_backend() in {"auto", "python"} else None
+    if whisper is None:
+        return
+    model = os.getenv("COURSE_PIPELINE_WHISPER_MODEL", "base")
+    device = os.getenv("COURSE_PIPELINE_WHISPER_DEVICE", "").strip()
+    with _WHISPER_LOCK:
+        try:
+            _, _CHUNK_WORKER_LOAD_MS, _ = load_whisper_model(whisper, model, device)
+        except Exception:
+            # Transcription tries the load again and reports the failure per chunk.
+            pass
+
+
+def _transcribe_chunk_group(items: list[tuple[str, Path, Path]], stage_dir: Path) -> tuple[dict, dict]:
+    results, stats = transcribe_lessons_with_whisper(items, stage_dir=stage_dir)
+    return results, {**stats, "pid": os.getpid(), "worker_load_ms": _CHUNK_WORKER_LOAD_MS}
+
+
+def transcribe_chunked_lesson(np, audio_file: Path, out_srt: Path, workers: int) -> tuple[bool, str, dict] | None:
+    """Transcribe one long lesson as VAD-cut chunks in a process pool.
+
+    Returns None when the lesson fits in a single chunk, so the caller transcribes it whole.
+    """
+    started = time.perf_counter()
+    levels, duration_ms = wav_frame_energy_db(np, audio_file)
+    chunks = plan_asr_chunks(duration_ms, silence_spans(np, levels), int(asr_chunk_seconds() * 1000))
+    if len(chunks) < 2:
+        return None
+    chunk_dir = out_srt.parent / ".asr_chunks"
+    shutil.rmtree(chunk_dir, ignore_errors=True)
+    chunk_dir.mkdir(parents=True)
+    items = []
+    for idx, chunk in enumerate(chunks):
+        wav = chunk_dir / f"c{idx:03d}.wav"
+        write_wav_span(audio_file, wav, chunk["start_ms"], chunk["end_ms"])
+        items.append((f"c{idx:03d}", wav, chunk_dir / f"c{idx:03d}.srt"))
+    vad_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    # Each pool process loads the model once, in its initializer, for its share of chunks.
+    workers = min(workers, len(items))
+    groups = [items[i::workers] for i in range(workers)]
+    results: dict[str, tuple[bool, str]] = {}
+    load_ms = []
+    init_load_ms: dict[int, float | None] = {}
+    decode_started = time.perf_counter()
+    with process_pool(workers, _init_asr_chunk_worker, (max(1, cpu_budget() // workers),)) as pool:
+        futures = [pool.submit(_transcribe_chunk_group, group, chunk_dir / f"whisper_{i}") for i, group in enumerate(groups)]
+        for future in futures:
+            group_results, group_stats = future.result()
+            results.update(group_results)
+            load_ms.append(group_stats.get("model_load_ms"))
+            init_load_ms[group_stats["pid"]] = group_stats.get("worker_load_ms")
+    decode_wall_ms = round((time.perf_counter() - decode_started) * 1000, 1)
+    load_ms.extend(v for v in init_load_ms.values() if v is not None)
+
+    stats = {
+        "chunks": len(chunks),
+        "silence_cuts": sum(1 for c in chunks if c["cut"] == "silence"),
+        "hard_cuts": sum(1 for c in chunks if c["cut"] == "hard"),
+        "workers": workers,
+        "vad_ms": vad_ms,
+        "model_load_ms": round(sum(load_ms), 1) if all(v is not None for v in load_ms) else None,
+        "decode_wall_ms": decode_wall_ms,
+    }
+    # A chunk of music or silence legitimately transcribes to nothing.
+    failed = [source for ok, source in results.values() if not ok and source != "whisper_output_empty"]
+    if failed or len(results) < len(items):
+        # A transcript with holes would be frozen as complete; fail the lesson so it is retried.
+        return False, failed[0] if failed else "whisper_output_missing", stats
+    stitched = stitch_chunk_cues([(chunk, parse_srt(item[2])) for chunk, item in zip(chunks, items)])
+    shutil.rmtree(chunk_dir, ignore_errors=True)
+    if not stitched:
+        return False, "whisper_output_empty", stats
+    write_srt(out_srt, stitched)
+    return True, "whisper_local", stats
+
+
+def format_srt_timestamp(ms: int) -> str:
+    return f"{ms // 3600000:02}:{ms % 3600000 // 60000:02}:{ms % 60000 // 1000:02},{ms % 1000:03}"
+
+
+def format_vtt_timestamp(ms: int) -> str:
+    return f"{ms // 3600000:02}:{ms % 3600000 // 60000:02}:{ms % 60000 // 1000:02}.{ms % 1000:03}"
+
+
+def write_srt(path: Path, entries: Iterable[dict]) -> int:
+    """Stream cues to an SRT file without building it in memory; returns the cue count."""
+    count = 0
+    with path.open("w", encoding="utf-8", newline="\n") as f:
+        for count, e in enumerate(entries, start=1):
+            if count > 1:
+                f.write("\n")
+            f.write(f"{count}\n{format_srt_timestamp(e['start_ms'])} --> {format_srt_timestamp(e['end_ms'])}\n{e['text']}\n")
+    return count
+
+
+def write_vtt(path: Path, entries: Iterable[dict]) -> int:
+    """Stream cues to a WebVTT file; returns the cue count."""
+    count = 0
+    with path.open("w", encoding="utf-8", newline="\n") as f:
+        f.write("WEBVTT\n")
+        for count, e in enumerate(entries, start=1):
+            # "-->" may not appear in cue text, and & and < start markup.
+            text = e["text"].replace("&", "&amp;").replace("<", "&lt;").replace("-->", "--&gt;")
+            f.write(f"\n{format_vtt_timestamp(e['start_ms'])} --> {format_vtt_timestamp(e['end_ms'])}\n{text}\n")
+    return count
+
+
+SRT_TIMESTAMP_PATTERN = re.compile(
+    r"(\d+):(\d{2}):(\d{2})[,.](\d{3})\s*-->\s*(\d+):(\d{2}):(\d{2})[,.](\d{3})"
+)
+
+
+def parse_srt_timestamps(line: str) -> tuple[int, int] | None:
+    # Fast path: the fixed "HH:MM:SS,mmm --> HH:MM:SS,mmm" layout that write_srt and most tools emit.
+    if len(line) >= 29 and line[12:17] == " --> " and line[2] == ":" and line[19] == ":" and line[8] in ",." and line[25] in ",.":
+        try:
+            return (
+                int(line[0:2]) * 3600000 + int(line[3:5]) * 60000 + int(line[6:8]) * 1000 + int(line[9:12]),
+                int(line[17:19]) * 3600000 + int(line[20:22]) * 60000 + int(line[23:25]) * 1000 + int(line[26:29]),
+            )
+        except ValueError:
+            pass
+    m = SRT_TIMESTAMP_PATTERN.search(line)
+    if not m:
+        return None
+    sh, sm, ss, sms, eh, em, es, ems = map(int, m.groups())
+    return sh * 3600000 + sm * 60000 + ss * 1000 + sms, eh * 3600000 + em * 60000 + es * 1000 + ems
+
+
+def _srt_block_cue(block: list[str]) -> dict | None:
+    if len(block) < 2:
+        return None
+    numbered = block[0].isdigit()
+    times = parse_srt_timestamps(block[1] if numbered else block[0])
+    if times is None:
+        return None
+    text = " ".join(block[2:] if numbered else block[1:]).strip()
+    return {"start_ms": times[0], "end_ms": times[1], "text": text}
+
+
+def iter_srt_cues(lines: Iterable[str]) -> Iterable[dict]:
+    """Yield cues from SRT lines as they arrive. Blocks without a timestamp line are skipped."""
+    block: list[str] = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line.strip():
+            block.append(line)
+            continue
+        if block:
+            cue = _srt_block_cue(block)
+            if cue is not None:
+                yield cue
+            block = []
+    if block:
+        cue = _srt_block_cue(block)
+        if cue is not None:
+            yield cue
+
+
+def iter_srt(path: Path) -> Iterable[dict]:
+    """Stream the cues of an SRT file (CRLF and a UTF-8 BOM are accepted); a missing file has none."""
+    try:
+        f = path.open("r", encoding="utf-8-sig")
+    except FileNotFoundError:
+        return
+    with f:
+        yield from iter_srt_cues(f)
+
+
+def parse_srt(path: Path) -> list[dict]:
+    return list(iter_srt(path))
+
+
+def is_pending_text(text: str) -> bool:
+    value = (text or "").strip().lower()
+    if not value:
+        return True
+    markers = [
+        "[asr pending]",
+        "[zh pending]",
+        "[pending]",
+        "[待补充]",
+        "【待翻译】",
+    ]
+    return any(marker in value for marker in markers)
+
+
+class NetworkCounter:
+    """Process-wide tally of outbound HTTP requests, read as deltas around a step.
+
+    Concurrent steps in one worker process share it, so per-step numbers are approximate there.
+    """
+
+    def __init__(self, keep: int = 100_000):
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=keep)
+        self.requests = 0
+        self.errors = 0
+
+    def record(self, latency_s: float, ok: bool = True) -> None:
+        with self._lock:
+            self.requests += 1
+            self.errors += 0 if ok else 1
+            self._latencies.append(latency_s * 1000)
+
+    def mark(self) -> tuple[int, int]:
+        with self._lock:
+            return self.requests, self.errors
+
+    def since(self, mark: tuple[int, int]) -> dict:
+        with self._lock:
+            count = self.requests - mark[0]
+            latencies = list(self._latencies)[-count:] if count else []
+            errors = self.errors - mark[1]
+        return {
+            "requests": count,
+            "errors": errors,
+            "latency_ms_total": round(sum(latencies), 1),
+            "latency_ms_p50": percentile(latencies, 50),
+            "latency_ms_p90": percentile(latencies, 90),
+            "latency_ms_max": round(max(latencies), 1) if latencies else 0.0,
+        }
+
+
+NETWORK = NetworkCounter()
+
+
+class StepsInFlight:
+    """Counts steps running in this process; each step keeps the most it saw alongside it.
+
+    CPU and network figures are process-wide, so this tells a reader how many steps shared them.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._peaks: dict[int, int] = {}
+        self._next = 0
+
+    def enter(self) -> int:
+        with self._lock:
+            token = self._next
+            self._next += 1
+            self._peaks[token] = 0
+            count = len(self._peaks)
+            for other in self._peaks:
+                self._peaks[other] = max(self._peaks[other], count)
+            return token
+
+    def leave(self, token: int) -> int:
+        with self._lock:
+            return self._peaks.pop(token)
+
+
+STEPS_IN_FLIGHT = StepsInFlight()
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return round(float(ordered[int(rank) - 1]), 1)
+
+
+def _rss_kb(maxrss: int) -> int:
+    return maxrss // 1024 if sys.platform == "darwin" else maxrss
+
+
+def resource_snapshot() -> dict:
+    snap = {"wall": time.perf_counter(), "cpu": 0.0, "child_cpu": 0.0, "rss_kb": 0, "child_rss_kb": 0}
+    try:
+        import resource
+    except ImportError:
+        return snap
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    snap.update(
+        cpu=own.ru_utime + own.ru_stime,
+        child_cpu=children.ru_utime + children.ru_stime,
+        rss_kb=_rss_kb(own.ru_maxrss),
+        child_rss_kb=_rss_kb(children.ru_maxrss),
+    )
+    return snap
+
+
+def resource_delta(before: dict, after: dict | None = None) -> dict:
+    """Wall/CPU time spent since before, for the whole process and its reaped children."""
+    after = after or resource_snapshot()
+    return {
+        "wall_ms": round((after["wall"] - before["wall"]) * 1000, 1),
+        "cpu_ms": round((after["cpu"] - before["cpu"]) * 1000, 1),
+        "child_cpu_ms": round((after["child_cpu"] - before["child_cpu"]) * 1000, 1),
+    }
+
+
+def process_high_water(snap: dict | None = None) -> dict:
+    """ru_maxrss of this process and of its largest reaped child since start; never a per-step peak."""
+    snap = snap or resource_snapshot()
+    return {"rss_kb": snap["rss_kb"], "child_rss_kb": snap["child_rss_kb"]}
+
+
+class LessonMeter:
+    """Per-lesson resource deltas; a lesson measured in several phases accumulates."""
+
+    def __init__(self) -> None:
+        self.metrics: dict[str, dict] = {}
+
+    @contextmanager
+    def lesson(self, key: str):
+        before = resource_snapshot()
+        try:
+            yield
+        finally:
+            delta = resource_delta(before)
+            acc = self.metrics.setdefault(key, {})
+            for field in ("wall_ms", "cpu_ms", "child_cpu_ms"):
+                acc[field] = round(acc.get(field, 0.0) + delta[field], 1)
+
+    def attach(self, lessons: list[dict]) -> list[dict]:
+        for lesson in lessons:
+            measured = self.metrics.get(lesson.get("lesson_id"))
+            if measured is not None:
+                lesson["metrics"] = {**measured, **lesson.get("metrics", {})}
+        return lessons
+
+
+class KeepAliveHttpPool:
+    """Per-thread persistent HTTP(S) connections, so batches reuse TCP/TLS sessions."""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._local = threading.local()
+        self._all: list[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+
+    def _connection(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = self._local.conns = {}
+        conn = conns.get((scheme, netloc))
+        if conn is None:
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = cls(netloc, timeout=self.timeout)
+            conns[(scheme, netloc)] = conn
+            with self._lock:
+                self._all.append(conn)
+                self.connections += 1
+        return conn
+
+    def _drop(self, scheme: str, netloc: str) -> None:
+        conn = self._local.conns.pop((scheme, netloc), None)
+        if conn is not None:
+            conn.close()
+
+    def request(self, method: str, url: str, body: bytes | None = None, headers: dict | None = None) -> tuple[int, bytes]:
+        parts = urlsplit(url)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        for attempt in range(2):
+            conn = self._connection(parts.scheme, parts.netloc)
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                resp = conn.getresponse()
+                data = resp.read()
+            except (http.client.HTTPException, OSError):
+                # Idle keep-alive connections get closed by the server; reconnect once.
+                self._drop(parts.scheme, parts.netloc)
+                if attempt:
+                    NETWORK.record(time.perf_counter() - started, ok=False)
+                    raise
+                continue
+            NETWORK.record(time.perf_counter() - started, ok=resp.status < 500)
+            with self._lock:
+                self.requests += 1
+            if resp.will_close:
+                self._drop(parts.scheme, parts.netloc)
+            return resp.status, data
+        raise http.client.HTTPException("unreachable")
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+        self._local = threading.local()
+
+
+class TranslationProvider(abc.ABC):
+    """Translates batches of English sentences into Chinese; None marks a sentence it could not translate."""
+
+    name = "base"
+
+    @abc.abstractmethod
+    def translate_batch(self, texts: list[str]) -> list[str | None]:
+        ...
+
+    def stats(self) -> dict:
+        return {}
+
+    def close(self) -> None:
+        pass
+
+
+class GoogleGtxProvider(TranslationProvider):
+    name = "google_gtx"
+
+    def __init__(self, endpoint: str | None = None, timeout: float | None = None):
+        self.endpoint = endpoint or os.getenv(
+            "COURSE_PIPELINE_TRANSLATE_ENDPOINT", "https://translate.googleapis.com/translate_a/single"
+        )
+        if timeout is None:
+            timeout = float(os.getenv("COURSE_PIPELINE_TRANSLATE_TIMEOUT", "10"))
+        self.http = KeepAliveHttpPool(timeout)
+        self.fallbacks = 0
+
+    def _translate_text(self, text: str) -> str | None:
+        query = urlencode({"client": "gtx", "sl": "en", "tl": "zh-CN", "dt": "t", "q": text})
+        try:
+            status, data = self.http.request("GET", f"{self.endpoint}?{query}", headers={"User-Agent": "Mozilla/5.0"})
+            if status != 200:
+                return None
+            payload = json.loads(data.decode("utf-8", errors="ignore"))
+            rows = payload[0] if isinstance(payload, list) and payload else []
+            translated = "".join(str(row[0]) for row in rows if isinstance(row, list) and row and row[0])
+            return translated.strip() or None
+        except Exception:
+            return None
+
+    def translate_batch(self, texts: list[str]) -> list[str | None]:
+        if len(texts) == 1:
+            return [self._translate_text(texts[0])]
+        # One sentence per line; the service keeps line breaks, so the reply splits back line by line.
+        joined = self._translate_text("\n".join(texts))
+        if joined is not None:
+            lines = [line.strip() for line in joined.split("\n")]
+            if len(lines) == len(texts) and all(lines):
+                return lines
+        # Line structure did not survive; translate each sentence on its own.
+        self.fallbacks += 1
+        return [self._translate_text(t) for t in texts]
+
+    def stats(self) -> dict:
+        return {"requests": self.http.requests, "connections": self.http.connections, "split_fallbacks": self.fallbacks}
+
+    def close(self) -> None:
+        self.http.close()
+
+
+TRANSLATION_PROVIDERS = {"google_gtx": GoogleGtxProvider}
+
+
+def create_translation_provider(name: str | None = None) -> TranslationProvider:
+    name = name or os.getenv("COURSE_PIPELINE_TRANSLATE_PROVIDER", "google_gtx")
+    if name not in TRANSLATION_PROVIDERS:
+        raise RuntimeError(f"STEP_FAILED:unknown_translate_provider:{name}")
+    return TRANSLATION_PROVIDERS[name]()
+
+
+def pack_translation_batches(texts: list[str], max_chars: int, max_items: int) -> list[list[int]]:
+    """Group text indexes into batches whose joined length stays under max_chars."""
+    batches: list[list[int]] = []
+    current: list[int] = []
+    size = 0
+    for idx, text in enumerate(texts):
+        cost = len(text) + 1
+        if current and (size + cost > max_chars or len(current) >= max_items):
+            batches.append(current)
+            current, size = [], 0
+        current.append(idx)
+        size += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def translate_batch_en_to_zh(
+    texts: list[str],
+    provider: TranslationProvider,
+    concurrency: int | None = None,
+    max_chars: int | None = None,
+    max_items: int | None = None,
+) -> list[str | None]:
+    results: list[str | None] = [None] * len(texts)
+    pending = []
+    for idx, text in enumerate(texts):
+        value = " ".join((text or "").split())
+        if value and not is_pending_text(value):
+            pending.append((idx, value))
+    if not pending:
+        return results
+
+    if concurrency is None:
+        concurrency = int(os.getenv("COURSE_PIPELINE_TRANSLATE_CONCURRENCY", "4"))
+    if max_chars is None:
+        max_chars = int(os.getenv("COURSE_PIPELINE_TRANSLATE_BATCH_CHARS", "1800"))
+    if max_items is None:
+        max_items = int(os.getenv("COURSE_PIPELINE_TRANSLATE_BATCH_SIZE", "50"))
+
+    values = [value for _, value in pending]
+    batches = pack_translation_batches(values, max_chars, max_items)
+
+    def run(batch: list[int]) -> list[str | None]:
+        return provider.translate_batch([values[i] for i in batch])
+
+    workers = max(1, min(concurrency, len(batches)))
+    if workers == 1:
+        batch_results = [run(b) for b in batches]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            batch_results = list(pool.map(run, batches))
+
+    for batch, translated in zip(batches, batch_results):
+        for i, value in zip(batch, translated):
+            results[pending[i][0]] = value
+    return results
+
+
+TM_PRIORITY = {"machine": 1, "hitl": 2}
+
+
+def translation_memory_path(runtime_dir: Path) -> Path:
+    return cache_root(runtime_dir) / "translation_memory.sqlite3"
+
+
+def translation_memory_enabled() -> bool:
+    return os.getenv("COURSE_PIPELINE_TM", "1").strip().lower() not in {"0", "false", "off", "no"}
+
+
+def open_translation_memory(db_path: Path) -> sqlite3.Connection:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path), timeout=30, isolation_level=None, check_same_thread=False)
+    conn.execute(f"PRAGMA journal_mode={sqlite_journal_mode()}")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS translation_memory ("
+        "key TEXT PRIMARY KEY, en TEXT NOT NULL, zh TEXT NOT NULL, origin TEXT NOT NULL, "
+        "priority INTEGER NOT NULL, updated_at REAL NOT NULL)"
+    )
+    return conn
+
+
+def tm_normalize(en: str) -> str:
+    text = (en or "").replace("\u2019", "'").replace("\u2018", "'").replace("\u201c", '"').replace("\u201d", '"')
+    return " ".join(text.split()).casefold()
+
+
+def tm_lookup(conn: sqlite3.Connection, texts: list[str]) -> dict[str, str]:
+    keys = sorted({tm_normalize(t) for t in texts if tm_normalize(t)})
+    found: dict[str, str] = {}
+    for i in range(0, len(keys), 500):
+        chunk = keys[i : i + 500]
+        placeholders = ",".join("?" for _ in chunk)
+        rows = conn.execute(f"SELECT key, zh FROM translation_memory WHERE key IN ({placeholders})", chunk)
+        found.update({k: zh for k, zh in rows})
+    return found
+
+
+def tm_record(conn: sqlite3.Connection, pairs: list[tuple[str, str]], origin: str) -> int:
+    """Store (en, zh) pairs. An entry is only replaced by one of equal or higher priority."""
+    now = time.time()
+    rows = [
+        (tm_normalize(en), en, zh, origin, TM_PRIORITY[origin], now)
+        for en, zh in pairs
+        if tm_normalize(en) and not is_pending_text(en) and not is_pending_text(zh)
+    ]
+    if not rows:
+        return 0
+    conn.execute("BEGIN")
+    conn.executemany(
+        "INSERT INTO translation_memory (key, en, zh, origin, priority, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET en = excluded.en, zh = excluded.zh, origin = excluded.origin, "
+        "priority = excluded.priority, updated_at = excluded.updated_at "
+        "WHERE excluded.priority >= translation_memory.priority",
+        rows,
+    )
+    conn.execute("COMMIT")
+    return len(rows)
+
+
+def translate_en_to_zh_ai(text: str) -> str | None:
+    provider = create_translation_provider()
+    try:
+        return translate_batch_en_to_zh([text], provider, concurrency=1)[0]
+    finally:
+        provider.close()
+
+
+def is_pending_ipa(value: str) -> bool:
+    text = (value or "").strip().lower()
+    if not text:
+        return True
+    return "[pending]" in text or "[ipa pending]" in text
+
+
+def ipa_cache_path(runtime_dir: Path) -> Path:
+    return cache_root(runtime_dir) / "ipa_cache.sqlite3"
+
+
+def open_ipa_cache(db_path: Path) -> sqlite3.Connection:
+    """Open the shared IPA cache. WAL mode (outside COURSE_PIPELINE_SHARED_FS) lets concurrent CLI runs read while one writes."""
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path), timeout=30, isolation_level=None, check_same_thread=False)
+    conn.execute(f"PRAGMA journal_mode={sqlite_journal_mode()}")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS ipa_cache (word TEXT PRIMARY KEY, ipa TEXT, fetched_at REAL NOT NULL)")
+    return conn
+
+
+def ipa_cache_ttl_seconds(negative: bool) -> float:
+    if negative:
+        days = float(os.getenv("COURSE_PIPELINE_IPA_NEGATIVE_TTL_DAYS", "7"))
+    else:
+        days = float(os.getenv("COURSE_PIPELINE_IPA_TTL_DAYS", "365"))
+    return days * 86400
+
+
+def ipa_cache_get(conn: sqlite3.Connection, word: str) -> tuple[bool, str | None]:
+    """Return (hit, ipa). A hit with ipa=None is a cached negative result."""
+    row = conn.execute("SELECT ipa, fetched_at FROM ipa_cache WHERE word = ?", (word,)).fetchone()
+    if row is None:
+        return False, None
+    ipa, fetched_at = row
+    if time.time() - float(fetched_at) > ipa_cache_ttl_seconds(negative=ipa is None):
+        return False, None
+    return True, ipa
+
+
+def ipa_cache_put(conn: sqlite3.Connection, word: str, ipa: str | None, fetched_at: float | None = None) -> None:
+    conn.execute(
+        "INSERT INTO ipa_cache (word, ipa, fetched_at) VALUES (?, ?, ?) "
+        "ON CONFLICT(word) DO UPDATE SET ipa = excluded.ipa, fetched_at = excluded.fetched_at",
+        (word, ipa, fetched_at if fetched_at is not None else time.time()),
+    )
+
+
+def lookup_word_ipa_online(word: str) -> tuple[str | None, bool]:
+    """Look up one word on dictionaryapi.dev.
+
+    Returns (ipa, definitive). Only definitive answers (found, or 404 not found) may be
+    cached persistently; timeouts and network errors must not poison the shared cache.
+    """
+    timeout = float(os.getenv("COURSE_PIPELINE_IPA_TIMEOUT", "8"))
+    base = os.getenv("COURSE_PIPELINE_IPA_ENDPOINT", "https://api.dictionaryapi.dev/api/v2/entries/en/")
+    endpoint = f"{base.rstrip('/')}/{quote(word)}"
+    req = Request(endpoint, headers={"User-Agent": "Mozilla/5.0"})
+    started = time.perf_counter()
+    try:
+        with urlopen(req, timeout=timeout) as resp:
+            payload = json.loads(resp.read().decode("utf-8", errors="ignore"))
+    except HTTPError as exc:
+        NETWORK.record(time.perf_counter() - started, ok=exc.code == 404)
+        return None, exc.code == 404
+    except Exception:
+        NETWORK.record(time.perf_counter() - started, ok=False)
+        return None, False
+    NETWORK.record(time.perf_counter() - started)
+
+    ipa: str | None = None
+    if isinstance(payload, list) and payload:
+        first = payload[0] if isinstance(payload[0], dict) else {}
+        phonetic = first.get("phonetic")
+        if isinstance(phonetic, str) and phonetic.strip():
+            ipa = phonetic.strip()
+        if not ipa:
+            for row in first.get("phonetics", []):
+                if not isinstance(row, dict):
+                    continue
+                text = row.get("text")
+                if isinstance(text, str) and text.strip():
+                    ipa = text.strip()
+                    break
+    return ipa, True
+
+
+ARPABET_TO_IPA = {
+    "AA": "ɑ",
+    "AE": "æ",
+    "AH": "ʌ",
+    "AO": "ɔ",
+    "AW": "aʊ",
+    "AY": "aɪ",
+    "EH": "ɛ",
+    "ER": "ɝ",
+    "EY": "eɪ",
+    "IH": "ɪ",
+    "IY": "i",
+    "OW": "oʊ",
+    "OY": "ɔɪ",
+    "UH": "ʊ",
+    "UW": "u",
+    "B": "b",
+    "CH": "tʃ",
+    "D": "d",
+    "DH": "ð",
+    "F": "f",
+    "G": "ɡ",
+    "HH": "h",
+    "JH": "dʒ",
+    "K": "k",
+    "L": "l",
+    "M": "m",
+    "N": "n",
+    "NG": "ŋ",
+    "P": "p",
+    "R": "ɹ",
+    "S": "s",
+    "SH": "ʃ",
+    "T": "t",
+    "TH": "θ",
+    "V": "v",
+    "W": "w",
+    "Y": "j",
+    "Z": "z",
+    "ZH": "ʒ",
+}
+# Consonant clusters that may open an English syllable; the stress mark goes before them.
+ENGLISH_ONSETS = {
+    ("S", "T", "R"), ("S", "P", "R"), ("S", "K", "R"), ("S", "P", "L"), ("S", "K", "W"),
+    ("P", "R"), ("B", "R"), ("T", "R"), ("D", "R"), ("K", "R"), ("G", "R"), ("F", "R"), ("TH", "R"), ("SH", "R"),
+    ("P", "L"), ("B", "L"), ("K", "L"), ("G", "L"), ("F", "L"), ("S", "L"),
+    ("S", "T"), ("S", "P"), ("S", "K"), ("S", "M"), ("S", "N"), ("S", "W"), ("T", "W"), ("K", "W"), ("D", "W"),
+    ("P", "Y"), ("B", "Y"), ("K", "Y"), ("F", "Y"), ("M", "Y"), ("V", "Y"), ("HH", "Y"),
+}
+ARPABET_PHONE_PATTERN = re.compile(r"^([A-Z]{1,2})([0-2])?$")
+IPA_DICT_MAGIC = b"CPIPADX1"
+IPA_DICT_HEADER = struct.Struct("<8sII")
+IPA_DICT_OFFSET = struct.Struct("<I")
+
+
+def arpabet_to_ipa(phones: list[str]) -> str | None:
+    parsed = []
+    for phone in phones:
+        m = ARPABET_PHONE_PATTERN.match(phone)
+        if not m or m.group(1) not in ARPABET_TO_IPA:
+            return None
+        parsed.append((m.group(1), m.group(2)))
+
+    symbols: list[str] = []
+    onset: list[str] = []
+    for base, stress in parsed:
+        if stress is None:
+            onset.append(base)
+            continue
+        # Keep the longest legal onset with this vowel; the rest closes the previous syllable.
+        keep = 1 if onset else 0
+        for size in (3, 2):
+            if len(onset) >= size and tuple(onset[-size:]) in ENGLISH_ONSETS:
+                keep = size
+                break
+        if not symbols:
+            keep = len(onset)
+        coda, head = onset[: len(onset) - keep], onset[len(onset) - keep :]
+        symbols.extend(ARPABET_TO_IPA[c] for c in coda)
+        symbols.append({"1": "ˈ", "2": "ˌ"}.get(stress, ""))
+        symbols.extend(ARPABET_TO_IPA[c] for c in head)
+        if base == "AH" and stress == "0":
+            symbols.append("ə")
+        elif base == "ER" and stress == "0":
+            symbols.append("ɚ")
+        else:
+            symbols.append(ARPABET_TO_IPA[base])
+        onset = []
+    symbols.extend(ARPABET_TO_IPA[c] for c in onset)
+    return "/" + "".join(symbols) + "/"
+
+
+def parse_pronunciation_line(line: str) -> tuple[str, str] | None:
+    """Parse one CMUdict line (``WORD  W ER1 D``) or one ``word<TAB>/ipa/`` line."""
+    text = line.strip()
+    if not text or text.startswith((";;;", "#")):
+        return None
+    if "\t" in text:
+        word, _, pron = text.partition("\t")
+    else:
+        word, _, pron = text.partition(" ")
+    word = re.sub(r"\(\d+\)$", "", word.strip()).lower()
+    pron = pron.strip()
+    if not pron or not WORD_PATTERN.fullmatch(word):
+        return None
+    phones = pron.split()
+    if all(ARPABET_PHONE_PATTERN.match(p) for p in phones):
+        ipa = arpabet_to_ipa(phones)
+        return (word, ipa) if ipa else None
+    return word, pron
+
+
+def build_ipa_dictionary(source: Path, output: Path) -> int:
+    """Compile a word->IPA table into a sorted binary index: header, uint32 offsets, then records."""
+    entries: dict[bytes, bytes] = {}
+    with source.open(encoding="utf-8", errors="replace") as f:
+        for line in f:
+            parsed = parse_pronunciation_line(line)
+            if parsed is None:
+                continue
+            word, ipa = parsed
+            # The first pronunciation wins; CMUdict lists alternates as WORD(1), WORD(2), ...
+            entries.setdefault(word.encode("utf-8"), ipa.encode("utf-8"))
+
+    offsets = bytearray()
+    records = bytearray()
+    for word in sorted(entries):
+        offsets += IPA_DICT_OFFSET.pack(len(records))
+        records += word + b"\t" + entries[word] + b"\n"
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(f".{output.name}.{uuid.uuid4().hex[:8]}.tmp")
+    with tmp.open("wb") as f:
+        f.write(IPA_DICT_HEADER.pack(IPA_DICT_MAGIC, len(entries), 0))
+        f.write(offsets)
+        f.write(records)
+    os.replace(tmp, output)
+    return len(entries)
+
+
+class IpaDictionary:
+    """Memory-mapped view of an index written by build_ipa_dictionary; lookups are a binary search."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = path.open("rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise
+        magic, count, _ = IPA_DICT_HEADER.unpack_from(self._mm, 0)
+        if magic != IPA_DICT_MAGIC:
+            self.close()
+            raise ValueError(f"not an IPA dictionary index: {path}")
+        self.count = count
+        self._data_at = IPA_DICT_HEADER.size + IPA_DICT_OFFSET.size * count
+
+    def _record(self, idx: int) -> tuple[bytes, int, int]:
+        start = self._data_at + IPA_DICT_OFFSET.unpack_from(self._mm, IPA_DICT_HEADER.size + IPA_DICT_OFFSET.size * idx)[0]
+        tab = self._mm.find(b"\t", start)
+        end = self._mm.find(b"\n", tab)
+        return self._mm[start:tab], tab + 1, end
+
+    def lookup(self, word: str) -> str | None:
+        key = (word or "").strip().lower().encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            candidate, start, end = self._record(mid)
+            if candidate < key:
+                lo = mid + 1
+            elif candidate > key:
+                hi = mid
+            else:
+                return self._mm[start:end].decode("utf-8")
+        return None
+
+    def close(self) -> None:
+        if not self._mm.closed:
+            self._mm.close()
+        self._file.close()
+
+
+def ipa_dictionary_path(runtime_dir: Path) -> Path:
+    override = os.getenv("COURSE_PIPELINE_IPA_DICT", "").strip()
+    return Path(override).expanduser() if override else cache_root(runtime_dir) / "ipa_dict.bin"
+
+
+def open_ipa_dictionary(path: Path) -> IpaDictionary | None:
+    if not path.exists():
+        return None
+    try:
+        return IpaDictionary(path)
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def ipa_offline_only() -> bool:
+    return os.getenv("COURSE_PIPELINE_IPA_OFFLINE", "0").strip().lower() in {"1", "true", "on", "yes"}
+
+
+def fetch_word_ipa(
+    word: str,
+    store: sqlite3.Connection | None = None,
+    dictionary: IpaDictionary | None = None,
+) -> str | None:
+    key = (word or "").strip().lower()
+    if not key:
+        return None
+    return resolve_ipa_words([key], store, concurrency=1, dictionary=dictionary).get(key)
+
+
+def resolve_ipa_words(
+    words: Iterable[str],
+    store: sqlite3.Connection | None = None,
+    concurrency: int | None = None,
+    dictionary: IpaDictionary | None = None,
+) -> dict[str, str | None]:
+    """Resolve many words at once: memory cache, offline dictionary, persistent store, then concurrent
+    online lookups.
+
+    Store reads/writes stay on the calling thread; only the network lookups run in the pool.
+    """
+    table: dict[str, str | None] = {}
+    misses: list[str] = []
+    for word in words:
+        key = (word or "").strip().lower()
+        if not key or key in table:
+            continue
+        if key in IPA_CACHE:
+            table[key] = IPA_CACHE[key]
+            continue
+        if dictionary is not None:
+            ipa = dictionary.lookup(key)
+            if ipa:
+                IPA_CACHE[key] = ipa
+                table[key] = ipa
+                continue
+        if store is not None:
+            hit, ipa = ipa_cache_get(store, key)
+            if hit:
+                IPA_CACHE[key] = ipa
+                table[key] = ipa
+                continue
+        table[key] = None
+        misses.append(key)
+
+    if not misses or ipa_offline_only():
+        return table
+
+    if concurrency is None:
+        concurrency = int(os.getenv("COURSE_PIPELINE_IPA_CONCURRENCY", "8"))
+    workers = max(1, min(concurrency, len(misses)))
+    if workers == 1:
+        results = [lookup_word_ipa_online(key) for key in misses]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lookup_word_ipa_online, misses))
+
+    for key, (ipa, definitive) in zip(misses, results):
+        table[key] = ipa
+        if definitive:
+            IPA_CACHE[key] = ipa
+        if store is not None and definitive:
+            ipa_cache_put(store, key, ipa)
+    return table
+
+
+def _ipa_token_word(token: str) -> str | None:
+    matched = WORD_PATTERN.fullmatch(token.strip(".,!?;:\"()[]{}"))
+    return matched.group(0) if matched else None
+
+
+def sentence_ipa_words(en: str) -> list[str]:
+    words = []
+    for token in (en or "").split():
+        word = _ipa_token_word(token)
+        if word:
+            words.append(word.lower())
+    return words
+
+
+def assemble_sentence_ipa(en: str, ipa_table: dict[str, str | None]) -> str:
+    text = (en or "").strip()
+    if not text:
+        return "[pending]"
+
+    has_ipa = False
+    parts: list[str] = []
+    for token in text.split():
+        word = _ipa_token_word(token)
+        ipa = ipa_table.get(word.lower()) if word else None
+        if ipa:
+            parts.append(ipa)
+            has_ipa = True
+        else:
+            parts.append(token)
+
+    if not has_ipa:
+        return "[pending]"
+    return " ".join(parts)
+
+
+def generate_sentence_ipa(
+    en: str,
+    store: sqlite3.Connection | None = None,
+    dictionary: IpaDictionary | None = None,
+) -> str:
+    return assemble_sentence_ipa(en, resolve_ipa_words(sentence_ipa_words(en), store, dictionary=dictionary))
+
+
+INFERENCE_RULES_FILE = Path(__file__).resolve().parent / "config" / "inference_rules.json"
+# lower() never produces it, so no keyword match can run from one sentence into the next.
+SENTENCE_SEPARATOR = "\x00"
+
+
+def keyword_trie_pattern(keywords: Iterable[str]) -> str:
+    """A regex matching the longest of keywords at a position, shaped as a trie.
+
+    Branches at each node start with different characters, so at most one can continue and
+    re never retries a shared prefix; stopping at a shorter keyword is tried last.
+    """
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class InferenceRules:
+    """Keyword rules from config/inference_rules.json, compiled into one regex.
+
+    Each rule set lists rules with a priority, the keywords that fire them (plain substrings
+    of the lowercased, stripped sentence) and the output fields they set. A "first" rule set
+    yields the highest-priority rule that fired, or its default; an "all" rule set yields
+    every rule that fired, in priority order, or its default if there is one.
+
+    The keywords of all rule sets form one lookahead trie pattern that reports the longest
+    keyword at every position, so overlapping keywords are all found. Each keyword maps to a
+    bitmask of the rules it fires, including those of keywords that are its prefixes.
+    """
+
+    def __init__(self, config: dict):
+        self.masks: dict[str, int] = {}
+        # name -> (select, [(rule bit, output)] by priority, default, all rule bits)
+        self.rule_sets: dict[str, tuple[str, list[tuple[int, dict]], dict | None, int]] = {}
+        for name, rule_set in config.get("rule_sets", {}).items():
+            select = rule_set.get("select", "first")
+            if select not in {"first", "all"}:
+                raise ValueError(f"rule set {name}: unknown select {select!r}")
+            if select == "first" and rule_set.get("default") is None:
+                raise ValueError(f"rule set {name}: a 'first' rule set needs a default")
+            rules = []
+            # sorted() is stable: equal priorities keep their order in the file.
+            for rule in sorted(rule_set.get("rules", []), key=lambda r: -r.get("priority", 0)):
+                keywords = [k.lower() for k in rule.get("keywords", [])]
+                if not keywords or not all(keywords) or any(SENTENCE_SEPARATOR in k for k in keywords):
+                    raise ValueError(f"rule {name}.{rule.get('name')}: keywords must be non-empty text")
+                bit = 1 << sum(len(r) for _, r, _, _ in self.rule_sets.values()) + len(rules)
+                for keyword in keywords:
+                    self.masks[keyword] = self.masks.get(keyword, 0) | bit
+                rules.append((bit, rule["output"]))
+            self.rule_sets[name] = (select, rules, rule_set.get("default"), sum(bit for bit, _ in rules))
+        own = dict(self.masks)
+        for keyword in self.masks:
+            for prefix, mask in own.items():
+                if keyword.startswith(prefix):
+                    self.masks[keyword] |= mask
+        # The separator is a branch too, so one findall over a lesson splits back into sentences.
+        self.pattern = re.compile(f"(?=({keyword_trie_pattern([*self.masks, SENTENCE_SEPARATOR])}))")
+        # Per rule set, for texts searched only until every rule of one set has fired.
+        self.set_patterns = {
+            name: re.compile(f"(?=({keyword_trie_pattern(k for k, mask in self.masks.items() if mask & bits)}))")
+            for name, (_, _, _, bits) in self.rule_sets.items()
+        }
+        self._selected: dict[tuple[str, int], list[dict]] = {}
+
+    def scan(self, texts: list[str]) -> list[int]:
+        """The bitmask of fired rules for each text, from one pass over all of them."""
+        masks = self.masks
+        fired: list[int] = []
+        current = 0
+        for keyword in self.pattern.findall(SENTENCE_SEPARATOR.join((t or "").strip().lower() for t in texts)):
+            if keyword == SENTENCE_SEPARATOR:
+                fired.append(current)
+                current = 0
+            else:
+                current |= masks[keyword]
+        if texts:
+            fired.append(current)
+        return fired
+
+    def search(self, text: str, rule_set: str) -> int:
+        """The bitmask of one rule set's fired rules in text, stopping once all have fired."""
+        pattern = self.set_patterns[rule_set]
+        bits = self.rule_sets[rule_set][3]
+        low = (text or "").strip().lower()
+        fired = 0
+        pos = 0
+        while fired & bits != bits:
+            m = pattern.search(low, pos)
+            if m is None:
+                break
+            fired |= self.masks[m.group(1)]
+            pos = m.start() + 1
+        return fired & bits
+
+    def select(self, rule_set: str, fired: int) -> list[dict]:
+        select, rules, default, bits = self.rule_sets[rule_set]
+        key = (rule_set, fired & bits)
+        cached = self._selected.get(key)
+        if cached is not None:
+            return cached
+        outputs = []
+        for bit, output in rules:
+            if fired & bit:
+                outputs.append(output)
+                if select == "first":
+                    break
+        if not outputs and default is not None:
+            outputs.append(default)
+        self._selected[key] = outputs
+        return outputs
+
+
+_INFERENCE_RULES: InferenceRules | None = None
+
+
+def inference_rules() -> InferenceRules:
+    global _INFERENCE_RULES
+    if _INFERENCE_RULES is None:
+        _INFERENCE_RULES = InferenceRules(json.loads(INFERENCE_RULES_FILE.read_text(encoding="utf-8")))
+    return _INFERENCE_RULES
+
+
+def classify_sentences(sentences: list[dict]) -> list[dict]:
+    """Grammar and usage notes for every sentence of a lesson, from one scan of its English text."""
+    rules = inference_rules()
+    # Sentences firing the same rules share their labels; only the dicts are per sentence.
+    labels: dict[int, tuple[str, list[str], dict]] = {}
+    results = []
+    for s, fired in zip(sentences, rules.scan([s.get("en", "") for s in sentences])):
+        label = labels.get(fired)
+        if label is None:
+            pattern = rules.select("grammar_pattern", fired)[0]
+            points = [pattern["point"]] + [r["point"] for r in rules.select("grammar_points", fired)]
+            label = labels[fired] = (pattern["pattern"], points[:3], rules.select("usage", fired)[0])
+        pattern, points, usage = label
+        zh = s.get("zh", "")
+        results.append(
+            {
+                "grammar": {
+                    "pattern": pattern,
+                    "points": list(points),
+                    "difficulty": "A2" if len((s.get("en") or "").split()) > 10 else "A1",
+                },
+                "usage": {
+                    "scene": usage["scene"],
+                    "tone": usage["tone"],
+                    "formality": "informal",
+                    "alternatives": [zh] if zh else [],
+                    "caution": "",
+                },
+            }
+        )
+    return results
+
+
+def infer_grammar(en: str) -> dict:
+    return classify_sentences([{"en": en}])[0]["grammar"]
+
+
+def infer_usage(en: str, zh: str) -> dict:
+    return classify_sentences([{"en": en, "zh": zh}])[0]["usage"]
+
+
+def generate_summary_and_highlights(sentences: list[dict]) -> tuple[str, list[str]]:
+    zh_texts = [str(s.get("zh", "")).strip() for s in sentences if str(s.get("zh", "")).strip()]
+    en_texts = [str(s.get("en", "")).strip() for s in sentences if str(s.get("en", "")).strip()]
+
+    preview = "；".join(zh_texts[:3]) if zh_texts else "；".join(en_texts[:2])
+    if not preview:
         preview = "本课涵盖基础日常表达。"
     summary = f"本课重点围绕日常表达与叙事句型，核心内容包括：{preview}。"
 
-    highlights: list[str] = []
-    all_en = " ".join(en_texts).lower()
-    if any(k in all_en for k in [" was ", " were ", " did ", "went ", "got "]):
-        highlights.append("一般过去时叙事表达")
-    if any(k in all_en for k in ["because", "which", "that", "when", "if"]):
-        highlights.append("从句连接词与句子扩展")
-    if any(k in all_en for k in ["?", "!"]):
-        highlights.append("疑问/感叹语气表达")
-    if not highlights:
-        highlights.append("基础陈述句与高频词汇表达")
+    # Lesson-wide features may span two sentences, so the lesson is searched as one text.
+    rules = inference_rules()
+    highlights = [r["highlight"] for r in rules.select("highlights", rules.search(" ".join(en_texts), "highlights"))]
     return summary, highlights[:3]
 
 
-def execute_step_ffmpeg(task: dict, runtime_dir: Path) -> dict:
+# Integer settings, checked up front by main() so a typo is a JSON error rather than a traceback.
+INT_ENV_KEYS = ["COURSE_PIPELINE_JOBS", "COURSE_PIPELINE_ASR_JOBS", "COURSE_PIPELINE_CPU_BUDGET"]
+
+
+def env_int(name: str, default: int) -> int:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {raw!r}") from None
+
+
+def resolve_jobs(jobs: int | None = None) -> int:
+    if jobs is None:
+        jobs = env_int("COURSE_PIPELINE_JOBS", 1)
+    return max(1, jobs)
+
+
+def ffmpeg_threads_per_job(jobs: int) -> int | None:
+    """Split the CPU budget across concurrent ffmpeg processes.
+
+    Returns None for single-job runs without an explicit budget so ffmpeg keeps its own default.
+    """
+    if jobs <= 1 and not os.getenv("COURSE_PIPELINE_CPU_BUDGET", "").strip():
+        return None
+    return max(1, cpu_budget() // jobs)
+
+
+def cpu_budget() -> int:
+    return env_int("COURSE_PIPELINE_CPU_BUDGET", os.cpu_count() or 1)
+
+
+def process_pool(workers: int, initializer=None, initargs: tuple = ()) -> ProcessPoolExecutor:
+    """A process pool whose children start from a fresh interpreter.
+
+    Steps run on worker threads, and a forked child inherits every lock another thread held
+    at that moment (task locks, event logs, a loaded model's state) with no one to release it.
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=initializer, initargs=initargs
+    )
+
+
+def _ffmpeg_thread_args(threads: int | None) -> list[str]:
+    return ["-threads", str(threads)] if threads else []
+
+
+def normalize_video_args() -> list[str]:
+    # Normalize video to iOS-friendly H.264/AAC to avoid green frames/artifacts.
+    return [
+        "-c:v",
+        "libx264",
+        "-pix_fmt",
+        "yuv420p",
+        "-profile:v",
+        "high",
+        "-level:v",
+        "4.1",
+        "-preset",
+        "veryfast",
+        "-crf",
+        "22",
+        "-movflags",
+        "+faststart",
+        "-c:a",
+        "aac",
+        "-b:a",
+        "128k",
+    ]
+
+
+def remux_video_args() -> list[str]:
+    return ["-c", "copy", "-movflags", "+faststart"]
+
+
+def stream_copy_enabled() -> bool:
+    return os.getenv("COURSE_PIPELINE_STREAM_COPY", "1").strip().lower() not in {"0", "false", "off", "no"}
+
+
+def audio_16k_args() -> list[str]:
+    return ["-ac", "1", "-ar", "16000"]
+
+
+def cache_root(runtime_dir: Path) -> Path:
+    return runtime_dir.parent / "cache"
+
+
+def transcode_cache_enabled() -> bool:
+    return os.getenv("COURSE_PIPELINE_TRANSCODE_CACHE", "1").strip().lower() not in {"0", "false", "off", "no"}
+
+
+def transcode_cache_max_bytes() -> int:
+    return int(os.getenv("COURSE_PIPELINE_TRANSCODE_CACHE_MAX_BYTES", str(20 * 1024**3)))
+
+
+def file_sha256(path: Path, chunk_size: int = 4 * 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_fingerprint(media_file: Path, cache_dir: Path) -> str:
+    """Return the content hash of a source file.
+
+    The hash is remembered against (size, mtime, inode), so unchanged sources are never re-read.
+    """
+    st = media_file.stat()
+    stamp = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "inode": st.st_ino}
+    path_key = hashlib.sha1(str(media_file.resolve()).encode("utf-8")).hexdigest()
+    record_file = cache_dir / "fingerprints" / f"{path_key}.json"
+    try:
+        record = json.loads(record_file.read_text(encoding="utf-8"))
+        if record.get("stamp") == stamp and record.get("sha256"):
+            return record["sha256"]
+    except (OSError, ValueError):
+        pass
+    digest = file_sha256(media_file)
+    write_json_atomic(record_file, {"path": str(media_file), "stamp": stamp, "sha256": digest})
+    return digest
+
+
+def transcode_cache_key(source_sha256: str, argv: list) -> str:
+    blob = json.dumps({"source": source_sha256, "argv": argv}, sort_keys=True)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    ficlone = 0x40049409
+    try:
+        with src.open("rb") as s, dst.open("wb") as d:
+            fcntl.ioctl(d.fileno(), ficlone, s.fileno())
+        return True
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return False
+
+
+COPY_CHUNK_BYTES = 1024 * 1024
+
+
+def _copy_file_range(src: Path, dst: Path) -> bool:
+    if not hasattr(os, "copy_file_range"):
+        return False
+    try:
+        with src.open("rb") as s, dst.open("wb") as d:
+            remaining = os.fstat(s.fileno()).st_size
+            while remaining > 0:
+                sent = os.copy_file_range(s.fileno(), d.fileno(), min(remaining, COPY_CHUNK_BYTES * 64))
+                if sent == 0:
+                    break
+                remaining -= sent
+        if remaining == 0:
+            return True
+    except OSError:
+        pass
+    dst.unlink(missing_ok=True)
+    return False
+
+
+def _streamed_copy(src: Path, dst: Path) -> None:
+    with src.open("rb") as s, dst.open("wb") as d:
+        shutil.copyfileobj(s, d, COPY_CHUNK_BYTES)
+
+
+def placed_file_matches(src: Path, dst: Path) -> bool:
+    """True when dst already holds src's bytes: same inode, or same size with equal mtime or hash."""
+    try:
+        s, d = src.stat(), dst.stat()
+    except OSError:
+        return False
+    if (s.st_dev, s.st_ino) == (d.st_dev, d.st_ino):
+        return True
+    if s.st_size != d.st_size:
+        return False
+    if s.st_mtime_ns == d.st_mtime_ns:
+        return True
+    if file_sha256(src) != file_sha256(dst):
+        return False
+    # Same bytes, stale stamp: adopt src's mtime so the next check stays stat-only.
+    os.utime(dst, ns=(s.st_atime_ns, s.st_mtime_ns))
+    return True
+
+
+def place_file(src: Path, dst: Path, link: bool = True) -> tuple[str, int]:
+    """Place src at dst without buffering it in memory. Returns (method, bytes).
+
+    Tries hardlink (when link is set), then reflink, then copy_file_range, then a chunked
+    copy. A destination that already matches is left alone and reported as "skipped".
+    """
+    size = src.stat().st_size
+    if placed_file_matches(src, dst):
+        return "skipped", size
+    dst.unlink(missing_ok=True)
+    if link:
+        try:
+            os.link(src, dst)
+            return "hardlink", size
+        except OSError:
+            pass
+    if _reflink(src, dst):
+        method = "reflink"
+    elif _copy_file_range(src, dst):
+        method = "copy_file_range"
+    else:
+        _streamed_copy(src, dst)
+        method = "copy"
+    st = src.stat()
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+    return method, size
+
+
+def new_placement_stats() -> dict:
+    return {"bytes_linked": 0, "bytes_copied": 0, "bytes_skipped": 0, "files": {}}
+
+
+def record_placement(stats: dict, method: str, size: int) -> None:
+    if method in {"hardlink", "reflink"}:
+        stats["bytes_linked"] += size
+    elif method == "skipped":
+        stats["bytes_skipped"] += size
+    else:
+        stats["bytes_copied"] += size
+    stats["files"][method] = stats["files"].get(method, 0) + 1
+
+
+def transcode_cache_fetch(cache_dir: Path, key: str, dst_dir: Path, names: list[str]) -> dict | None:
+    entry = cache_dir / "transcode" / key
+    meta_file = entry / "meta.json"
+    try:
+        meta = json.loads(meta_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not all((entry / name).exists() for name in names):
+        return None
+    try:
+        for name in names:
+            place_file(entry / name, dst_dir / name)
+        # meta.json mtime is the LRU clock.
+        os.utime(meta_file)
+    except OSError:
+        return None
+    return meta
+
+
+def transcode_cache_store(cache_dir: Path, key: str, files: list[Path], meta: dict) -> None:
+    transcode_dir = cache_dir / "transcode"
+    entry = transcode_dir / key
+    if entry.exists():
+        return
+    tmp = transcode_dir / f".tmp_{key}_{uuid.uuid4().hex[:8]}"
+    tmp.mkdir(parents=True, exist_ok=True)
+    try:
+        for f in files:
+            place_file(f, tmp / f.name)
+        total = sum((tmp / f.name).stat().st_size for f in files)
+        write_json_atomic(tmp / "meta.json", {**meta, "bytes": total, "created_at": now_iso()})
+        os.rename(tmp, entry)
+    except OSError:
+        # Another worker stored the same key first, or the cache dir is unusable.
+        shutil.rmtree(tmp, ignore_errors=True)
+        return
+    evict_transcode_cache(cache_dir, transcode_cache_max_bytes())
+
+
+def evict_transcode_cache(cache_dir: Path, max_bytes: int) -> list[str]:
+    transcode_dir = cache_dir / "transcode"
+    if not transcode_dir.exists():
+        return []
+    entries = []
+    for entry in transcode_dir.iterdir():
+        meta_file = entry / "meta.json"
+        if entry.name.startswith(".") or not meta_file.exists():
+            continue
+        try:
+            size = int(json.loads(meta_file.read_text(encoding="utf-8")).get("bytes", 0))
+            entries.append((meta_file.stat().st_mtime, entry, size))
+        except (OSError, ValueError):
+            continue
+    total = sum(size for _, _, size in entries)
+    evicted = []
+    for _, entry, size in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+        evicted.append(entry.name)
+    return evicted
+
+
+def ffmpeg_single_pass_enabled() -> bool:
+    return os.getenv("COURSE_PIPELINE_FFMPEG_SINGLE_PASS", "1").strip().lower() not in {"0", "false", "off", "no"}
+
+
+def ffmpeg_lesson_commands(
+    ext: str,
+    src: str,
+    media_out: str,
+    wav_out: str,
+    single_pass: bool,
+    threads: int | None = None,
+    remux: bool = False,
+) -> list[list[str]]:
+    thread_args = _ffmpeg_thread_args(threads)
+    video_args = remux_video_args() if remux else [*thread_args, *normalize_video_args()]
+    if single_pass:
+        # One demux/decode feeds both outputs. Each output keeps ffmpeg's default stream
+        # selection, so embedded subtitles still pass through into media.mp4.
+        if ext == "mp4":
+            return [["ffmpeg", "-y", "-i", src, *video_args, media_out, *thread_args, *audio_16k_args(), wav_out]]
+        return [["ffmpeg", "-y", "-i", src, *thread_args, *audio_16k_args(), wav_out]]
+
+    cmds = []
+    if ext == "mp4":
+        cmds.append(["ffmpeg", "-y", "-i", src, *video_args, media_out])
+    cmds.append(["ffmpeg", "-y", "-i", media_out, *thread_args, *audio_16k_args(), wav_out])
+    return cmds
+
+
+def wav_duration_ms(wav_file: Path) -> int | None:
+    try:
+        with wave.open(str(wav_file), "rb") as w:
+            frames = w.getnframes()
+            rate = w.getframerate()
+    except (OSError, EOFError, wave.Error):
+        return None
+    if rate <= 0 or frames <= 0:
+        return None
+    return int(frames * 1000 / rate)
+
+
+def process_ffmpeg_lesson(
+    raw_folder: Path,
+    output_root: Path,
+    key: str,
+    threads: int | None = None,
+    cache_dir: Path | None = None,
+    single_pass: bool = False,
+    stream_copy: bool = False,
+) -> dict:
+    # Measured inside the pool worker, which runs one lesson at a time, so child CPU is this lesson's ffmpeg/ffprobe runs.
+    before = resource_snapshot()
+    result = _process_ffmpeg_lesson(raw_folder, output_root, key, threads, cache_dir, single_pass, stream_copy)
+    result["metrics"] = resource_delta(before)
+    return result
+
+
+def _process_ffmpeg_lesson(
+    raw_folder: Path,
+    output_root: Path,
+    key: str,
+    threads: int | None = None,
+    cache_dir: Path | None = None,
+    single_pass: bool = False,
+    stream_copy: bool = False,
+) -> dict:
+    media = find_media_for_key(raw_folder, key)
+    if media is None:
+        raise RuntimeError(f"STEP_FAILED:missing_media:{key}")
+    lesson_dir = output_root / key
+    lesson_dir.mkdir(parents=True, exist_ok=True)
+
+    ext = media.suffix.lower().lstrip(".")
+    normalized_media = lesson_dir / f"media.{ext}"
+    wav_path = lesson_dir / "audio_16k.wav"
+    probe_cache = lesson_dir / MEDIA_PROBE_FILE
+    source_probe = media_probe(media, probe_cache) if ext == "mp4" and stream_copy else None
+    remux = source_probe is not None and stream_copy_compatible(source_probe)
+    media_path = "remux" if remux else ("transcode" if ext == "mp4" else "copy")
+
+    cache_key = None
+    if cache_dir is not None:
+        # -threads is left out of the key: it changes speed, not the requested encoding.
+        argv = ffmpeg_lesson_commands(ext, "{src}", "{media}", "{wav}", single_pass, remux=remux)
+        cache_key = transcode_cache_key(source_fingerprint(media, cache_dir), [ext, argv])
+        meta = transcode_cache_fetch(cache_dir, cache_key, lesson_dir, [normalized_media.name, wav_path.name])
+        if meta is not None:
+            result = {
+                "lesson_id": key,
+                "media": str(normalized_media),
+                "audio_16k": str(wav_path),
+                "duration_ms": int(meta.get("duration_ms", 0)),
+                "path": media_path,
+                "cache": "hit",
+            }
+            if source_probe is not None:
+                result["source_codecs"] = probe_codecs(source_probe)
+            return result
+
+    # Outputs may be hardlinks into the cache from an earlier run; never write through them.
+    normalized_media.unlink(missing_ok=True)
+    wav_path.unlink(missing_ok=True)
+    placement = None
+    if ext != "mp4":
+        # No hardlink: the transcode cache links this file, and the raw source stays the user's to edit.
+        placement, _ = place_file(media, normalized_media, link=False)
+    for cmd in ffmpeg_lesson_commands(ext, str(media), str(normalized_media), str(wav_path), single_pass, threads, remux):
+        subprocess.run(cmd, check=True, capture_output=True, text=True)
+
+    duration_ms = wav_duration_ms(wav_path) if single_pass else None
+    if duration_ms is None:
+        duration_ms = probe_duration_ms(media_probe(normalized_media, probe_cache))
+    if cache_key is not None:
+        transcode_cache_store(cache_dir, cache_key, [normalized_media, wav_path], {"duration_ms": duration_ms})
+    result = {
+        "lesson_id": key,
+        "media": str(normalized_media),
+        "audio_16k": str(wav_path),
+        "duration_ms": duration_ms,
+        "path": media_path,
+        "cache": "miss" if cache_key is not None else "disabled",
+    }
+    if placement is not None:
+        result["placement"] = placement
+    if source_probe is not None:
+        result["source_codecs"] = probe_codecs(source_probe)
+    return result
+
+
+def _ffmpeg_lesson_error(key: str, exc: Exception) -> RuntimeError:
+    message = str(exc)
+    if message.startswith("STEP_FAILED:"):
+        return RuntimeError(message)
+    if isinstance(exc, subprocess.CalledProcessError):
+        stderr_lines = (exc.stderr or "").strip().splitlines()
+        detail = stderr_lines[-1] if stderr_lines else f"exit status {exc.returncode}"
+        return RuntimeError(f"STEP_FAILED:ffmpeg_failed:{key}:{detail}")
+    return RuntimeError(f"STEP_FAILED:ffmpeg_failed:{key}:{message}")
+
+
+def _count_cache_hits(lessons: list[dict]) -> int:
+    return sum(1 for lesson in lessons if lesson.get("cache") == "hit")
+
+
+def _count_media_paths(lessons: list[dict]) -> dict:
+    counts: dict[str, int] = {}
+    for lesson in lessons:
+        path = lesson.get("path", "")
+        counts[path] = counts.get(path, 0) + 1
+    return counts
+
+
+def execute_step_ffmpeg(task: dict, runtime_dir: Path, jobs: int | None = None) -> dict:
     if which("ffmpeg") is None or which("ffprobe") is None:
         raise RuntimeError("FFMPEG_NOT_FOUND")
 
     raw_folder = Path(task["course_path"])
     output_root = runtime_dir / task["task_id"] / "artifacts"
     output_root.mkdir(parents=True, exist_ok=True)
+    lesson_keys = list(task.get("lesson_keys", []))
+    jobs = min(resolve_jobs(jobs), max(1, len(lesson_keys)))
+    threads = ffmpeg_threads_per_job(jobs)
+    cache_dir = cache_root(runtime_dir) if transcode_cache_enabled() else None
+    single_pass = ffmpeg_single_pass_enabled()
+    mode = "single_pass" if single_pass else "two_pass"
+    stream_copy = stream_copy_enabled()
     lessons = []
 
+    if jobs <= 1:
+        for key in lesson_keys:
+            try:
+                lessons.append(process_ffmpeg_lesson(raw_folder, output_root, key, threads, cache_dir, single_pass, stream_copy))
+            except Exception as exc:
+                raise _ffmpeg_lesson_error(key, exc) from exc
+        return {
+            "lessons": lessons,
+            "jobs": jobs,
+            "mode": mode,
+            "cache_hits": _count_cache_hits(lessons),
+            "media_paths": _count_media_paths(lessons),
+        }
+
+    # Lessons run concurrently, but results are collected in key order so the
+    # payload is identical to a sequential run and the first failing key wins.
+    pool = process_pool(jobs)
+    try:
+        futures = [
+            (
+                key,
+                pool.submit(
+                    process_ffmpeg_lesson, raw_folder, output_root, key, threads, cache_dir, single_pass, stream_copy
+                ),
+            )
+            for key in lesson_keys
+        ]
+        for key, future in futures:
+            try:
+                lessons.append(future.result())
+            except Exception as exc:
+                raise _ffmpeg_lesson_error(key, exc) from exc
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    return {
+        "lessons": lessons,
+        "jobs": jobs,
+        "threads_per_job": threads,
+        "mode": mode,
+        "cache_hits": _count_cache_hits(lessons),
+        "media_paths": _count_media_paths(lessons),
+    }
+
+
+def execute_step_asr(task: dict, runtime_dir: Path, jobs: int | None = None) -> dict:
+    raw_folder = Path(task["course_path"])
+    output_root = runtime_dir / task["task_id"] / "artifacts"
+    lessons = []
+    meter = LessonMeter()
+    pending_whisper: list[tuple[str, Path, Path]] = []
+
     for key in task.get("lesson_keys", []):
-        media = find_media_for_key(raw_folder, key)
-        if media is None:
-            raise RuntimeError(f"STEP_FAILED:missing_media:{key}")
-        lesson_dir = output_root / key
-        lesson_dir.mkdir(parents=True, exist_ok=True)
-
-        ext = media.suffix.lower().lstrip(".")
-        # Normalize video to iOS-friendly H.264/AAC to avoid green frames/artifacts.
-        if ext == "mp4":
-            normalized_media = lesson_dir / "media.mp4"
-            normalize_cmd = [
-                "ffmpeg",
-                "-y",
-                "-i",
-                str(media),
-                "-c:v",
-                "libx264",
-                "-pix_fmt",
-                "yuv420p",
-                "-profile:v",
-                "high",
-                "-level:v",
-                "4.1",
-                "-preset",
-                "veryfast",
-                "-crf",
-                "22",
-                "-movflags",
-                "+faststart",
-                "-c:a",
-                "aac",
-                "-b:a",
-                "128k",
-                str(normalized_media),
-            ]
-            subprocess.run(normalize_cmd, check=True, capture_output=True, text=True)
+        with meter.lesson(key):
+            lesson_dir = output_root / key
+            lesson_dir.mkdir(parents=True, exist_ok=True)
+            provided_en = raw_folder / f"{key}.en.srt"
+            out_en = lesson_dir / "sub_en.srt"
+            media_mp4 = lesson_dir / "media.mp4"
+            if provided_en.exists():
+                out_en.write_text(provided_en.read_text(encoding="utf-8"), encoding="utf-8")
+                source = "provided"
+            else:
+                source = "placeholder"
+                extracted = False
+                if media_mp4.exists():
+                    extracted, source = extract_embedded_subtitle_to_srt(media_mp4, out_en, lesson_dir / MEDIA_PROBE_FILE)
+                if not extracted:
+                    audio_16k = lesson_dir / "audio_16k.wav"
+                    if audio_16k.exists():
+                        # Transcribed below, all lessons with one model load.
+                        pending_whisper.append((key, audio_16k, out_en))
+                    else:
+                        write_asr_placeholder(out_en)
+            lessons.append({"lesson_id": key, "sub_en": str(out_en), "source": source})
+
+    chunked, pending_whisper = transcribe_long_lessons(pending_whisper, meter, jobs)
+    transcribed, whisper_stats = transcribe_lessons_with_whisper(pending_whisper, meter)
+    transcribed.update({key: (ok, source) for key, (ok, source, _) in chunked.items()})
+    decode_ms = whisper_stats.get("decode_ms", {})
+    for lesson in lessons:
+        key = lesson["lesson_id"]
+        if key not in transcribed:
+            continue
+        ok, lesson["source"] = transcribed[key]
+        if key in chunked:
+            lesson["chunked"] = chunked[key][2]
+        if not ok:
+            with meter.lesson(key):
+                write_asr_placeholder(Path(lesson["sub_en"]))
+        elif key in decode_ms:
+            lesson["decode_ms"] = decode_ms[key]
+
+    payload = {"lessons": meter.attach(lessons)}
+    if whisper_stats:
+        payload["whisper"] = {k: v for k, v in whisper_stats.items() if k != "decode_ms"}
+        if decode_ms:
+            payload["whisper"]["decode_ms"] = round(sum(decode_ms.values()), 1)
+    return payload
+
+
+def transcribe_long_lessons(
+    items: list[tuple[str, Path, Path]], meter: LessonMeter, jobs: int | None = None
+) -> tuple[dict[str, tuple[bool, str, dict]], list[tuple[str, Path, Path]]]:
+    """Transcribe long lessons chunk-parallel; returns their results and the items left to transcribe whole."""
+    mode = asr_chunk_mode()
+    workers = asr_chunk_jobs(jobs)
+    np = _import_numpy() if mode != "off" else None
+    if np is None or (mode == "auto" and workers < 2):
+        return {}, items
+    min_ms = asr_chunk_min_seconds() * 1000 if mode == "auto" else 0
+    chunked: dict[str, tuple[bool, str, dict]] = {}
+    remaining = []
+    for key, audio_file, out_srt in items:
+        if (wav_duration_ms(audio_file) or 0) < min_ms:
+            remaining.append((key, audio_file, out_srt))
+            continue
+        with meter.lesson(key):
+            try:
+                result = transcribe_chunked_lesson(np, audio_file, out_srt, workers)
+            except (OSError, EOFError, ValueError, wave.Error):
+                result = None
+        if result is None:
+            remaining.append((key, audio_file, out_srt))
         else:
-            normalized_media = lesson_dir / f"media.{ext}"
-            normalized_media.write_bytes(media.read_bytes())
-
-        wav_path = lesson_dir / "audio_16k.wav"
-        cmd = [
-            "ffmpeg",
-            "-y",
-            "-i",
-            str(normalized_media),
-            "-ac",
-            "1",
-            "-ar",
-            "16000",
-            str(wav_path),
-        ]
-        subprocess.run(cmd, check=True, capture_output=True, text=True)
-        duration_ms = ffprobe_duration_ms(normalized_media)
-        lessons.append(
+            chunked[key] = result
+    return chunked, remaining
+
+
+def write_asr_placeholder(out_en: Path) -> None:
+    # Placeholder ASR output for MVP skeleton.
+    write_srt(
+        out_en,
+        [
             {
-                "lesson_id": key,
-                "media": str(normalized_media),
-                "audio_16k": str(wav_path),
-                "duration_ms": duration_ms,
+                "start_ms": 0,
+                "end_ms": 3000,
+                "text": "[ASR pending] Please replace with real transcript.",
             }
-        )
+        ],
+    )
 
-    return {"lessons": lessons}
 
+ALIGNMENT_FILE = "alignment.json"
+# Two cues pair when they share this much of the shorter one; less is timing bleed between neighbours.
+ALIGN_MIN_OVERLAP = 0.3
 
-def execute_step_asr(task: dict, runtime_dir: Path) -> dict:
+
+def cues_overlap(a: dict, b: dict) -> bool:
+    overlap = min(a["end_ms"], b["end_ms"]) - max(a["start_ms"], b["start_ms"])
+    if overlap <= 0:
+        return False
+    shorter = min(a["end_ms"] - a["start_ms"], b["end_ms"] - b["start_ms"])
+    return overlap >= ALIGN_MIN_OVERLAP * max(shorter, 1)
+
+
+def align_cues_by_overlap(en: list[dict], zh: list[dict]) -> list[dict]:
+    """Group English and Chinese cues that overlap in time, in one sweep over both lists.
+
+    Cues are visited in start order, merging the two lists like a merge sort. A cue joins
+    the open group when it overlaps the other language's cue there that ends last, so one
+    line subtitled as two cues (1:N) or two lines under one cue (N:1) land in one group.
+    Each group is {"en": [...], "zh": [...]} of cue indices; an unmatched cue gets a group
+    of its own with the other side empty, and never shifts the pairs after it.
+    """
+    sides = (en, zh)
+    orders = [sorted(range(len(cues)), key=lambda i, cues=cues: cues[i]["start_ms"]) for cues in sides]
+    groups: list[dict] = []
+    group: dict | None = None
+    # Per side, the index of the open group's cue that ends last.
+    reach: list[int | None] = [None, None]
+    pos = [0, 0]
+    while pos[0] < len(en) or pos[1] < len(zh):
+        if pos[1] >= len(zh) or (pos[0] < len(en) and en[orders[0][pos[0]]]["start_ms"] <= zh[orders[1][pos[1]]]["start_ms"]):
+            side = 0
+        else:
+            side = 1
+        idx = orders[side][pos[side]]
+        pos[side] += 1
+        cue = sides[side][idx]
+        other = reach[1 - side]
+        if group is None or other is None or not cues_overlap(cue, sides[1 - side][other]):
+            group = {"en": [], "zh": []}
+            groups.append(group)
+            reach = [None, None]
+        group["en" if side == 0 else "zh"].append(idx)
+        if reach[side] is None or cue["end_ms"] > sides[side][reach[side]]["end_ms"]:
+            reach[side] = idx
+    return groups
+
+
+def alignment_kind(group: dict) -> str:
+    if not group["zh"]:
+        return "en_only"
+    if not group["en"]:
+        return "zh_only"
+    return f"{'1' if len(group['en']) == 1 else 'N'}:{'1' if len(group['zh']) == 1 else 'N'}"
+
+
+def build_alignment_map(en: list[dict], zh: list[dict]) -> dict:
+    groups = []
+    stats: dict[str, int] = {}
+    for group in align_cues_by_overlap(en, zh):
+        kind = alignment_kind(group)
+        stats[kind] = stats.get(kind, 0) + 1
+        zh_text = " ".join(t for t in (zh[j]["text"].strip() for j in group["zh"]) if t)
+        groups.append({**group, "kind": kind, "zh_text": zh_text})
+    return {"en_cues": len(en), "zh_cues": len(zh), "groups": groups, "stats": stats}
+
+
+def load_alignment(path: Path, sub_en: Path) -> dict | None:
+    """The alignment map for sub_en, or None if it is missing or was built from another transcript."""
+    try:
+        alignment = json.loads(path.read_text(encoding="utf-8"))
+        if alignment.get("sub_en_sha256") != file_sha256(sub_en):
+            return None
+    except (OSError, ValueError):
+        return None
+    return alignment
+
+
+def zh_for_en_cues(alignment: dict) -> list[tuple[str, str]]:
+    """(zh text, alignment kind) per English cue; every line of an N:1 group shares the one zh cue."""
+    paired = [("", "en_only")] * alignment["en_cues"]
+    for group in alignment["groups"]:
+        for idx in group["en"]:
+            paired[idx] = (group["zh_text"], group["kind"])
+    return paired
+
+
+def execute_step_align(task: dict, runtime_dir: Path) -> dict:
     raw_folder = Path(task["course_path"])
     output_root = runtime_dir / task["task_id"] / "artifacts"
     lessons = []
+    meter = LessonMeter()
 
     for key in task.get("lesson_keys", []):
-        lesson_dir = output_root / key
-        lesson_dir.mkdir(parents=True, exist_ok=True)
-        provided_en = raw_folder / f"{key}.en.srt"
-        out_en = lesson_dir / "sub_en.srt"
-        media_mp4 = lesson_dir / "media.mp4"
-        if provided_en.exists():
-            out_en.write_text(provided_en.read_text(encoding="utf-8"), encoding="utf-8")
-            source = "provided"
-        else:
-            source = "placeholder"
-            extracted = False
-            if media_mp4.exists():
-                extracted, source = extract_embedded_subtitle_to_srt(media_mp4, out_en)
-            if not extracted:
-                audio_16k = lesson_dir / "audio_16k.wav"
-                if audio_16k.exists():
-                    extracted, source = transcribe_with_whisper_to_srt(audio_16k, out_en)
-                if not extracted:
-                    # Placeholder ASR output for MVP skeleton.
-                    write_srt(
-                        out_en,
-                        [
-                            {
-                                "start_ms": 0,
-                                "end_ms": 3000,
-                                "text": "[ASR pending] Please replace with real transcript.",
-                            }
-                        ],
-                    )
-        lessons.append({"lesson_id": key, "sub_en": str(out_en), "source": source})
+        with meter.lesson(key):
+            lesson_dir = output_root / key
+            lesson_dir.mkdir(parents=True, exist_ok=True)
+            provided_zh = raw_folder / f"{key}.zh.srt"
+            sub_en = lesson_dir / "sub_en.srt"
+            out_zh = lesson_dir / "sub_zh.srt"
+            if provided_zh.exists():
+                out_zh.write_text(provided_zh.read_text(encoding="utf-8"), encoding="utf-8")
+                zh_entries = parse_srt(out_zh)
+                source = "provided"
+            else:
+                # Placeholder alignment/translation output for MVP skeleton.
+                write_srt(
+                    out_zh,
+                    [
+                        {
+                            "start_ms": 0,
+                            "end_ms": 3000,
+                            "text": "[ZH pending] 请在 translate 阶段补全中文字幕。",
+                        }
+                    ],
+                )
+                # Nothing to pair against: every English line is left for translate.
+                zh_entries = []
+                source = "placeholder"
+            alignment = build_alignment_map(parse_srt(sub_en), zh_entries)
+            alignment_file = lesson_dir / ALIGNMENT_FILE
+            write_json_atomic(
+                alignment_file,
+                {
+                    "lesson_id": key,
+                    "source": source,
+                    "sub_en_sha256": file_sha256(sub_en) if sub_en.exists() else None,
+                    **alignment,
+                },
+            )
+            lessons.append(
+                {
+                    "lesson_id": key,
+                    "sub_zh": str(out_zh),
+                    "alignment": str(alignment_file),
+                    "source": source,
+                    "pairs": alignment["stats"],
+                }
+            )
+
+    return {"lessons": meter.attach(lessons)}
 
-    return {"lessons": lessons}
 
+# Sources of zh text the pipeline wrote itself; a reviewer who left it as is did not vouch for it.
+UNREVIEWED_ZH_SOURCES = {"machine", "tm_exact", "fallback"}
 
-def execute_step_align(task: dict, runtime_dir: Path) -> dict:
-    raw_folder = Path(task["course_path"])
-    output_root = runtime_dir / task["task_id"] / "artifacts"
-    lessons = []
 
-    for key in task.get("lesson_keys", []):
-        lesson_dir = output_root / key
-        lesson_dir.mkdir(parents=True, exist_ok=True)
-        provided_zh = raw_folder / f"{key}.zh.srt"
-        out_zh = lesson_dir / "sub_zh.srt"
-        if provided_zh.exists():
-            out_zh.write_text(provided_zh.read_text(encoding="utf-8"), encoding="utf-8")
-            source = "provided"
-        else:
-            # Placeholder alignment/translation output for MVP skeleton.
-            write_srt(
-                out_zh,
-                [
-                    {
-                        "start_ms": 0,
-                        "end_ms": 3000,
-                        "text": "[ZH pending] 请在 translate 阶段补全中文字幕。",
-                    }
-                ],
-            )
-            source = "placeholder"
-        lessons.append({"lesson_id": key, "sub_zh": str(out_zh), "source": source})
+def hitl_corrections(override_items: list[dict], previous_items: list[dict]) -> list[tuple[str, str]]:
+    """(en, zh) rows of a translate override that a reviewer actually changed.
 
-    return {"lessons": lessons}
+    A row counts when its zh differs from the previous effective output for that sentence,
+    or, with nothing to compare against, when it no longer carries a pipeline source.
+    """
+    previous = {item.get("sentence_id"): item for item in previous_items}
+    pairs = []
+    for item in override_items:
+        zh = item.get("zh", "")
+        if is_pending_text(zh):
+            continue
+        before = previous.get(item.get("sentence_id"))
+        if before is not None:
+            changed = zh != before.get("zh", "")
+        else:
+            changed = item.get("source") not in UNREVIEWED_ZH_SOURCES
+        if changed:
+            pairs.append((item.get("en", ""), zh))
+    return pairs
 
 
 def execute_step_translate(task: dict, runtime_dir: Path) -> dict:
+    ipa_store = open_ipa_cache(ipa_cache_path(runtime_dir))
+    ipa_dictionary = open_ipa_dictionary(ipa_dictionary_path(runtime_dir))
+    provider = create_translation_provider()
+    tm = open_translation_memory(translation_memory_path(runtime_dir)) if translation_memory_enabled() else None
+    try:
+        return _translate_lessons(task, runtime_dir, ipa_store, ipa_dictionary, provider, tm)
+    finally:
+        provider.close()
+        ipa_store.close()
+        if tm is not None:
+            tm.close()
+        if ipa_dictionary is not None:
+            ipa_dictionary.close()
+
+
+def _translate_lessons(
+    task: dict,
+    runtime_dir: Path,
+    ipa_store: sqlite3.Connection,
+    ipa_dictionary: IpaDictionary | None = None,
+    provider: TranslationProvider | None = None,
+    tm: sqlite3.Connection | None = None,
+) -> dict:
     output_root = runtime_dir / task["task_id"] / "artifacts"
     work_dir = runtime_dir / task["task_id"] / "hitl"
     work_dir.mkdir(parents=True, exist_ok=True)
-    lessons = []
+    prepared = []
+    hitl_pairs: list[tuple[str, str]] = []
+    meter = LessonMeter()
 
     for key in task.get("lesson_keys", []):
-        lesson_dir = output_root / key
-        en_entries = parse_srt(lesson_dir / "sub_en.srt")
-        zh_entries = parse_srt(lesson_dir / "sub_zh.srt")
-
-        input_items = []
-        for idx, en in enumerate(en_entries):
-            zh_text = zh_entries[idx]["text"] if idx < len(zh_entries) else ""
-            input_items.append(
-                {
-                    "sentence_id": f"{key}-{idx + 1:04d}",
-                    "start_ms": en["start_ms"],
-                    "end_ms": en["end_ms"],
-                    "en": en["text"],
-                    "zh": zh_text,
-                }
+        with meter.lesson(key):
+            lesson_dir = output_root / key
+            en_entries = parse_srt(lesson_dir / "sub_en.srt")
+            alignment = load_alignment(lesson_dir / ALIGNMENT_FILE, lesson_dir / "sub_en.srt")
+            if alignment is None:
+                # Not aligned against this transcript; sub_zh.srt is then either translate's own
+                # one-cue-per-line output or a file dropped in by hand, and pairs just as well.
+                alignment = build_alignment_map(en_entries, parse_srt(lesson_dir / "sub_zh.srt"))
+
+            input_items = []
+            for idx, (en, (zh_text, kind)) in enumerate(zip(en_entries, zh_for_en_cues(alignment))):
+                input_items.append(
+                    {
+                        "sentence_id": f"{key}-{idx + 1:04d}",
+                        "start_ms": en["start_ms"],
+                        "end_ms": en["end_ms"],
+                        "en": en["text"],
+                        "zh": zh_text,
+                        "align": kind,
+                    }
+                )
+
+            input_file = work_dir / f"{key}_translate_input.json"
+            input_file.write_text(
+                json.dumps({"lesson_id": key, "sentences": input_items}, ensure_ascii=False, indent=2),
+                encoding="utf-8",
             )
 
-        input_file = work_dir / f"{key}_translate_input.json"
-        input_file.write_text(
-            json.dumps({"lesson_id": key, "sentences": input_items}, ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
+            override_file = work_dir / f"{key}_translate_output.json"
+            override_items = None
+            if override_file.exists():
+                result = json.loads(override_file.read_text(encoding="utf-8"))
+                override_items = result.get("sentences", input_items)
+                previous_file = work_dir / f"{key}_translate_effective.json"
+                previous_items = (
+                    json.loads(previous_file.read_text(encoding="utf-8")).get("sentences", []) if previous_file.exists() else []
+                )
+                hitl_pairs.extend(hitl_corrections(override_items, previous_items))
+            else:
+                has_real_transcript = any(not is_pending_text(item.get("en", "")) for item in input_items)
+                if not has_real_transcript:
+                    raise RuntimeError(f"ASR_NOT_READY:{key}")
+            prepared.append((key, lesson_dir, input_file, input_items, override_items))
+
+    # Resolve every distinct word of the course once, concurrently, before assembling sentences.
+    words: list[str] = []
+    for _, _, _, input_items, override_items in prepared:
+        for item in override_items if override_items is not None else input_items:
+            words.extend(sentence_ipa_words(item.get("en", "")))
+    ipa_table = resolve_ipa_words(words, ipa_store, dictionary=ipa_dictionary)
+
+    tm_stats = {"lookups": 0, "hits": 0, "recorded_hitl": 0, "recorded_machine": 0}
+    if tm is not None:
+        # HITL corrections become reusable, outranking machine output for the same sentence.
+        tm_stats["recorded_hitl"] = tm_record(tm, hitl_pairs, "hitl")
+
+    pending_refs = [
+        (lesson_idx, item_idx)
+        for lesson_idx, (_, _, _, input_items, override_items) in enumerate(prepared)
+        if override_items is None
+        for item_idx, item in enumerate(input_items)
+        if is_pending_text(item.get("zh", ""))
+    ]
+    tm_zh: dict[tuple[int, int], str] = {}
+    if tm is not None and pending_refs:
+        remembered = tm_lookup(tm, [prepared[li][3][ii].get("en", "") for li, ii in pending_refs])
+        for li, ii in pending_refs:
+            zh = remembered.get(tm_normalize(prepared[li][3][ii].get("en", "")))
+            if zh:
+                tm_zh[(li, ii)] = zh
+        tm_stats["lookups"] = len(pending_refs)
+        tm_stats["hits"] = len(tm_zh)
+
+    # Machine-translate every remaining sentence of the course in packed, concurrent batches.
+    machine_refs = [ref for ref in pending_refs if ref not in tm_zh]
+    machine_zh: dict[tuple[int, int], str | None] = {}
+    if machine_refs:
+        if provider is None:
+            provider = create_translation_provider()
+        texts = [prepared[li][3][ii].get("en", "") for li, ii in machine_refs]
+        machine_zh = dict(zip(machine_refs, translate_batch_en_to_zh(texts, provider)))
+        if tm is not None:
+            tm_stats["recorded_machine"] = tm_record(
+                tm,
+                [(prepared[li][3][ii].get("en", ""), zh) for (li, ii), zh in machine_zh.items() if zh],
+                "machine",
+            )
 
-        override_file = work_dir / f"{key}_translate_output.json"
-        if override_file.exists():
-            result = json.loads(override_file.read_text(encoding="utf-8"))
-            out_items = result.get("sentences", input_items)
-            source = "hitl_override"
-        else:
-            has_real_transcript = any(not is_pending_text(item.get("en", "")) for item in input_items)
-            if not has_real_transcript:
-                raise RuntimeError(f"ASR_NOT_READY:{key}")
-            out_items = []
-            ai_translated = 0
-            for item in input_items:
-                existing_zh = item.get("zh", "")
-                ai_zh = None
-                if is_pending_text(existing_zh):
-                    ai_zh = translate_en_to_zh_ai(item.get("en", ""))
-                    if ai_zh:
+    lessons = []
+    for lesson_idx, (key, lesson_dir, input_file, input_items, override_items) in enumerate(prepared):
+        with meter.lesson(key):
+            if override_items is not None:
+                out_items = override_items
+                source = "hitl_override"
+            else:
+                out_items = []
+                ai_translated = 0
+                tm_hits = 0
+                for item_idx, item in enumerate(input_items):
+                    existing_zh = item.get("zh", "")
+                    remembered_zh = tm_zh.get((lesson_idx, item_idx))
+                    ai_zh = machine_zh.get((lesson_idx, item_idx))
+                    if not is_pending_text(existing_zh):
+                        zh, zh_source = existing_zh, "provided"
+                    elif remembered_zh:
+                        zh, zh_source = remembered_zh, "tm_exact"
+                        tm_hits += 1
+                    elif ai_zh:
+                        zh, zh_source = ai_zh, "machine"
                         ai_translated += 1
-                out_items.append(
+                    else:
+                        zh, zh_source = f"【待翻译】{item['en']}", "fallback"
+                    out_items.append(
+                        {
+                            **item,
+                            "zh": zh,
+                            "ipa": assemble_sentence_ipa(item.get("en", ""), ipa_table),
+                            "source": zh_source,
+                        }
+                    )
+                if ai_translated > 0:
+                    source = "ai_online"
+                elif tm_hits > 0:
+                    source = "translation_memory"
+                else:
+                    source = "fallback"
+
+            for item in out_items:
+                if is_pending_ipa(item.get("ipa", "")):
+                    item["ipa"] = assemble_sentence_ipa(item.get("en", ""), ipa_table)
+
+            output_file = work_dir / f"{key}_translate_effective.json"
+            output_file.write_text(
+                json.dumps({"lesson_id": key, "sentences": out_items, "source": source}, ensure_ascii=False, indent=2),
+                encoding="utf-8",
+            )
+            # Keep packaged subtitle file consistent with effective translation output.
+            write_srt(
+                lesson_dir / "sub_zh.srt",
+                [
                     {
-                        **item,
-                        "zh": ai_zh or (f"【待翻译】{item['en']}" if is_pending_text(existing_zh) else existing_zh),
-                        "ipa": generate_sentence_ipa(item.get("en", "")),
+                        "start_ms": int(item.get("start_ms", 0)),
+                        "end_ms": int(item.get("end_ms", 0)),
+                        "text": item.get("zh", ""),
                     }
-                )
-            source = "ai_online" if ai_translated > 0 else "fallback"
-
-        for item in out_items:
-            if is_pending_ipa(item.get("ipa", "")):
-                item["ipa"] = generate_sentence_ipa(item.get("en", ""))
-
-        output_file = work_dir / f"{key}_translate_effective.json"
-        output_file.write_text(
-            json.dumps({"lesson_id": key, "sentences": out_items, "source": source}, ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
-        # Keep packaged subtitle file consistent with effective translation output.
-        write_srt(
-            lesson_dir / "sub_zh.srt",
-            [
-                {
-                    "start_ms": int(item.get("start_ms", 0)),
-                    "end_ms": int(item.get("end_ms", 0)),
-                    "text": item.get("zh", ""),
-                }
-                for item in out_items
-            ],
-        )
-        lessons.append({"lesson_id": key, "input_file": str(input_file), "output_file": str(output_file), "source": source})
+                    for item in out_items
+                ],
+            )
+            lessons.append({"lesson_id": key, "input_file": str(input_file), "output_file": str(output_file), "source": source})
 
-    return {"lessons": lessons}
+    return {
+        "lessons": meter.attach(lessons),
+        "translation": {
+            "provider": provider.name if provider is not None else None,
+            "sentences": len(machine_refs),
+            **(provider.stats() if provider is not None else {}),
+        },
+        "translation_memory": {
+            **tm_stats,
+            "hit_rate": round(tm_stats["hits"] / tm_stats["lookups"], 4) if tm_stats["lookups"] else 0.0,
+        },
+        "ipa_unique_words": len(ipa_table),
+        "ipa_dictionary": str(ipa_dictionary.path) if ipa_dictionary is not None else None,
+    }
 
 
 def execute_step_grammar(task: dict, runtime_dir: Path) -> dict:
     work_dir = runtime_dir / task["task_id"] / "hitl"
     work_dir.mkdir(parents=True, exist_ok=True)
     lessons = []
+    meter = LessonMeter()
 
     for key in task.get("lesson_keys", []):
-        translate_file = work_dir / f"{key}_translate_effective.json"
-        if not translate_file.exists():
-            raise RuntimeError(f"STEP_FAILED:missing_translate_effective:{key}")
-        translated = json.loads(translate_file.read_text(encoding="utf-8"))
-        in_sentences = translated.get("sentences", [])
-
-        grammar_input = []
-        for s in in_sentences:
-            grammar_input.append(
-                {
-                    "sentence_id": s["sentence_id"],
-                    "en": s["en"],
-                    "zh": s.get("zh", ""),
-                }
-            )
-        input_file = work_dir / f"{key}_grammar_input.json"
-        input_file.write_text(
-            json.dumps({"lesson_id": key, "sentences": grammar_input}, ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
-
-        override_file = work_dir / f"{key}_grammar_output.json"
-        if override_file.exists():
-            result = json.loads(override_file.read_text(encoding="utf-8"))
-            out_sentences = result.get("sentences", [])
-            source = "hitl_override"
-        else:
-            out_sentences = []
-            for s in grammar_input:
-                grammar_obj = infer_grammar(s.get("en", ""))
-                usage_obj = infer_usage(s.get("en", ""), s.get("zh", ""))
-                out_sentences.append(
+        with meter.lesson(key):
+            translate_file = work_dir / f"{key}_translate_effective.json"
+            if not translate_file.exists():
+                raise RuntimeError(f"STEP_FAILED:missing_translate_effective:{key}")
+            translated = json.loads(translate_file.read_text(encoding="utf-8"))
+            in_sentences = translated.get("sentences", [])
+
+            grammar_input = []
+            for s in in_sentences:
+                grammar_input.append(
                     {
                         "sentence_id": s["sentence_id"],
-                        "grammar": grammar_obj,
-                        "usage": usage_obj,
+                        "en": s["en"],
+                        "zh": s.get("zh", ""),
                     }
                 )
-            source = "auto_generated"
+            input_file = work_dir / f"{key}_grammar_input.json"
+            input_file.write_text(
+                json.dumps({"lesson_id": key, "sentences": grammar_input}, ensure_ascii=False, indent=2),
+                encoding="utf-8",
+            )
 
-        output_file = work_dir / f"{key}_grammar_effective.json"
-        output_file.write_text(
-            json.dumps({"lesson_id": key, "sentences": out_sentences, "source": source}, ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
-        lessons.append({"lesson_id": key, "input_file": str(input_file), "output_file": str(output_file), "source": source})
+            override_file = work_dir / f"{key}_grammar_output.json"
+            if override_file.exists():
+                result = json.loads(override_file.read_text(encoding="utf-8"))
+                out_sentences = result.get("sentences", [])
+                source = "hitl_override"
+            else:
+                out_sentences = [
+                    {"sentence_id": s["sentence_id"], **notes}
+                    for s, notes in zip(grammar_input, classify_sentences(grammar_input))
+                ]
+                source = "auto_generated"
+
+            output_file = work_dir / f"{key}_grammar_effective.json"
+            output_file.write_text(
+                json.dumps({"lesson_id": key, "sentences": out_sentences, "source": source}, ensure_ascii=False, indent=2),
+                encoding="utf-8",
+            )
+            lessons.append({"lesson_id": key, "input_file": str(input_file), "output_file": str(output_file), "source": source})
 
-    return {"lessons": lessons}
+    return {"lessons": meter.attach(lessons)}
 
 
 def execute_step_summary(task: dict, runtime_dir: Path) -> dict:
     work_dir = runtime_dir / task["task_id"] / "hitl"
     work_dir.mkdir(parents=True, exist_ok=True)
     lessons = []
+    meter = LessonMeter()
 
     for key in task.get("lesson_keys", []):
-        translate_file = work_dir / f"{key}_translate_effective.json"
-        if not translate_file.exists():
-            raise RuntimeError(f"STEP_FAILED:missing_translate_effective:{key}")
-        translated = json.loads(translate_file.read_text(encoding="utf-8"))
-        in_sentences = translated.get("sentences", [])
-        input_file = work_dir / f"{key}_summary_input.json"
-        input_file.write_text(
-            json.dumps({"lesson_id": key, "sentences": in_sentences}, ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
+        with meter.lesson(key):
+            translate_file = work_dir / f"{key}_translate_effective.json"
+            if not translate_file.exists():
+                raise RuntimeError(f"STEP_FAILED:missing_translate_effective:{key}")
+            translated = json.loads(translate_file.read_text(encoding="utf-8"))
+            in_sentences = translated.get("sentences", [])
+            input_file = work_dir / f"{key}_summary_input.json"
+            input_file.write_text(
+                json.dumps({"lesson_id": key, "sentences": in_sentences}, ensure_ascii=False, indent=2),
+                encoding="utf-8",
+            )
 
-        override_file = work_dir / f"{key}_summary_output.json"
-        if override_file.exists():
-            summary_data = json.loads(override_file.read_text(encoding="utf-8"))
-            source = "hitl_override"
-        else:
-            summary, highlights = generate_summary_and_highlights(in_sentences)
-            summary_data = {
-                "lesson_id": key,
-                "summary": summary,
-                "grammar_highlights": highlights,
-            }
-            source = "auto_generated"
+            override_file = work_dir / f"{key}_summary_output.json"
+            if override_file.exists():
+                summary_data = json.loads(override_file.read_text(encoding="utf-8"))
+                source = "hitl_override"
+            else:
+                summary, highlights = generate_summary_and_highlights(in_sentences)
+                summary_data = {
+                    "lesson_id": key,
+                    "summary": summary,
+                    "grammar_highlights": highlights,
+                }
+                source = "auto_generated"
 
-        output_file = work_dir / f"{key}_summary_effective.json"
-        output_file.write_text(
-            json.dumps({**summary_data, "source": source}, ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
-        lessons.append({"lesson_id": key, "input_file": str(input_file), "output_file": str(output_file), "source": source})
+            output_file = work_dir / f"{key}_summary_effective.json"
+            output_file.write_text(
+                json.dumps({**summary_data, "source": source}, ensure_ascii=False, indent=2),
+                encoding="utf-8",
+            )
+            lessons.append({"lesson_id": key, "input_file": str(input_file), "output_file": str(output_file), "source": source})
 
-    return {"lessons": lessons}
+    return {"lessons": meter.attach(lessons)}
 
 
 def execute_step_package(task: dict, runtime_dir: Path) -> dict:
@@ -776,6 +3384,7 @@ def execute_step_package(task: dict, runtime_dir: Path) -> dict:
     lessons_dir.mkdir(parents=True, exist_ok=True)
 
     lesson_entries = []
+    placement = new_placement_stats()
     for key in task.get("lesson_keys", []):
         src_lesson = output_root / key
         dst_lesson = lessons_dir / key
@@ -783,11 +3392,14 @@ def execute_step_package(task: dict, runtime_dir: Path) -> dict:
         for name in ["media.mp4", "media.mp3", "sub_en.srt", "sub_zh.srt"]:
             src = src_lesson / name
             if src.exists():
-                (dst_lesson / name).write_bytes(src.read_bytes())
-        if not (dst_lesson / "sub_en.srt").exists() and (src_lesson / "sub_en.srt").exists():
-            (dst_lesson / "sub_en.srt").write_bytes((src_lesson / "sub_en.srt").read_bytes())
-        if not (dst_lesson / "sub_zh.srt").exists() and (src_lesson / "sub_zh.srt").exists():
-            (dst_lesson / "sub_zh.srt").write_bytes((src_lesson / "sub_zh.srt").read_bytes())
+                # Media is only ever replaced by unlink + rewrite, so sharing its inode is safe.
+                # Subtitles are rewritten in place by later steps and must not be linked.
+                record_placement(placement, *place_file(src, dst_lesson / name, link=name.startswith("media.")))
+        for lang in ["en", "zh"]:
+            srt = dst_lesson / f"sub_{lang}.srt"
+            if srt.exists():
+                # WebVTT for the app's players, streamed cue by cue from the packaged SRT.
+                write_vtt(dst_lesson / f"sub_{lang}.vtt", iter_srt(srt))
 
         translate_effective = work_dir / f"{key}_translate_effective.json"
         grammar_effective = work_dir / f"{key}_grammar_effective.json"
@@ -868,6 +3480,8 @@ def execute_step_package(task: dict, runtime_dir: Path) -> dict:
             "subtitles": {
                 "en": "sub_en.srt" if (dst_lesson / "sub_en.srt").exists() else "",
                 "zh": "sub_zh.srt" if (dst_lesson / "sub_zh.srt").exists() else "",
+                "en_vtt": "sub_en.vtt" if (dst_lesson / "sub_en.vtt").exists() else "",
+                "zh_vtt": "sub_zh.vtt" if (dst_lesson / "sub_zh.vtt").exists() else "",
             },
             "summary": summary_data.get("summary", "[pending]"),
             "grammar_highlights": summary_data.get("grammar_highlights", ["[pending]"]),
@@ -886,14 +3500,14 @@ def execute_step_package(task: dict, runtime_dir: Path) -> dict:
         "lessons": lesson_entries,
     }
     (package_dir / "course_manifest.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
-    return {"package_dir": str(package_dir), "manifest": str(package_dir / "course_manifest.json")}
+    return {"package_dir": str(package_dir), "manifest": str(package_dir / "course_manifest.json"), "placement": placement}
 
 
-def execute_step(step: str, task: dict, runtime_dir: Path) -> dict:
+def execute_step(step: str, task: dict, runtime_dir: Path, jobs: int | None = None) -> dict:
     if step == "ffmpeg":
-        return execute_step_ffmpeg(task, runtime_dir)
+        return execute_step_ffmpeg(task, runtime_dir, jobs=jobs)
     if step == "asr":
-        return execute_step_asr(task, runtime_dir)
+        return execute_step_asr(task, runtime_dir, jobs=jobs)
     if step == "align":
         return execute_step_align(task, runtime_dir)
     if step == "translate":
@@ -911,6 +3525,181 @@ def execute_step(step: str, task: dict, runtime_dir: Path) -> dict:
     }
 
 
+INCREMENTAL_STEPS = {"ffmpeg", "asr", "align", "translate", "grammar", "summary"}
+STEP_ENV_KEYS = {
+    "ffmpeg": ["COURSE_PIPELINE_FFMPEG_SINGLE_PASS", "COURSE_PIPELINE_STREAM_COPY"],
+    "asr": [
+        "COURSE_PIPELINE_WHISPER_MODEL",
+        "COURSE_PIPELINE_WHISPER_DEVICE",
+        "COURSE_PIPELINE_WHISPER_BACKEND",
+        "COURSE_PIPELINE_ASR_CHUNKED",
+        "COURSE_PIPELINE_ASR_CHUNK_SECONDS",
+    ],
+    "align": [],
+    "translate": [
+        "COURSE_PIPELINE_TRANSLATE_PROVIDER",
+        "COURSE_PIPELINE_TRANSLATE_ENDPOINT",
+        "COURSE_PIPELINE_TM",
+        "COURSE_PIPELINE_IPA_DICT",
+    ],
+    "grammar": [],
+    "summary": [],
+}
+# Files at or above this size are fingerprinted by stat stamp instead of content hash.
+FINGERPRINT_HASH_LIMIT = 8 * 1024 * 1024
+_CODE_VERSION: str | None = None
+
+
+def pipeline_code_version() -> str:
+    global _CODE_VERSION
+    if _CODE_VERSION is None:
+        digest = hashlib.sha256(Path(__file__).read_bytes())
+        for config in [Path(__file__).resolve().parent / "config" / "pipeline_contract.json", INFERENCE_RULES_FILE]:
+            if config.exists():
+                digest.update(config.read_bytes())
+        _CODE_VERSION = digest.hexdigest()
+    return _CODE_VERSION
+
+
+def file_stamp(path: Path) -> list | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    if st.st_size >= FINGERPRINT_HASH_LIMIT:
+        return ["stat", st.st_size, st.st_mtime_ns, st.st_ino]
+    return ["sha256", file_sha256(path)]
+
+
+def step_lesson_files(step: str, task: dict, runtime_dir: Path, key: str) -> tuple[list[Path], list[Path]]:
+    """Return (fingerprinted files, files that must exist) for one lesson of one step.
+
+    Fingerprints are taken after the step has run, so a step's own outputs (e.g. translate
+    rewriting sub_zh.srt) are part of the state the next run compares against.
+    """
+    raw_folder = Path(task["course_path"]) if task.get("course_path") else None
+    lesson_dir = runtime_dir / task["task_id"] / "artifacts" / key
+    work_dir = runtime_dir / task["task_id"] / "hitl"
+    if step == "ffmpeg":
+        media = find_media_for_key(raw_folder, key) if raw_folder and raw_folder.exists() else None
+        ext = media.suffix.lower().lstrip(".") if media else "mp4"
+        outputs = [lesson_dir / f"media.{ext}", lesson_dir / "audio_16k.wav"]
+        return ([media] if media else []) + outputs, outputs
+    if step == "asr":
+        provided = [raw_folder / f"{key}.en.srt"] if raw_folder else []
+        sub_en = lesson_dir / "sub_en.srt"
+        return provided + [lesson_dir / "media.mp4", lesson_dir / "audio_16k.wav", sub_en], [sub_en]
+    if step == "align":
+        # sub_zh.srt is rewritten by translate later, so align only requires it to exist.
+        alignment = lesson_dir / ALIGNMENT_FILE
+        provided = [raw_folder / f"{key}.zh.srt"] if raw_folder else []
+        return provided + [lesson_dir / "sub_en.srt", alignment], [lesson_dir / "sub_zh.srt", alignment]
+    if step == "translate":
+        effective = work_dir / f"{key}_translate_effective.json"
+        return [
+            lesson_dir / "sub_en.srt",
+            lesson_dir / "sub_zh.srt",
+            lesson_dir / ALIGNMENT_FILE,
+            work_dir / f"{key}_translate_output.json",
+            effective,
+        ], [effective]
+    if step in {"grammar", "summary"}:
+        effective = work_dir / f"{key}_{step}_effective.json"
+        return [
+            work_dir / f"{key}_translate_effective.json",
+            work_dir / f"{key}_{step}_output.json",
+            effective,
+        ], [effective]
+    return [], []
+
+
+def lesson_fingerprint(step: str, task: dict, runtime_dir: Path, key: str) -> str | None:
+    hashed, required = step_lesson_files(step, task, runtime_dir, key)
+    if not all(p.exists() for p in required):
+        return None
+    blob = {
+        "code": pipeline_code_version(),
+        "step": step,
+        "env": {name: os.getenv(name) for name in STEP_ENV_KEYS.get(step, [])},
+        "files": [[p.name, file_stamp(p)] for p in hashed],
+    }
+    return hashlib.sha256(json.dumps(blob, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def lesson_result_reusable(step: str, task: dict, runtime_dir: Path, result: dict) -> bool:
+    """Degraded results (placeholders, untranslated lines) are never frozen; the next run retries them."""
+    if step == "asr":
+        # Failed extraction/transcription also leaves the placeholder behind, under its own source.
+        if result.get("source") == "placeholder" or not result.get("sub_en"):
+            return False
+        return any(not is_pending_text(e["text"]) for e in iter_srt(Path(result["sub_en"])))
+    if step == "translate":
+        effective = runtime_dir / task["task_id"] / "hitl" / f"{result.get('lesson_id')}_translate_effective.json"
+        try:
+            sentences = json.loads(effective.read_text(encoding="utf-8")).get("sentences", [])
+        except (OSError, ValueError):
+            return False
+        return all(not is_pending_text(s.get("zh", "")) and not is_pending_ipa(s.get("ipa", "")) for s in sentences)
+    return True
+
+
+def fingerprints_file(runtime_dir: Path, task_id: str) -> Path:
+    return runtime_dir / task_id / "fingerprints.json"
+
+
+def load_fingerprints(runtime_dir: Path, task_id: str) -> dict:
+    try:
+        return json.loads(fingerprints_file(runtime_dir, task_id).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def execute_step_incremental(
+    step: str,
+    task: dict,
+    runtime_dir: Path,
+    jobs: int | None = None,
+    force: bool = False,
+) -> dict:
+    """Run a step only for lessons whose inputs changed since the last successful run."""
+    if step not in INCREMENTAL_STEPS:
+        return execute_step(step, task, runtime_dir, jobs=jobs)
+
+    lesson_keys = list(task.get("lesson_keys", []))
+    fingerprints = load_fingerprints(runtime_dir, task["task_id"])
+    recorded = fingerprints.get(step, {})
+    reused: dict[str, dict] = {}
+    if not force:
+        for key in lesson_keys:
+            entry = recorded.get(key)
+            if entry and entry.get("fingerprint") == lesson_fingerprint(step, task, runtime_dir, key):
+                # Metrics describe the run that produced the result, not this one.
+                reused[key] = {k: v for k, v in entry["result"].items() if k != "metrics"}
+
+    changed = [key for key in lesson_keys if key not in reused]
+    payload: dict = {}
+    if changed:
+        payload = execute_step(step, {**task, "lesson_keys": changed}, runtime_dir, jobs=jobs)
+
+    results = {r["lesson_id"]: r for r in payload.get("lessons", []) if isinstance(r, dict) and "lesson_id" in r}
+    step_entries = {key: recorded[key] for key in reused}
+    for key in changed:
+        result = results.get(key)
+        if result is None or not lesson_result_reusable(step, task, runtime_dir, result):
+            continue
+        fingerprint = lesson_fingerprint(step, task, runtime_dir, key)
+        if fingerprint:
+            step_entries[key] = {"fingerprint": fingerprint, "result": result}
+    fingerprints[step] = step_entries
+    write_json_atomic(fingerprints_file(runtime_dir, task["task_id"]), fingerprints)
+
+    payload["lessons"] = [
+        reused[key] if key in reused else results[key] for key in lesson_keys if key in reused or key in results
+    ]
+    payload["incremental"] = {"forced": force, "executed": changed, "skipped": [key for key in lesson_keys if key in reused]}
+    return payload
+
+
 def scan_raw_lessons(raw_folder: Path) -> tuple[list[str], str | None]:
     keys: list[str] = []
     seen: set[str] = set()
@@ -947,7 +3736,7 @@ def cmd_course_add(args: argparse.Namespace) -> int:
         "task_id": task_id,
         "course_id": normalize_course_id(raw_folder),
         "course_path": str(raw_folder),
-        "status": "uploaded",
+        "status": "processing" if getattr(args, "queue", False) else "uploaded",
         "current_step": "ffmpeg",
         "steps": {s: "pending" for s in STEP_ORDER},
         "lesson_keys": lesson_keys,
@@ -957,7 +3746,7 @@ def cmd_course_add(args: argparse.Namespace) -> int:
     }
     save_task(runtime_dir, task)
     append_event(runtime_dir, task_id, "course.add", {"course_path": str(raw_folder), "lessons": lesson_keys})
-    if getattr(args, "auto_start", True):
+    if getattr(args, "auto_start", True) and not getattr(args, "queue", False):
         code, payload = _run_auto_until_hitl_or_terminal(runtime_dir, task_id)
         if code != 0:
             return out(
@@ -984,11 +3773,9 @@ def cmd_course_delete(args: argparse.Namespace) -> int:
     runtime_dir = project_runtime_dir(project_root)
 
     removed = []
-    for p in runtime_dir.glob("task_*.json"):
-        t = json.loads(p.read_text(encoding="utf-8"))
-        if t.get("course_id") == args.course_id:
-            removed.append(t["task_id"])
-            p.unlink(missing_ok=True)
+    for t in list_tasks(runtime_dir, course_id=args.course_id):
+        delete_task(runtime_dir, t["task_id"])
+        removed.append(t["task_id"])
 
     append_event(runtime_dir, "-", "course.delete", {"course_id": args.course_id, "removed_tasks": removed})
     return out({"ok": True, "course_id": args.course_id, "removed_tasks": removed})
@@ -1005,25 +3792,17 @@ def cmd_task_get(args: argparse.Namespace) -> int:
 
 def cmd_task_list(args: argparse.Namespace) -> int:
     runtime_dir = project_runtime_dir(Path(args.project_root).expanduser().resolve())
-    tasks = []
-    for p in sorted(runtime_dir.glob("task_*.json")):
-        t = json.loads(p.read_text(encoding="utf-8"))
-        if args.status and t.get("status") != args.status:
-            continue
-        tasks.append(t)
-    return out({"ok": True, "tasks": tasks})
+    return out({"ok": True, "tasks": list_tasks(runtime_dir, status=args.status or None)})
 
 
 def set_task_status(runtime_dir: Path, task_id: str, status: str, event: str) -> int:
     if status not in STATUSES:
         return out({"ok": False, "error": {"code": "INVALID_STATUS", "message": status}}, 2)
     try:
-        task = load_task(runtime_dir, task_id)
+        task = update_task(runtime_dir, task_id, lambda t: t.update(status=status))
     except FileNotFoundError:
         return out({"ok": False, "error": {"code": "TASK_NOT_FOUND", "message": task_id}}, 2)
 
-    task["status"] = status
-    save_task(runtime_dir, task)
     append_event(runtime_dir, task_id, event, {"status": status})
     return out({"ok": True, "task": task})
 
@@ -1042,44 +3821,177 @@ def cmd_task_stop(args: argparse.Namespace) -> int:
 
 def cmd_task_delete(args: argparse.Namespace) -> int:
     runtime_dir = project_runtime_dir(Path(args.project_root).expanduser().resolve())
-    p = task_file(runtime_dir, args.task_id)
-    if not p.exists():
+    if not delete_task(runtime_dir, args.task_id):
         return out({"ok": False, "error": {"code": "TASK_NOT_FOUND", "message": args.task_id}}, 2)
-    p.unlink(missing_ok=True)
     append_event(runtime_dir, args.task_id, "task.delete", {})
     return out({"ok": True, "task_id": args.task_id})
 
 
 def cmd_task_retry(args: argparse.Namespace) -> int:
     runtime_dir = project_runtime_dir(Path(args.project_root).expanduser().resolve())
-    try:
-        task = load_task(runtime_dir, args.task_id)
-    except FileNotFoundError:
-        return out({"ok": False, "error": {"code": "TASK_NOT_FOUND", "message": args.task_id}}, 2)
-
     step = args.from_step
     if step and step not in STEP_ORDER:
         return out({"ok": False, "error": {"code": "INVALID_STEP", "message": step}}, 2)
 
-    if step:
-        trigger = False
-        for s in STEP_ORDER:
-            if s == step:
-                trigger = True
-            if trigger:
-                task["steps"][s] = "pending"
-        task["current_step"] = step
-    else:
-        task["steps"] = {s: "pending" for s in STEP_ORDER}
-        task["current_step"] = "ffmpeg"
+    def reset(task: dict) -> None:
+        if step:
+            trigger = False
+            for s in STEP_ORDER:
+                if s == step:
+                    trigger = True
+                if trigger:
+                    task["steps"][s] = "pending"
+            task["current_step"] = step
+        else:
+            task["steps"] = {s: "pending" for s in STEP_ORDER}
+            task["current_step"] = "ffmpeg"
+        task["status"] = "processing"
+        task["error"] = None
+        task["lease"] = None
 
-    task["status"] = "processing"
-    task["error"] = None
-    save_task(runtime_dir, task)
+    try:
+        task = update_task(runtime_dir, args.task_id, reset)
+    except FileNotFoundError:
+        return out({"ok": False, "error": {"code": "TASK_NOT_FOUND", "message": args.task_id}}, 2)
     append_event(runtime_dir, args.task_id, "task.retry", {"from_step": step})
     return out({"ok": True, "task": task})
 
 
+def lease_ttl_seconds() -> float:
+    return max(1.0, float(os.getenv("COURSE_PIPELINE_LEASE_TTL", "60")))
+
+
+def lease_owner_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def _parse_iso(ts: str | None) -> float | None:
+    try:
+        return datetime.fromisoformat((ts or "").replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def _iso_at(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def new_step_lease(step: str, owner: str) -> dict:
+    now = time.time()
+    return {"step": step, "owner": owner, "heartbeat_at": _iso_at(now), "expires_at": _iso_at(now + lease_ttl_seconds())}
+
+
+def stale_running_step(task: dict, now: float | None = None) -> str | None:
+    """Return the running step whose owner stopped heartbeating, if any.
+
+    A running step without a lease predates leases; it counts as stale once the task
+    has not been saved for a full lease TTL.
+    """
+    now = time.time() if now is None else now
+    running = [s for s, state in task.get("steps", {}).items() if state == "running"]
+    if not running:
+        return None
+    lease = task.get("lease") or {}
+    if lease.get("step") == running[0]:
+        expires = _parse_iso(lease.get("expires_at"))
+    else:
+        updated = _parse_iso(task.get("updated_at"))
+        expires = updated + lease_ttl_seconds() if updated is not None else None
+    if expires is None or expires <= now:
+        return running[0]
+    return None
+
+
+def reclaim_stale_step(runtime_dir: Path, task: dict) -> str | None:
+    """Reset an expired running step to pending in task (caller holds the task lock and saves)."""
+    step = stale_running_step(task)
+    if step is None:
+        return None
+    previous = task.get("lease")
+    task["steps"][step] = "pending"
+    task["lease"] = None
+    append_event(runtime_dir, task["task_id"], "task.lease.reclaimed", {"step": step, "previous": previous})
+    return step
+
+
+class LeaseHeartbeat:
+    """Renews a step lease in the background until stopped; notices when it was reclaimed."""
+
+    def __init__(self, runtime_dir: Path, task_id: str, owner: str):
+        self.runtime_dir = runtime_dir
+        self.task_id = task_id
+        self.owner = owner
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"lease-{task_id}", daemon=True)
+
+    def __enter__(self) -> "LeaseHeartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _renew(self, task: dict) -> None:
+        lease = task.get("lease") or {}
+        if lease.get("owner") != self.owner:
+            self.lost = True
+            return
+        now = time.time()
+        lease["heartbeat_at"] = _iso_at(now)
+        lease["expires_at"] = _iso_at(now + lease_ttl_seconds())
+
+    def _run(self) -> None:
+        while not self.lost and not self._stop.wait(lease_ttl_seconds() / 3):
+            try:
+                update_task(self.runtime_dir, self.task_id, self._renew)
+            except FileNotFoundError:
+                self.lost = True
+            except (OSError, sqlite3.Error):
+                # Transient store trouble; the next beat retries before the lease runs out.
+                continue
+
+
+def lesson_io_bytes(step: str, task: dict, runtime_dir: Path, key: str) -> tuple[int, int]:
+    """(bytes in, bytes out) of one lesson: its fingerprint inputs versus the files it must produce."""
+    hashed, required = step_lesson_files(step, task, runtime_dir, key)
+    outputs = set(required)
+    sizes = {}
+    for p in hashed + required:
+        try:
+            sizes[p] = p.stat().st_size
+        except OSError:
+            sizes[p] = 0
+    return sum(n for p, n in sizes.items() if p not in outputs), sum(sizes[p] for p in outputs)
+
+
+def step_metrics(
+    step: str, task: dict, runtime_dir: Path, payload: dict, before: dict, network_mark: tuple[int, int], steps_in_flight: int = 1
+) -> dict:
+    """Step totals; also completes each freshly run lesson's metrics with its I/O bytes."""
+    metrics = resource_delta(before)
+    bytes_in = bytes_out = 0
+    for lesson in payload.get("lessons", []):
+        if not isinstance(lesson, dict) or "metrics" not in lesson:
+            continue
+        lesson_in, lesson_out = lesson_io_bytes(step, task, runtime_dir, lesson["lesson_id"])
+        lesson["metrics"].update(bytes_in=lesson_in, bytes_out=lesson_out)
+        bytes_in += lesson_in
+        bytes_out += lesson_out
+    if step == "package":
+        placement = payload.get("placement", {})
+        bytes_out = placement.get("bytes_linked", 0) + placement.get("bytes_copied", 0)
+    metrics.update(
+        bytes_in=bytes_in,
+        bytes_out=bytes_out,
+        network=NETWORK.since(network_mark),
+        steps_in_flight=steps_in_flight,
+        process_high_water=process_high_water(),
+    )
+    return metrics
+
+
 def _next_incomplete_step(task: dict) -> str | None:
     for s in STEP_ORDER:
         if task["steps"].get(s) != "done":
@@ -1087,81 +3999,137 @@ def _next_incomplete_step(task: dict) -> str | None:
     return None
 
 
-def _run_single_step(runtime_dir: Path, task_id: str, step: str) -> tuple[int, dict]:
+def _run_single_step(
+    runtime_dir: Path,
+    task_id: str,
+    step: str,
+    jobs: int | None = None,
+    force: bool = False,
+) -> tuple[int, dict]:
     if step not in STEP_ORDER:
         return 2, {"ok": False, "error": {"code": "INVALID_STEP", "message": step}}
 
-    try:
-        task = load_task(runtime_dir, task_id)
-    except FileNotFoundError:
-        return 2, {"ok": False, "error": {"code": "TASK_NOT_FOUND", "message": task_id}}
-
-    running_steps = [s for s, state in task["steps"].items() if state == "running"]
-    if running_steps:
-        return 3, {
-            "ok": False,
-            "error": {
-                "code": "STEP_FAILED",
-                "message": f"another step is running: {running_steps[0]}",
-                "step": running_steps[0],
-            },
-        }
+    # Claim the step under the task lock; the step itself runs unlocked so pause/stop stay responsive.
+    with task_lock(runtime_dir, task_id):
+        try:
+            task = load_task(runtime_dir, task_id)
+        except FileNotFoundError:
+            return 2, {"ok": False, "error": {"code": "TASK_NOT_FOUND", "message": task_id}}
 
-    step_index = STEP_ORDER.index(step)
-    for prev in STEP_ORDER[:step_index]:
-        if task["steps"][prev] != "done":
+        if reclaim_stale_step(runtime_dir, task):
+            save_task(runtime_dir, task)
+        running_steps = [s for s, state in task["steps"].items() if state == "running"]
+        if running_steps:
+            owner = (task.get("lease") or {}).get("owner", "unknown")
             return 3, {
                 "ok": False,
                 "error": {
                     "code": "STEP_FAILED",
-                    "message": f"step '{step}' requires '{prev}' done first",
-                    "step": step,
+                    "message": f"another step is running: {running_steps[0]} (lease owner {owner})",
+                    "step": running_steps[0],
                 },
             }
 
-    task["status"] = "processing"
-    task["current_step"] = step
-    task["steps"][step] = "running"
-    save_task(runtime_dir, task)
-    append_event(runtime_dir, task_id, "task.run_step.start", {"step": step, "hitl": step in HITL_STEPS})
+        step_index = STEP_ORDER.index(step)
+        for prev in STEP_ORDER[:step_index]:
+            if task["steps"][prev] != "done":
+                return 3, {
+                    "ok": False,
+                    "error": {
+                        "code": "STEP_FAILED",
+                        "message": f"step '{step}' requires '{prev}' done first",
+                        "step": step,
+                    },
+                }
+
+        owner = lease_owner_id()
+        task["status"] = "processing"
+        task["current_step"] = step
+        task["steps"][step] = "running"
+        task["lease"] = new_step_lease(step, owner)
+        save_task(runtime_dir, task)
+    append_event(runtime_dir, task_id, "task.run_step.start", {"step": step, "hitl": step in HITL_STEPS, "owner": owner})
 
     out_dir = runtime_dir / task_id
     out_dir.mkdir(parents=True, exist_ok=True)
 
+    error = None
+    heartbeat = LeaseHeartbeat(runtime_dir, task_id, owner)
+    before, network_mark = resource_snapshot(), NETWORK.mark()
+    in_flight = STEPS_IN_FLIGHT.enter()
     try:
-        step_payload = execute_step(step, task, runtime_dir)
+        try:
+            with heartbeat:
+                step_payload = execute_step_incremental(step, task, runtime_dir, jobs=jobs, force=force)
+        finally:
+            steps_in_flight = STEPS_IN_FLIGHT.leave(in_flight)
+        metrics = step_metrics(step, task, runtime_dir, step_payload, before, network_mark, steps_in_flight)
         output = {
             "task_id": task_id,
             "step": step,
             "hitl": step in HITL_STEPS,
             "generated_at": now_iso(),
+            "metrics": metrics,
             "payload": step_payload,
         }
         out_file = out_dir / f"output_{step}.json"
         out_file.write_text(json.dumps(output, ensure_ascii=False, indent=2), encoding="utf-8")
+    except Exception as exc:
+        error = {"code": "STEP_FAILED", "message": str(exc), "step": step}
+
+    lease_lost = False
+
+    def finish(task: dict) -> None:
+        nonlocal lease_lost
+        if (task.get("lease") or {}).get("owner") != owner:
+            # Our lease expired and another worker reclaimed the step; its result wins.
+            lease_lost = True
+            return
+        task["lease"] = None
+        # Re-applied to the latest saved task, so a pause or stop issued mid-step is kept.
+        held = task.get("status") in {"paused", "stopped"}
+        if error is not None:
+            task["steps"][step] = "failed"
+            task["error"] = error
+            if not held:
+                task["status"] = "failed"
+            return
         task["steps"][step] = "done"
         task["error"] = None
-    except Exception as exc:
-        task["steps"][step] = "failed"
-        task["status"] = "failed"
-        task["error"] = {"code": "STEP_FAILED", "message": str(exc), "step": step}
-        save_task(runtime_dir, task)
-        append_event(runtime_dir, task_id, "task.run_step.failed", {"step": step, "error": task["error"]})
-        return 3, {"ok": False, "task": task, "error": task["error"]}
-
-    next_step = _next_incomplete_step(task)
-    if next_step:
-        task["current_step"] = next_step
-    else:
-        task["current_step"] = "package"
-        task["status"] = "ready"
+        next_step = _next_incomplete_step(task)
+        if next_step:
+            task["current_step"] = next_step
+        else:
+            task["current_step"] = "package"
+            if not held:
+                task["status"] = "ready"
 
-    save_task(runtime_dir, task)
-    append_event(runtime_dir, task_id, "task.run_step.done", {"step": step, "output_file": str(out_file)})
+    try:
+        task = update_task(runtime_dir, task_id, finish)
+    except FileNotFoundError:
+        return 2, {"ok": False, "error": {"code": "TASK_NOT_FOUND", "message": task_id}}
+    if lease_lost:
+        error = {"code": "LEASE_LOST", "message": f"lease for '{step}' was reclaimed by another worker", "step": step}
+        append_event(runtime_dir, task_id, "task.run_step.lease_lost", {"step": step, "owner": owner})
+        return 3, {"ok": False, "task": task, "error": error}
+    if error is not None:
+        append_event(runtime_dir, task_id, "task.run_step.failed", {"step": step, "error": error})
+        return 3, {"ok": False, "task": task, "error": error}
+    append_event(
+        runtime_dir,
+        task_id,
+        "task.run_step.done",
+        {"step": step, "output_file": str(out_file), "wall_ms": metrics["wall_ms"], "child_cpu_ms": metrics["child_cpu_ms"]},
+    )
     return 0, {"ok": True, "task": task, "output_file": str(out_file)}
 
 
-def _run_auto_until_hitl_or_terminal(runtime_dir: Path, task_id: str) -> tuple[int, dict]:
+def _run_auto_until_hitl_or_terminal(
+    runtime_dir: Path,
+    task_id: str,
+    jobs: int | None = None,
+    force: bool = False,
+) -> tuple[int, dict]:
     try:
         task = load_task(runtime_dir, task_id)
     except FileNotFoundError:
@@ -1171,11 +4139,13 @@ def _run_auto_until_hitl_or_terminal(runtime_dir: Path, task_id: str) -> tuple[i
     while True:
         if task.get("status") in TERMINAL_STATUSES:
             break
+        if executed and task.get("status") == "paused":
+            break
         step = _next_incomplete_step(task)
         if step is None or step in HITL_STEPS:
             break
 
-        code, payload = _run_single_step(runtime_dir, task_id, step)
+        code, payload = _run_single_step(runtime_dir, task_id, step, jobs=jobs, force=force)
         if code != 0:
             return code, {
                 "ok": False,
@@ -1191,7 +4161,9 @@ def _run_auto_until_hitl_or_terminal(runtime_dir: Path, task_id: str) -> tuple[i
 
 def cmd_task_run_step(args: argparse.Namespace) -> int:
     runtime_dir = project_runtime_dir(Path(args.project_root).expanduser().resolve())
-    code, payload = _run_single_step(runtime_dir, args.task_id, args.step)
+    jobs = getattr(args, "jobs", None)
+    force = getattr(args, "force", False)
+    code, payload = _run_single_step(runtime_dir, args.task_id, args.step, jobs=jobs, force=force)
     if code != 0:
         return out(payload, code)
 
@@ -1201,12 +4173,12 @@ def cmd_task_run_step(args: argparse.Namespace) -> int:
     if getattr(args, "auto_chain", True):
         while True:
             task = last_payload.get("task", {})
-            if task.get("status") in TERMINAL_STATUSES:
+            if task.get("status") in TERMINAL_STATUSES or task.get("status") == "paused":
                 break
             next_step = _next_incomplete_step(task)
             if not next_step or next_step in HITL_STEPS:
                 break
-            code, last_payload = _run_single_step(runtime_dir, args.task_id, next_step)
+            code, last_payload = _run_single_step(runtime_dir, args.task_id, next_step, jobs=jobs, force=force)
             if code != 0:
                 return out(
                     {
@@ -1230,10 +4202,81 @@ def cmd_task_run_step(args: argparse.Namespace) -> int:
 
 def cmd_task_run_auto(args: argparse.Namespace) -> int:
     runtime_dir = project_runtime_dir(Path(args.project_root).expanduser().resolve())
-    code, payload = _run_auto_until_hitl_or_terminal(runtime_dir, args.task_id)
+    code, payload = _run_auto_until_hitl_or_terminal(
+        runtime_dir,
+        args.task_id,
+        jobs=getattr(args, "jobs", None),
+        force=getattr(args, "force", False),
+    )
     return out(payload, code)
 
 
+def cmd_ipa_export(args: argparse.Namespace) -> int:
+    runtime_dir = project_runtime_dir(Path(args.project_root).expanduser().resolve())
+    conn = open_ipa_cache(ipa_cache_path(runtime_dir))
+    try:
+        rows = conn.execute("SELECT word, ipa, fetched_at FROM ipa_cache ORDER BY word").fetchall()
+    finally:
+        conn.close()
+    entries = [{"word": w, "ipa": ipa, "fetched_at": fetched_at} for w, ipa, fetched_at in rows]
+    if args.positive_only:
+        entries = [e for e in entries if e["ipa"] is not None]
+    out_file = Path(args.file).expanduser().resolve()
+    out_file.write_text(
+        json.dumps({"version": 1, "exported_at": now_iso(), "entries": entries}, ensure_ascii=False, indent=2),
+        encoding="utf-8",
+    )
+    return out({"ok": True, "file": str(out_file), "exported": len(entries)})
+
+
+def cmd_ipa_import(args: argparse.Namespace) -> int:
+    runtime_dir = project_runtime_dir(Path(args.project_root).expanduser().resolve())
+    in_file = Path(args.file).expanduser().resolve()
+    if not in_file.exists():
+        return out({"ok": False, "error": {"code": "IPA_CACHE_FILE_NOT_FOUND", "message": str(in_file)}}, 2)
+    entries = json.loads(in_file.read_text(encoding="utf-8")).get("entries", [])
+    rows = [
+        (str(e["word"]).strip().lower(), e.get("ipa"), float(e.get("fetched_at") or time.time()))
+        for e in entries
+        if isinstance(e, dict) and str(e.get("word", "")).strip()
+    ]
+    conn = open_ipa_cache(ipa_cache_path(runtime_dir))
+    try:
+        conn.execute("BEGIN")
+        # Keep whichever side looked the word up most recently.
+        conn.executemany(
+            "INSERT INTO ipa_cache (word, ipa, fetched_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(word) DO UPDATE SET ipa = excluded.ipa, fetched_at = excluded.fetched_at "
+            "WHERE excluded.fetched_at > ipa_cache.fetched_at",
+            rows,
+        )
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    return out({"ok": True, "file": str(in_file), "imported": len(rows)})
+
+
+def cmd_ipa_stats(args: argparse.Namespace) -> int:
+    runtime_dir = project_runtime_dir(Path(args.project_root).expanduser().resolve())
+    db_path = ipa_cache_path(runtime_dir)
+    conn = open_ipa_cache(db_path)
+    try:
+        positive, negative = conn.execute("SELECT COUNT(ipa), COUNT(*) - COUNT(ipa) FROM ipa_cache").fetchone()
+    finally:
+        conn.close()
+    return out({"ok": True, "db": str(db_path), "positive": positive, "negative": negative})
+
+
+def cmd_ipa_build_index(args: argparse.Namespace) -> int:
+    runtime_dir = project_runtime_dir(Path(args.project_root).expanduser().resolve())
+    source = Path(args.source).expanduser().resolve()
+    if not source.exists():
+        return out({"ok": False, "error": {"code": "IPA_DICT_SOURCE_NOT_FOUND", "message": str(source)}}, 2)
+    output = Path(args.output).expanduser().resolve() if args.output else ipa_dictionary_path(runtime_dir)
+    count = build_ipa_dictionary(source, output)
+    return out({"ok": True, "source": str(source), "index": str(output), "words": count})
+
+
 def notify(title: str, message: str) -> None:
     if sys.platform != "darwin":
         return
@@ -1244,30 +4287,362 @@ def notify(title: str, message: str) -> None:
         pass
 
 
+def cmd_task_events(args: argparse.Namespace) -> int:
+    runtime_dir = project_runtime_dir(Path(args.project_root).expanduser().resolve())
+    try:
+        since = parse_since(args.since)
+    except ValueError:
+        return out({"ok": False, "error": {"code": "INVALID_SINCE", "message": args.since}}, 2)
+    events = read_events(runtime_dir, args.task_id, since)
+    if not args.follow:
+        return out({"ok": True, "task_id": args.task_id, "events": events})
+
+    for record in events:
+        out({"ok": True, "event": record})
+    sys.stdout.flush()
+    stop = threading.Event()
+    # Daemon and cancelled on exit: Ctrl-C or a closed pipe must not wait out --timeout.
+    timer = threading.Timer(args.timeout, stop.set) if args.timeout and args.timeout > 0 else None
+    if timer is not None:
+        timer.daemon = True
+        timer.start()
+    try:
+        for record in follow_events(runtime_dir, stop=stop):
+            if record.get("task_id") == args.task_id:
+                out({"ok": True, "event": record})
+                sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if timer is not None:
+            timer.cancel()
+    return 0
+
+
+def distribution(values: list[float]) -> dict:
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 1) if values else 0.0,
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p99": percentile(values, 99),
+        "max": round(max(values), 1) if values else 0.0,
+        "total": round(sum(values), 1),
+    }
+
+
+def aggregate_step_stats(runtime_dir: Path, tasks: list[dict], steps: list[str] | None = None) -> dict:
+    """Aggregate the metrics recorded in output_<step>.json across tasks."""
+    runs: dict[str, list[dict]] = {}
+    lessons: dict[str, list[dict]] = {}
+    for task in tasks:
+        for step in steps or STEP_ORDER:
+            try:
+                output = json.loads((runtime_dir / task["task_id"] / f"output_{step}.json").read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            if "metrics" not in output:
+                continue
+            runs.setdefault(step, []).append(output["metrics"])
+            lessons.setdefault(step, []).extend(
+                l["metrics"] for l in output.get("payload", {}).get("lessons", []) if isinstance(l, dict) and "metrics" in l
+            )
+
+    stats = {}
+    for step in STEP_ORDER:
+        if step not in runs:
+            continue
+        step_runs, step_lessons = runs[step], lessons.get(step, [])
+        requests = sum(m["network"]["requests"] for m in step_runs)
+        latency_total = sum(m["network"]["latency_ms_total"] for m in step_runs)
+        stats[step] = {
+            "runs": len(step_runs),
+            "wall_ms": distribution([m["wall_ms"] for m in step_runs]),
+            "child_cpu_ms": distribution([m["child_cpu_ms"] for m in step_runs]),
+            "cpu_ms": distribution([m["cpu_ms"] for m in step_runs]),
+            "steps_in_flight_max": max(m.get("steps_in_flight", 1) for m in step_runs),
+            "process_high_water": {
+                "rss_kb": max(m.get("process_high_water", {}).get("rss_kb", 0) for m in step_runs),
+                "child_rss_kb": max(m.get("process_high_water", {}).get("child_rss_kb", 0) for m in step_runs),
+            },
+            "bytes_in": sum(m["bytes_in"] for m in step_runs),
+            "bytes_out": sum(m["bytes_out"] for m in step_runs),
+            "network": {
+                "requests": requests,
+                "errors": sum(m["network"]["errors"] for m in step_runs),
+                "latency_ms_mean": round(latency_total / requests, 1) if requests else 0.0,
+                "latency_ms_p90_per_run": distribution([m["network"]["latency_ms_p90"] for m in step_runs if m["network"]["requests"]]),
+            },
+            "lessons": {
+                "wall_ms": distribution([m["wall_ms"] for m in step_lessons]),
+                "child_cpu_ms": distribution([m["child_cpu_ms"] for m in step_lessons]),
+                "bytes_in": distribution([m.get("bytes_in", 0) for m in step_lessons]),
+            },
+        }
+    return stats
+
+
+def cmd_task_stats(args: argparse.Namespace) -> int:
+    runtime_dir = project_runtime_dir(Path(args.project_root).expanduser().resolve())
+    if args.task_ids:
+        tasks = []
+        for task_id in args.task_ids:
+            try:
+                tasks.append(load_task(runtime_dir, task_id))
+            except FileNotFoundError:
+                return out({"ok": False, "error": {"code": "TASK_NOT_FOUND", "message": task_id}}, 2)
+    else:
+        tasks = list_tasks(runtime_dir, status=args.status, course_id=args.course_id)
+    steps = [args.step] if args.step else None
+    return out({"ok": True, "tasks": len(tasks), "steps": aggregate_step_stats(runtime_dir, tasks, steps)})
+
+
+def _watch_changes(task: dict, previous: dict | None) -> list[dict]:
+    task_id = task["task_id"]
+    changes = []
+    if previous is None or previous["status"] != task["status"]:
+        changes.append({"task_id": task_id, "status": task["status"], "current_step": task.get("current_step")})
+    if previous is not None:
+        for step in STEP_ORDER:
+            before, after = previous["steps"].get(step), task["steps"].get(step)
+            if before != after:
+                changes.append({"task_id": task_id, "step": step, "from": before, "to": after})
+    return changes
+
+
+def watch_tasks(
+    runtime_dir: Path,
+    task_ids: list[str],
+    status: str | None = None,
+    interval: float = 2.0,
+    timeout: float = 0,
+    emit=None,
+) -> tuple[int, dict]:
+    """Report status and step transitions of task_ids (and/or every task in a status class).
+
+    Wakes on new events for the watched tasks, with interval as a polling fallback.
+    Ends when every listed task is terminal or, for a status class, when the class is empty.
+    """
+    deadline = time.time() + timeout if timeout and timeout > 0 else None
+    snapshots: dict[str, dict] = {}
+    wake, stop, listening = threading.Event(), threading.Event(), threading.Event()
+
+    def listen() -> None:
+        for record in follow_events(runtime_dir, poll=0.05, stop=stop, ready=listening):
+            if status is not None or record.get("task_id") in snapshots or record.get("task_id") in task_ids:
+                wake.set()
+
+    threading.Thread(target=listen, name="watch-events", daemon=True).start()
+    listening.wait(5)
+    try:
+        while True:
+            wake.clear()
+            tasks = {}
+            for task_id in task_ids:
+                try:
+                    tasks[task_id] = load_task(runtime_dir, task_id)
+                except FileNotFoundError:
+                    return 2, {"ok": False, "error": {"code": "TASK_NOT_FOUND", "message": task_id}}
+            in_class = []
+            if status is not None:
+                in_class = list_tasks(runtime_dir, status=status)
+                tasks.update({t["task_id"]: t for t in in_class})
+                # Tasks that just left the class get one more look so their transition is reported.
+                for task_id in set(snapshots) - set(tasks):
+                    try:
+                        tasks[task_id] = load_task(runtime_dir, task_id)
+                    except FileNotFoundError:
+                        snapshots.pop(task_id)
+
+            for task_id, task in tasks.items():
+                for change in _watch_changes(task, snapshots.get(task_id)):
+                    if emit is not None:
+                        emit(change)
+                snapshots[task_id] = {"status": task["status"], "steps": dict(task["steps"])}
+            if status is not None:
+                class_ids = {t["task_id"] for t in in_class}
+                for task_id in [t for t in snapshots if t not in class_ids and t not in task_ids]:
+                    snapshots.pop(task_id)
+
+            listed_done = all(tasks[t]["status"] in TERMINAL_STATUSES for t in task_ids)
+            if listed_done and (status is None or not in_class):
+                if len(task_ids) == 1 and status is None:
+                    return 0, {"ok": True, "final": tasks[task_ids[0]]}
+                return 0, {"ok": True, "final": [tasks[t] for t in sorted(tasks)]}
+
+            if deadline and time.time() >= deadline:
+                return 3, {"ok": False, "error": {"code": "WATCH_TIMEOUT", "message": ",".join(task_ids) or status}}
+            wait_for = interval if deadline is None else min(interval, max(0.0, deadline - time.time()))
+            wake.wait(wait_for)
+    finally:
+        stop.set()
+
+
 def cmd_task_watch(args: argparse.Namespace) -> int:
     runtime_dir = project_runtime_dir(Path(args.project_root).expanduser().resolve())
-    timeout_deadline = time.time() + args.timeout if args.timeout and args.timeout > 0 else None
-    last_status = None
+    task_ids = list(args.task_ids)
+    if not task_ids and not args.status:
+        return out({"ok": False, "error": {"code": "INVALID_ARGS", "message": "give task ids and/or --status"}}, 2)
 
-    while True:
-        try:
-            task = load_task(runtime_dir, args.task_id)
-        except FileNotFoundError:
-            return out({"ok": False, "error": {"code": "TASK_NOT_FOUND", "message": args.task_id}}, 2)
+    def emit(change: dict) -> None:
+        out({"ok": True, "watch": change})
+        sys.stdout.flush()
+        if change.get("status") in TERMINAL_STATUSES:
+            notify("Course Task", f"{change['task_id']} is {change['status']}")
+
+    try:
+        code, payload = watch_tasks(runtime_dir, task_ids, args.status, max(args.interval, 1), args.timeout, emit)
+    except KeyboardInterrupt:
+        return 0
+    return out(payload, code)
+
+
+STEP_RESOURCE_CLASS = {
+    "ffmpeg": "cpu",
+    "asr": "cpu",
+    "align": "io",
+    "translate": "network",
+    "grammar": "io",
+    "summary": "io",
+    "package": "io",
+}
+
+
+def worker_class_limits(overrides: dict[str, int | None] | None = None) -> dict[str, int]:
+    defaults = {"cpu": max(1, (os.cpu_count() or 2) // 2), "network": 4, "io": 2}
+    limits = {}
+    for cls, default in defaults.items():
+        value = (overrides or {}).get(cls)
+        if value is None:
+            value = int(os.getenv(f"COURSE_PIPELINE_WORKER_{cls.upper()}_SLOTS", str(default)))
+        limits[cls] = max(1, value)
+    return limits
+
+
+def next_runnable_step(task: dict, include_hitl: bool = False) -> str | None:
+    if task.get("status") != "processing":
+        return None
+    stale = stale_running_step(task)
+    if stale is None and any(state == "running" for state in task.get("steps", {}).values()):
+        return None
+    step = stale or _next_incomplete_step(task)
+    if step is None or (step in HITL_STEPS and not include_hitl):
+        return None
+    return step
+
+
+def run_worker(
+    runtime_dir: Path,
+    limits: dict[str, int],
+    include_hitl: bool = False,
+    jobs: int | None = None,
+    interval: float = 2.0,
+    once: bool = False,
+    stop: threading.Event | None = None,
+    on_result=None,
+) -> dict:
+    """Drive runnable tasks until stopped (or, with once, until nothing is runnable).
+
+    Steps are scheduled across tasks with one concurrency limit per resource class.
+    A stop request lets in-flight steps finish but claims no new ones.
+    """
+    stop = stop or threading.Event()
+    busy = {cls: 0 for cls in limits}
+    in_flight: dict = {}
+    summary = {"executed": [], "failed": [], "refused": []}
+    executor = ThreadPoolExecutor(max_workers=sum(limits.values()), thread_name_prefix="course-worker")
+    try:
+        while True:
+            if not stop.is_set():
+                active = {task_id for task_id, _, _ in in_flight.values()}
+                # Least recently updated first, so steps round-robin across tasks.
+                for task in sorted(list_tasks(runtime_dir, status="processing"), key=lambda t: t.get("updated_at") or ""):
+                    step = next_runnable_step(task, include_hitl)
+                    if step is None or task["task_id"] in active:
+                        continue
+                    cls = STEP_RESOURCE_CLASS[step]
+                    if busy[cls] >= limits[cls]:
+                        continue
+                    future = executor.submit(_run_single_step, runtime_dir, task["task_id"], step, jobs)
+                    in_flight[future] = (task["task_id"], step, cls)
+                    busy[cls] += 1
+                    active.add(task["task_id"])
+            if not in_flight:
+                if stop.is_set() or once:
+                    break
+                stop.wait(interval)
+                continue
+            done, _ = wait(in_flight, timeout=interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                task_id, step, cls = in_flight.pop(future)
+                busy[cls] -= 1
+                try:
+                    code, payload = future.result()
+                except Exception as exc:
+                    code, payload = 3, {"ok": False, "error": {"code": "STEP_FAILED", "message": str(exc), "step": step}}
+                entry = {"task_id": task_id, "step": step, "resource_class": cls}
+                if code == 0:
+                    summary["executed"].append(entry)
+                elif "task" not in payload:
+                    # Another worker claimed the task first; nothing changed.
+                    summary["refused"].append(entry)
+                else:
+                    summary["failed"].append({**entry, "error": payload.get("error")})
+                if on_result is not None:
+                    on_result(entry, code, payload)
+    finally:
+        executor.shutdown(wait=True)
+        # Nothing may be left to land in the runtime dir once the worker has returned.
+        close_event_logs()
+    return summary
+
+
+def cmd_worker(args: argparse.Namespace) -> int:
+    runtime_dir = project_runtime_dir(Path(args.project_root).expanduser().resolve())
+    limits = worker_class_limits({"cpu": args.cpu_slots, "network": args.network_slots, "io": args.io_slots})
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        stop.set()
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, request_stop)
+
+    def report(entry: dict, code: int, payload: dict) -> None:
+        task = payload.get("task") or {}
+        out({"ok": code == 0, "worker": {**entry, "status": task.get("status"), "error": payload.get("error")}})
+        sys.stdout.flush()
+
+    append_event(runtime_dir, "-", "worker.start", {"pid": os.getpid(), "limits": limits, "hitl": args.hitl})
+    summary = run_worker(
+        runtime_dir,
+        limits,
+        include_hitl=args.hitl,
+        jobs=args.jobs,
+        interval=args.interval,
+        once=args.once,
+        stop=stop,
+        on_result=report,
+    )
+    append_event(
+        runtime_dir,
+        "-",
+        "worker.stop",
+        {"pid": os.getpid(), "executed": len(summary["executed"]), "failed": len(summary["failed"])},
+    )
+    return out({"ok": True, "limits": limits, **summary})
 
-        status = task["status"]
-        if status != last_status:
-            out({"ok": True, "watch": {"task_id": args.task_id, "status": status, "current_step": task.get("current_step")}})
-            last_status = status
 
-        if status in TERMINAL_STATUSES:
-            notify("Course Task", f"{args.task_id} is {status}")
-            return out({"ok": True, "final": task})
+def cmd_store_migrate(args: argparse.Namespace) -> int:
+    runtime_dir = project_runtime_dir(Path(args.project_root).expanduser().resolve())
+    result = migrate_task_json(runtime_dir)
+    append_event(runtime_dir, "-", "store.migrate", {"imported": len(result["imported"])})
+    return out({"ok": True, "store": str(task_store_path(runtime_dir)), **result})
 
-        if timeout_deadline and time.time() >= timeout_deadline:
-            return out({"ok": False, "error": {"code": "WATCH_TIMEOUT", "message": args.task_id}}, 3)
 
-        time.sleep(max(args.interval, 1))
+def cmd_store_export(args: argparse.Namespace) -> int:
+    runtime_dir = project_runtime_dir(Path(args.project_root).expanduser().resolve())
+    return out({"ok": True, "exported": export_task_json(runtime_dir)})
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -1287,6 +4662,11 @@ def build_parser() -> argparse.ArgumentParser:
         dest="auto_start",
         help="Create task only; do not auto-run non-HITL steps.",
     )
+    course_add.add_argument(
+        "--queue",
+        action="store_true",
+        help="Create the task as processing and leave it to a running worker.",
+    )
     course_add.set_defaults(auto_start=True)
     course_add.set_defaults(func=cmd_course_add)
 
@@ -1329,25 +4709,110 @@ def build_parser() -> argparse.ArgumentParser:
         dest="auto_chain",
         help="Run only the specified step; do not auto-run following non-HITL steps.",
     )
+    task_run_step.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Lessons processed concurrently by the ffmpeg step (default: $COURSE_PIPELINE_JOBS or 1).",
+    )
+    task_run_step.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-run every lesson even if its inputs are unchanged since the last run.",
+    )
     task_run_step.set_defaults(auto_chain=True)
     task_run_step.set_defaults(func=cmd_task_run_step)
 
     task_run_auto = task_actions.add_parser("run-auto")
     task_run_auto.add_argument("task_id")
+    task_run_auto.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Lessons processed concurrently by the ffmpeg step (default: $COURSE_PIPELINE_JOBS or 1).",
+    )
+    task_run_auto.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-run every lesson even if its inputs are unchanged since the last run.",
+    )
     task_run_auto.set_defaults(func=cmd_task_run_auto)
 
+    task_events = task_actions.add_parser("events")
+    task_events.add_argument("task_id")
+    task_events.add_argument("--since", help="ISO timestamp or relative age such as 30m, 2h, 7d.")
+    task_events.add_argument("--follow", action="store_true", help="Keep printing new events as they are logged.")
+    task_events.add_argument("--timeout", type=int, default=0, help="Stop following after this many seconds (0 = never).")
+    task_events.set_defaults(func=cmd_task_events)
+
+    task_stats = task_actions.add_parser("stats")
+    task_stats.add_argument("task_ids", nargs="*", metavar="task_id", help="Tasks to aggregate (default: all).")
+    task_stats.add_argument("--status", choices=sorted(STATUSES))
+    task_stats.add_argument("--course-id")
+    task_stats.add_argument("--step", choices=STEP_ORDER)
+    task_stats.set_defaults(func=cmd_task_stats)
+
     task_watch = task_actions.add_parser("watch")
-    task_watch.add_argument("task_id")
-    task_watch.add_argument("--interval", type=int, default=2)
+    task_watch.add_argument("task_ids", nargs="*", metavar="task_id")
+    task_watch.add_argument("--status", choices=sorted(STATUSES), help="Also watch every task in this status until none is left.")
+    task_watch.add_argument("--interval", type=int, default=2, help="Fallback poll interval; changes wake the watch immediately.")
     task_watch.add_argument("--timeout", type=int, default=0)
     task_watch.set_defaults(func=cmd_task_watch)
 
+    worker = root.add_parser("worker", help="Run queued tasks until interrupted.")
+    worker.add_argument("--cpu-slots", type=int, default=None, help="Concurrent ffmpeg/asr steps (default: $COURSE_PIPELINE_WORKER_CPU_SLOTS or half the CPUs).")
+    worker.add_argument("--network-slots", type=int, default=None, help="Concurrent translate steps (default: $COURSE_PIPELINE_WORKER_NETWORK_SLOTS or 4).")
+    worker.add_argument("--io-slots", type=int, default=None, help="Concurrent align/grammar/summary/package steps (default: $COURSE_PIPELINE_WORKER_IO_SLOTS or 2).")
+    worker.add_argument("--hitl", action="store_true", help="Also run HITL steps instead of leaving them for review.")
+    worker.add_argument("--jobs", type=int, default=None, help="Lessons processed concurrently inside one ffmpeg step.")
+    worker.add_argument("--interval", type=float, default=2.0, help="Seconds between queue polls.")
+    worker.add_argument("--once", action="store_true", help="Exit once no task is runnable.")
+    worker.set_defaults(func=cmd_worker)
+
+    ipa = root.add_parser("ipa")
+    ipa_actions = ipa.add_subparsers(dest="action", required=True)
+
+    ipa_export = ipa_actions.add_parser("export")
+    ipa_export.add_argument("file")
+    ipa_export.add_argument(
+        "--positive-only",
+        action="store_true",
+        help="Skip cached not-found results.",
+    )
+    ipa_export.set_defaults(func=cmd_ipa_export)
+
+    ipa_import = ipa_actions.add_parser("import")
+    ipa_import.add_argument("file")
+    ipa_import.set_defaults(func=cmd_ipa_import)
+
+    ipa_build = ipa_actions.add_parser("build-index")
+    ipa_build.add_argument("source", help="CMUdict file or word<TAB>/ipa/ table.")
+    ipa_build.add_argument("--output", help="Index path (default: $COURSE_PIPELINE_IPA_DICT or .runtime/cache/ipa_dict.bin).")
+    ipa_build.set_defaults(func=cmd_ipa_build_index)
+
+    ipa_stats = ipa_actions.add_parser("stats")
+    ipa_stats.set_defaults(func=cmd_ipa_stats)
+
+    store = root.add_parser("store")
+    store_actions = store.add_subparsers(dest="action", required=True)
+
+    store_migrate = store_actions.add_parser("migrate", help="Import task_*.json files into the SQLite task store.")
+    store_migrate.set_defaults(func=cmd_store_migrate)
+
+    store_export = store_actions.add_parser("export", help="Write a task_*.json mirror of every stored task.")
+    store_export.set_defaults(func=cmd_store_export)
+
     return parser
 
 
 def main() -> int:
     parser = build_parser()
     args = parser.parse_args()
+    for name in INT_ENV_KEYS:
+        try:
+            env_int(name, 0)
+        except ValueError as exc:
+            return out({"ok": False, "error": {"code": "INVALID_ARGS", "message": str(exc)}}, 2)
     return args.func(args)
 
 
@@ -0,0 +1,23 @@
+"""Stand-in for the whisper package, importable by spawned pool processes.
+
+Each transcript is one segment named after the audio file, spanning the file minus half
+a second at either end. Set FAKE_WHISPER_LOG to log every model load with OMP_NUM_THREADS.
+"""
+import os
+import wave
+from pathlib import Path
+
+
+class Model:
+    def transcribe(self, audio, **options):
+        with wave.open(audio, "rb") as w:
+            seconds = w.getnframes() / w.getframerate()
+        return {"segments": [{"start": 0.5, "end": seconds - 0.5, "text": f" {Path(audio).stem} "}]}
+
+
+def load_model(name, device=None):
+    log = os.getenv("FAKE_WHISPER_LOG")
+    if log:
+        with open(log, "a", encoding="utf-8") as f:
+            f.write(f"{os.getpid()} {os.getenv('OMP_NUM_THREADS')}\n")
+    return Model()
@@ -0,0 +1,33 @@
+"""Task records shared by the store, locking, lease, watch, worker and metrics tests."""
+from pathlib import Path
+
+# Import project script functions directly for unit checks.
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import course_pipeline_ops as ops  # noqa: E402
+
+
+def make_task(
+    task_id: str,
+    status: str = "processing",
+    steps: dict | None = None,
+    lesson_keys: list[str] | None = None,
+    **fields,
+) -> dict:
+    """A saved-task dict; steps overrides individual step states, fields override anything else."""
+    step_states = {s: "pending" for s in ops.STEP_ORDER}
+    step_states.update(steps or {})
+    task = {
+        "task_id": task_id,
+        "course_id": "course_demo",
+        "course_path": "/tmp/demo",
+        "status": status,
+        "current_step": next((s for s in ops.STEP_ORDER if step_states[s] != "done"), "package"),
+        "steps": step_states,
+        "lesson_keys": ["01"] if lesson_keys is None else list(lesson_keys),
+        "error": None,
+        "created_at": "2026-01-01T00:00:00Z",
+        "updated_at": "2026-01-01T00:00:00Z",
+    }
+    task.update(fields)
+    return task
@@ -0,0 +1,112 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Import project script functions directly for unit checks.
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+import course_pipeline_ops as ops  # noqa: E402
+from stub_servers import StubTranslateServer  # noqa: E402
+
+
+def cue(start_s: float, end_s: float, text: str) -> dict:
+    return {"start_ms": int(start_s * 1000), "end_ms": int(end_s * 1000), "text": text}
+
+
+EN = [
+    cue(0, 2, "Good morning."),
+    cue(2, 6, "Today we will read a long story together."),
+    cue(6, 7.5, "Open your books."),
+    cue(7.5, 9, "Turn to page ten."),
+    cue(9, 10, "Ready?"),
+    cue(11, 13, "Let's begin."),
+]
+ZH = [
+    cue(0, 2.05, "早上好。"),
+    cue(2, 4, "今天我们一起"),
+    cue(4, 6, "读一个长故事。"),
+    cue(6, 9, "打开书，翻到第十页。"),
+    cue(11, 13, "开始吧。"),
+]
+
+
+class TestOverlapAlignment(unittest.TestCase):
+    def test_groups_handle_splits_merges_and_gaps(self):
+        groups = ops.align_cues_by_overlap(EN, ZH)
+        self.assertEqual(
+            [(g["en"], g["zh"]) for g in groups],
+            [([0], [0]), ([1], [1, 2]), ([2, 3], [3]), ([4], []), ([5], [4])],
+        )
+        alignment = ops.build_alignment_map(EN, ZH)
+        self.assertEqual(alignment["stats"], {"1:1": 2, "1:N": 1, "N:1": 1, "en_only": 1})
+        self.assertEqual(
+            ops.zh_for_en_cues(alignment),
+            [
+                ("早上好。", "1:1"),
+                ("今天我们一起 读一个长故事。", "1:N"),
+                ("打开书，翻到第十页。", "N:1"),
+                ("打开书，翻到第十页。", "N:1"),
+                ("", "en_only"),
+                ("开始吧。", "1:1"),
+            ],
+        )
+
+    def test_unsorted_input_and_extra_zh_cue(self):
+        en = [EN[5], EN[0]]
+        zh = [ZH[0], cue(20, 21, "多余的字幕"), ZH[4]]
+        groups = ops.align_cues_by_overlap(en, zh)
+        self.assertEqual([(g["en"], g["zh"]) for g in groups], [([1], [0]), ([0], [2]), ([], [1])])
+
+
+class TestAlignStep(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        root = Path(self._td.name)
+        self.raw = root / "raw"
+        self.raw.mkdir()
+        self.runtime = ops.project_runtime_dir(root)
+        self.task = {"task_id": "task_align001", "course_path": str(self.raw), "lesson_keys": ["01"]}
+        self.lesson_dir = self.runtime / self.task["task_id"] / "artifacts" / "01"
+        self.lesson_dir.mkdir(parents=True)
+        ops.write_srt(self.lesson_dir / "sub_en.srt", EN)
+        ops.write_srt(self.raw / "01.zh.srt", ZH)
+
+    def tearDown(self):
+        self._td.cleanup()
+
+    def _translate(self) -> tuple[list[dict], int]:
+        with StubTranslateServer() as stub:
+            env = {"COURSE_PIPELINE_TRANSLATE_ENDPOINT": stub.endpoint, "COURSE_PIPELINE_IPA_OFFLINE": "1"}
+            with mock.patch.dict(os.environ, env):
+                payload = ops.execute_step_translate(self.task, self.runtime)
+        effective = json.loads(Path(payload["lessons"][0]["output_file"]).read_text(encoding="utf-8"))
+        return effective["sentences"], stub.requests
+
+    def test_translate_pairs_through_the_alignment_map(self):
+        payload = ops.execute_step_align(self.task, self.runtime)
+        self.assertEqual(payload["lessons"][0]["pairs"]["N:1"], 1)
+        self.assertTrue((self.lesson_dir / ops.ALIGNMENT_FILE).exists())
+
+        sentences, requests = self._translate()
+        self.assertEqual(requests, 1)
+        self.assertEqual([s["source"] for s in sentences], ["provided"] * 4 + ["machine", "provided"])
+        self.assertEqual(sentences[4]["zh"], "译:Ready?")
+        self.assertEqual(sentences[5]["zh"], "开始吧。")
+        self.assertEqual(sentences[3]["align"], "N:1")
+
+        # translate rewrote sub_zh.srt one cue per line; a second run still pairs from the map.
+        sentences, _ = self._translate()
+        self.assertEqual(sentences[1]["zh"], "今天我们一起 读一个长故事。")
+
+    def test_map_for_another_transcript_is_ignored(self):
+        ops.execute_step_align(self.task, self.runtime)
+        ops.write_srt(self.lesson_dir / "sub_en.srt", EN[:2])
+        self.assertIsNone(ops.load_alignment(self.lesson_dir / ops.ALIGNMENT_FILE, self.lesson_dir / "sub_en.srt"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+import wave
+from pathlib import Path
+from unittest import mock
+
+# Import project script functions directly for unit checks.
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import course_pipeline_ops as ops  # noqa: E402
+
+np = ops._import_numpy()
+RATE = 16000
+
+
+def write_speech_like_wav(path: Path, spans_s: list[tuple[float, float]], total_s: float) -> None:
+    """A 440 Hz tone during spans_s, low noise elsewhere."""
+    rng = np.random.default_rng(0)
+    samples = rng.normal(0, 30, int(total_s * RATE))
+    t = np.arange(len(samples)) / RATE
+    for start, end in spans_s:
+        mask = (t >= start) & (t < end)
+        samples[mask] += 8000 * np.sin(2 * np.pi * 440 * t[mask])
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(RATE)
+        w.writeframes(np.clip(samples, -32768, 32767).astype("<i2").tobytes())
+
+
+# Pool processes are spawned, so the fake must be importable rather than patched in.
+FAKES = Path(__file__).resolve().parent / "fakes"
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestVadChunking(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        self.wav = Path(self._td.name) / "audio_16k.wav"
+
+    def tearDown(self):
+        self._td.cleanup()
+
+    def test_silence_spans_find_pauses(self):
+        write_speech_like_wav(self.wav, [(0, 9.5), (10.5, 19.5), (20.5, 30)], 30)
+        levels, duration_ms = ops.wav_frame_energy_db(np, self.wav)
+        self.assertEqual(duration_ms, 30000)
+        spans = ops.silence_spans(np, levels)
+        self.assertEqual(len(spans), 2)
+        for (start, end), expected in zip(spans, [10000, 20000]):
+            self.assertLess(abs((start + end) // 2 - expected), 100)
+
+    def test_cuts_prefer_pauses_and_hard_cuts_overlap(self):
+        chunks = ops.plan_asr_chunks(60000, [(19000, 21000), (44000, 45000)], 20000)
+        self.assertEqual([c["owns_from_ms"] for c in chunks], [0, 20000, 44500])
+        self.assertEqual([c["cut"] for c in chunks], [None, "silence", "silence"])
+        self.assertEqual(chunks[0]["end_ms"], chunks[1]["start_ms"])
+
+        hard = ops.plan_asr_chunks(60000, [], 20000)
+        self.assertEqual([c["cut"] for c in hard], [None, "hard", "hard"])
+        self.assertEqual(hard[0]["end_ms"] - hard[1]["start_ms"], 2 * ops.ASR_CHUNK_OVERLAP_MS)
+
+    def test_stitch_offsets_and_folds_boundary_repeats(self):
+        first = {"start_ms": 0, "end_ms": 21000, "owns_from_ms": 0}
+        second = {"start_ms": 19000, "end_ms": 40000, "owns_from_ms": 20000}
+        cues = ops.stitch_chunk_cues(
+            [
+                (first, [{"start_ms": 18000, "end_ms": 19900, "text": "See you at the station."}, {"start_ms": 20500, "end_ms": 21000, "text": "Cut"}]),
+                (second, [{"start_ms": 1000, "end_ms": 1800, "text": "see you at the station"}, {"start_ms": 3000, "end_ms": 5000, "text": "Bye."}]),
+            ]
+        )
+        self.assertEqual([c["text"] for c in cues], ["See you at the station.", "Bye."])
+        self.assertEqual(cues[0]["end_ms"], 20800)
+        self.assertEqual(cues[1]["start_ms"], 22000)
+
+    def test_long_lesson_is_transcribed_in_parallel_chunks(self):
+        runtime = Path(self._td.name) / "runtime"
+        lesson_dir = runtime / "task_chunk001" / "artifacts" / "01"
+        lesson_dir.mkdir(parents=True)
+        write_speech_like_wav(lesson_dir / "audio_16k.wav", [(0, 19.5), (20.5, 39.5), (40.5, 60)], 60)
+        task = {"task_id": "task_chunk001", "course_path": str(Path(self._td.name)), "lesson_keys": ["01"]}
+        load_log = Path(self._td.name) / "loads.log"
+        env = {
+            "COURSE_PIPELINE_ASR_CHUNKED": "1",
+            "COURSE_PIPELINE_ASR_CHUNK_SECONDS": "20",
+            "COURSE_PIPELINE_CPU_BUDGET": "8",
+            "FAKE_WHISPER_LOG": str(load_log),
+        }
+        with mock.patch.object(sys, "path", [str(FAKES), *sys.path]), mock.patch.dict(sys.modules), mock.patch.dict(
+            os.environ, env
+        ):
+            sys.modules.pop("whisper", None)
+            payload = ops.execute_step_asr(task, runtime, jobs=2)
+
+        lesson = payload["lessons"][0]
+        self.assertEqual(lesson["source"], "whisper_local")
+        self.assertEqual(lesson["chunked"]["chunks"], 3)
+        self.assertEqual(lesson["chunked"]["workers"], 2)
+        self.assertEqual(lesson["chunked"]["silence_cuts"], 2)
+        cues = ops.parse_srt(lesson_dir / "sub_en.srt")
+        self.assertEqual([c["text"] for c in cues], ["c000", "c001", "c002"])
+        self.assertLess(abs(cues[1]["start_ms"] - 20500), 100)
+        self.assertFalse((lesson_dir / ".asr_chunks").exists())
+        # One load per pool process, made in its initializer with torch held to 8 // 2 threads.
+        loads = load_log.read_text(encoding="utf-8").split("\n")[:-1]
+        self.assertEqual(len(loads), 2)
+        self.assertEqual({line.split()[1] for line in loads}, {"4"})
+        self.assertNotIn(str(os.getpid()), {line.split()[0] for line in loads})
+
+    def test_pool_size_follows_jobs_settings(self):
+        with mock.patch.dict(os.environ, {"COURSE_PIPELINE_ASR_JOBS": "", "COURSE_PIPELINE_JOBS": ""}):
+            self.assertEqual(ops.asr_chunk_jobs(), 1)
+        with mock.patch.dict(os.environ, {"COURSE_PIPELINE_ASR_JOBS": "", "COURSE_PIPELINE_JOBS": "3"}):
+            self.assertEqual(ops.asr_chunk_jobs(), 3)
+            self.assertEqual(ops.asr_chunk_jobs(2), 2)
+        with mock.patch.dict(os.environ, {"COURSE_PIPELINE_ASR_JOBS": "5", "COURSE_PIPELINE_JOBS": "3"}):
+            self.assertEqual(ops.asr_chunk_jobs(), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
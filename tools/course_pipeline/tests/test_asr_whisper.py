@@ -0,0 +1,104 @@
+import os
+import subprocess
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Import project script functions directly for unit checks.
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import course_pipeline_ops as ops  # noqa: E402
+
+
+class FakeModel:
+    def __init__(self):
+        self.decoded = []
+
+    def transcribe(self, audio, **options):
+        self.decoded.append(Path(audio).parent.name)
+        if Path(audio).parent.name == "03":
+            return {"segments": []}
+        return {"segments": [{"start": 0.0, "end": 1.5, "text": f" Lesson {Path(audio).parent.name} "}]}
+
+
+def fake_whisper_module():
+    module = types.ModuleType("whisper")
+    module.loads = []
+
+    def load_model(name, device=None):
+        module.loads.append((name, device))
+        return FakeModel()
+
+    module.load_model = load_model
+    return module
+
+
+class TestWarmWhisper(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        root = Path(self._td.name)
+        self.raw = root / "raw"
+        self.raw.mkdir()
+        self.runtime = ops.project_runtime_dir(root)
+        self.task = {"task_id": "task_asr00001", "course_path": str(self.raw), "lesson_keys": ["01", "02"]}
+        for key in ["01", "02", "03"]:
+            lesson_dir = self.runtime / self.task["task_id"] / "artifacts" / key
+            lesson_dir.mkdir(parents=True)
+            (lesson_dir / "audio_16k.wav").write_bytes(b"RIFF")
+        ops._WHISPER_MODELS.clear()
+        self.addCleanup(ops._WHISPER_MODELS.clear)
+
+    def tearDown(self):
+        self._td.cleanup()
+
+    def _sub_en(self, key: str) -> list[dict]:
+        return ops.parse_srt(self.runtime / self.task["task_id"] / "artifacts" / key / "sub_en.srt")
+
+    def test_model_loads_once_and_stays_warm(self):
+        whisper = fake_whisper_module()
+        with mock.patch.dict(sys.modules, {"whisper": whisper}), mock.patch.dict(os.environ, {"COURSE_PIPELINE_WHISPER_MODEL": "small"}):
+            first = ops.execute_step_asr(self.task, self.runtime)
+            second = ops.execute_step_asr(self.task, self.runtime)
+
+        self.assertEqual(whisper.loads, [("small", None)])
+        self.assertEqual(first["whisper"]["backend"], "python")
+        self.assertFalse(first["whisper"]["model_warm"])
+        self.assertTrue(second["whisper"]["model_warm"])
+        self.assertEqual(second["whisper"]["model_load_ms"], 0.0)
+        self.assertEqual([l["source"] for l in first["lessons"]], ["whisper_local", "whisper_local"])
+        self.assertTrue(all("decode_ms" in l for l in first["lessons"]))
+        self.assertEqual(self._sub_en("02")[0]["text"], "Lesson 02")
+
+    def test_failed_lesson_gets_placeholder(self):
+        task = {**self.task, "lesson_keys": ["01", "03"]}
+        with mock.patch.dict(sys.modules, {"whisper": fake_whisper_module()}):
+            payload = ops.execute_step_asr(task, self.runtime)
+        self.assertEqual([l["source"] for l in payload["lessons"]], ["whisper_local", "whisper_output_empty"])
+        self.assertTrue(ops.is_pending_text(self._sub_en("03")[0]["text"]))
+
+    def test_cli_backend_transcribes_all_lessons_in_one_invocation(self):
+        calls = []
+
+        def fake_run(cmd, **kwargs):
+            calls.append(cmd)
+            output_dir = Path(cmd[cmd.index("--output_dir") + 1])
+            for arg in cmd[1 : cmd.index("--task")]:
+                key = Path(arg).stem
+                (output_dir / f"{key}.srt").write_text(f"1\n00:00:00,000 --> 00:00:01,000\nCLI {key}\n", encoding="utf-8")
+            return subprocess.CompletedProcess(cmd, 0, "", "")
+
+        with mock.patch.dict(os.environ, {"COURSE_PIPELINE_WHISPER_BACKEND": "cli"}), mock.patch.object(
+            ops, "which", return_value="/usr/bin/whisper"
+        ), mock.patch.object(ops.subprocess, "run", side_effect=fake_run):
+            payload = ops.execute_step_asr(self.task, self.runtime)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(payload["whisper"]["backend"], "cli")
+        self.assertEqual(self._sub_en("01")[0]["text"], "CLI 01")
+        self.assertEqual(self._sub_en("02")[0]["text"], "CLI 02")
+
+
+if __name__ == "__main__":
+    unittest.main()
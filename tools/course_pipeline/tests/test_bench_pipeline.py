@@ -0,0 +1,59 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+# Import project script functions directly for unit checks.
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+import course_pipeline_ops as ops  # noqa: E402
+import bench_pipeline  # noqa: E402
+from synthetic_course import generate_course  # noqa: E402
+
+COURSE = {"lessons": 2, "media_seconds": 30, "sentences": 12, "seed": 7, "media": False, "with_zh": False}
+
+
+class TestSyntheticCourse(unittest.TestCase):
+    def test_same_seed_generates_same_course(self):
+        with tempfile.TemporaryDirectory() as td:
+            first, second = Path(td) / "a", Path(td) / "b"
+            generate_course(first, **COURSE)
+            generate_course(second, **COURSE)
+            self.assertEqual(ops.scan_raw_lessons(first), (["01", "02"], None))
+            cues = ops.parse_srt(first / "01.en.srt")
+            self.assertEqual(len(cues), 12)
+            self.assertLessEqual(cues[-1]["end_ms"], 30_000)
+            self.assertEqual((first / "02.en.srt").read_bytes(), (second / "02.en.srt").read_bytes())
+
+
+class TestPipelineBenchmark(unittest.TestCase):
+    def test_every_step_reports_throughput_against_stubs(self):
+        result = bench_pipeline.run_benchmark(COURSE)
+        self.assertEqual(list(result["steps"]), ["asr", "align", "translate", "grammar", "summary", "package", "total"])
+        for row in result["steps"].values():
+            self.assertGreater(row["sentences_per_sec"], 0)
+            self.assertGreater(row["lessons_per_min"], 0)
+        self.assertGreater(result["steps"]["translate"]["network_requests"], 0)
+        self.assertGreater(result["stubs"]["translate_requests"], 0)
+        self.assertGreater(result["stubs"]["ipa_requests"], 0)
+
+    def test_comparison_flags_regressions(self):
+        current = {
+            "course": COURSE,
+            "settings": {"jobs": 1},
+            "steps": {"grammar": {"lessons_per_min": 50.0, "sentences_per_sec": 5.0, "media_seconds_per_wall_second": 0.0}},
+        }
+        baseline = {
+            "course": COURSE,
+            "settings": {"jobs": 1},
+            "steps": {"grammar": {"lessons_per_min": 100.0, "sentences_per_sec": 10.0, "media_seconds_per_wall_second": 0.0}},
+        }
+        comparison = bench_pipeline.compare_results(current, baseline, max_regression=0.2)
+        self.assertTrue(comparison["comparable"])
+        self.assertEqual(comparison["steps"]["grammar"], {"lessons_per_min": 0.5, "sentences_per_sec": 0.5})
+        self.assertEqual(comparison["regressions"], ["grammar"])
+        self.assertEqual(bench_pipeline.compare_results(baseline, baseline, max_regression=0.2)["regressions"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
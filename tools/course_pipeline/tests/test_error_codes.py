@@ -0,0 +1,20 @@
+import json
+import re
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class TestErrorCodes(unittest.TestCase):
+    def test_every_emitted_code_is_documented(self):
+        documented = json.loads((ROOT / "config" / "error_codes.json").read_text(encoding="utf-8"))
+        source = (ROOT / "course_pipeline_ops.py").read_text(encoding="utf-8")
+        emitted = set(re.findall(r'"code": "([A-Z_]+)"', source))
+        emitted |= set(re.findall(r'\(f?"([A-Z][A-Z_]{3,}):', source))  # RuntimeError("CODE:detail")
+        self.assertIn("TASK_CONFLICT", emitted)
+        self.assertEqual(sorted(emitted - set(documented)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Import project script functions directly for unit checks.
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import course_pipeline_ops as ops  # noqa: E402
+
+
+class TestEventLog(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        self.runtime = Path(self._td.name)
+        self._env = mock.patch.dict(
+            os.environ,
+            {"COURSE_PIPELINE_EVENT_FLUSH_SECONDS": "0", "COURSE_PIPELINE_EVENT_SEGMENT_BYTES": "600"},
+        )
+        self._env.start()
+
+    def tearDown(self):
+        self._env.stop()
+        self._td.cleanup()
+
+    def _log_many(self, count: int) -> None:
+        for i in range(count):
+            ops.append_event(self.runtime, f"task_{i % 3:08d}", "task.test", {"i": i})
+
+    def test_segments_rotate_with_index(self):
+        self._log_many(30)
+        segments = ops.sealed_event_segments(self.runtime)
+        self.assertGreater(len(segments), 2)
+        index = json.loads(segments[0].with_suffix(".idx.json").read_text(encoding="utf-8"))
+        self.assertEqual(set(index["tasks"]), {"task_00000000", "task_00000001", "task_00000002"})
+        self.assertEqual(sum(e["count"] for e in index["tasks"].values()), index["count"])
+        self.assertTrue(ops.events_file(self.runtime).exists())
+
+    def test_read_events_returns_task_history_in_order(self):
+        self._log_many(30)
+        events = ops.read_events(self.runtime, "task_00000001")
+        self.assertEqual([e["payload"]["i"] for e in events], list(range(1, 30, 3)))
+
+    def test_index_skips_segments_without_the_task(self):
+        self._log_many(12)
+        ops.append_event(self.runtime, "task_0000late", "task.test", {"i": 99})
+        scanned = []
+        real_iter = ops._iter_event_lines
+
+        def spy(segment, offset=0):
+            scanned.append(segment.name)
+            return real_iter(segment, offset)
+
+        with mock.patch.object(ops, "_iter_event_lines", side_effect=spy):
+            events = ops.read_events(self.runtime, "task_0000late")
+        self.assertEqual([e["payload"]["i"] for e in events], [99])
+        self.assertEqual(scanned, ["events.log"])
+
+    def test_retention_drops_oldest_segments(self):
+        with mock.patch.dict(os.environ, {"COURSE_PIPELINE_EVENT_KEEP_SEGMENTS": "2"}):
+            self._log_many(40)
+        segments = ops.sealed_event_segments(self.runtime)
+        self.assertEqual(len(segments), 2)
+        self.assertEqual(len(list(ops.events_segments_dir(self.runtime).glob("*.idx.json"))), 2)
+
+    def test_old_active_segment_rotates_by_age(self):
+        old = {"ts": "2020-01-01T00:00:00Z", "task_id": "task_0000old0", "event": "task.test", "payload": {}}
+        ops.events_file(self.runtime).write_text(json.dumps(old) + "\n", encoding="utf-8")
+        ops.append_event(self.runtime, "task_0000new0", "task.test", {})
+        self.assertEqual(len(ops.sealed_event_segments(self.runtime)), 1)
+        self.assertEqual(ops.read_events(self.runtime, since="2021-01-01T00:00:00Z")[0]["task_id"], "task_0000new0")
+
+    def test_buffered_writes_land_on_flush(self):
+        with mock.patch.dict(os.environ, {"COURSE_PIPELINE_EVENT_FLUSH_SECONDS": "30"}):
+            for i in range(3):
+                ops.append_event(self.runtime, "task_00000000", "task.test", {"i": i})
+            self.assertFalse(ops.events_file(self.runtime).exists())
+            self.assertEqual(len(ops.read_events(self.runtime, "task_00000000")), 3)
+
+    def test_follow_sees_new_events_across_rotation(self):
+        self._log_many(2)
+        stop = threading.Event()
+        seen = []
+
+        def writer():
+            time.sleep(0.1)
+            self._log_many(20)
+            time.sleep(0.5)
+            stop.set()
+
+        threading.Thread(target=writer).start()
+        for record in ops.follow_events(self.runtime, poll=0.02, stop=stop):
+            seen.append(record["payload"]["i"])
+        self.assertEqual(seen, list(range(20)))
+
+    def test_follow_interrupt_cancels_timeout_timer(self):
+        args = argparse.Namespace(project_root=self._td.name, task_id="task_00000001", since=None, follow=True, timeout=60)
+        real_timer, timers = threading.Timer, []
+
+        def make_timer(*a, **kw):
+            timers.append(real_timer(*a, **kw))
+            return timers[-1]
+
+        with mock.patch.object(ops, "follow_events", side_effect=KeyboardInterrupt), mock.patch.object(
+            ops, "out"
+        ), mock.patch.object(threading, "Timer", side_effect=make_timer):
+            self.assertEqual(ops.cmd_task_events(args), 0)
+        self.assertEqual(len(timers), 1)
+        self.assertTrue(timers[0].daemon)
+        timers[0].join(timeout=1)
+        self.assertFalse(timers[0].is_alive())
+
+    def test_parse_since_relative(self):
+        since = ops.parse_since("2h")
+        self.assertLess(abs(ops._parse_iso(since) - (time.time() - 7200)), 5)
+        with self.assertRaises(ValueError):
+            ops.parse_since("yesterday")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,272 @@
+import json
+import os
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Import project script functions directly for unit checks.
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import course_pipeline_ops as ops  # noqa: E402
+
+FAKE_FFMPEG = """#!/usr/bin/env python3
+import sys
+import wave
+from pathlib import Path
+
+args = sys.argv[1:]
+if any("_broken." in a for a in args):
+    sys.stderr.write("broken input\\n")
+    sys.exit(1)
+outputs = [a for i, a in enumerate(args) if a.endswith((".mp4", ".mp3", ".wav")) and (i == 0 or args[i - 1] != "-i")]
+for out in outputs:
+    path = Path(out)
+    with (path.parent / "ffmpeg_calls.log").open("a") as log:
+        log.write(" ".join(args) + "\\n")
+    if path.suffix == ".wav":
+        with wave.open(out, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(16000)
+            w.writeframes(b"\\x00\\x00" * 24000)
+    else:
+        path.write_bytes(b"fake")
+"""
+
+FAKE_FFPROBE = """#!/usr/bin/env python3
+import json
+import sys
+from pathlib import Path
+
+target = Path(sys.argv[-1])
+target.parent.joinpath("ffprobe_calls.log").open("a").write("probe\\n")
+# Sources named *_ios.mp4 look like iOS-ready H.264/AAC; everything else needs a transcode.
+video = {"index": 0, "codec_type": "video", "codec_name": "mpeg4", "profile": "Simple Profile", "level": 1, "pix_fmt": "yuv420p"}
+if "_ios." in target.name:
+    video = {"index": 0, "codec_type": "video", "codec_name": "h264", "profile": "High", "level": 40, "pix_fmt": "yuv420p"}
+streams = [video, {"index": 1, "codec_type": "audio", "codec_name": "aac"}]
+if target.read_bytes().startswith(b"subs"):
+    streams.append({"index": 2, "codec_type": "subtitle", "codec_name": "mov_text", "tags": {"language": "eng"}})
+print(json.dumps({"format": {"duration": "1.5"}, "streams": streams}))
+"""
+
+
+def install_fake_ffmpeg(bin_dir: Path) -> None:
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    for name, body in [("ffmpeg", FAKE_FFMPEG), ("ffprobe", FAKE_FFPROBE)]:
+        path = bin_dir / name
+        path.write_text(body, encoding="utf-8")
+        path.chmod(0o755)
+
+
+class FakeFfmpegTestCase(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        self.root = Path(self._td.name)
+        self.raw = self.root / "raw"
+        self.raw.mkdir()
+        self.runtime = self.root / "runtime"
+        self.runtime.mkdir()
+        install_fake_ffmpeg(self.root / "bin")
+        env = {"PATH": f"{self.root / 'bin'}{os.pathsep}{os.environ.get('PATH', '')}"}
+        self._env = mock.patch.dict(os.environ, env)
+        self._env.start()
+
+    def tearDown(self):
+        self._env.stop()
+        self._td.cleanup()
+
+    def _task(self, keys: list[str], task_id: str = "task_0000test") -> dict:
+        return {"task_id": task_id, "course_path": str(self.raw), "lesson_keys": keys}
+
+
+class TestFfmpegStep(FakeFfmpegTestCase):
+
+    def test_parallel_run_keeps_key_order(self):
+        keys = ["01", "02", "03", "04"]
+        for key in keys:
+            (self.raw / f"{key}_lesson.mp4").write_bytes(b"x")
+        payload = ops.execute_step_ffmpeg(self._task(keys), self.runtime, jobs=3)
+        self.assertEqual([l["lesson_id"] for l in payload["lessons"]], keys)
+        self.assertEqual(payload["jobs"], 3)
+        for lesson in payload["lessons"]:
+            self.assertTrue(Path(lesson["media"]).exists())
+            self.assertTrue(Path(lesson["audio_16k"]).exists())
+            self.assertEqual(lesson["duration_ms"], 1500)
+
+    def test_lessons_record_child_cpu_from_pool_workers(self):
+        for key in ["01", "02"]:
+            (self.raw / f"{key}_lesson.mp4").write_bytes(b"x")
+        payload = ops.execute_step_ffmpeg(self._task(["01", "02"]), self.runtime, jobs=2)
+        for lesson in payload["lessons"]:
+            self.assertGreater(lesson["metrics"]["child_cpu_ms"], 0)
+            self.assertGreater(lesson["metrics"]["wall_ms"], 0)
+
+    def test_parallel_failure_reports_lesson_key(self):
+        (self.raw / "01_ok.mp4").write_bytes(b"x")
+        (self.raw / "02_broken.mp4").write_bytes(b"x")
+        (self.raw / "03_ok.mp4").write_bytes(b"x")
+        with self.assertRaises(RuntimeError) as ctx:
+            ops.execute_step_ffmpeg(self._task(["01", "02", "03"]), self.runtime, jobs=2)
+        self.assertTrue(str(ctx.exception).startswith("STEP_FAILED:ffmpeg_failed:02:"))
+
+    def test_thread_budget_split_across_jobs(self):
+        with mock.patch.dict(os.environ, {"COURSE_PIPELINE_CPU_BUDGET": "16"}):
+            self.assertEqual(ops.ffmpeg_threads_per_job(4), 4)
+            self.assertEqual(ops.ffmpeg_threads_per_job(32), 1)
+        with mock.patch.dict(os.environ, {"COURSE_PIPELINE_CPU_BUDGET": ""}):
+            self.assertIsNone(ops.ffmpeg_threads_per_job(1))
+
+    def test_jobs_env_default(self):
+        with mock.patch.dict(os.environ, {"COURSE_PIPELINE_JOBS": "6"}):
+            self.assertEqual(ops.resolve_jobs(None), 6)
+            self.assertEqual(ops.resolve_jobs(2), 2)
+        with mock.patch.dict(os.environ, {"COURSE_PIPELINE_JOBS": "four"}):
+            with self.assertRaisesRegex(ValueError, "COURSE_PIPELINE_JOBS"):
+                ops.resolve_jobs(None)
+
+    def test_cli_reports_bad_jobs_env_as_json(self):
+        script = Path(ops.__file__).resolve()
+        proc = subprocess.run(
+            [sys.executable, str(script), "--project-root", str(self.root), "task", "list"],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "COURSE_PIPELINE_JOBS": "four"},
+        )
+        self.assertEqual(proc.returncode, 2)
+        self.assertEqual(json.loads(proc.stdout)["error"]["code"], "INVALID_ARGS")
+
+    def test_single_pass_runs_one_ffmpeg_and_no_ffprobe(self):
+        (self.raw / "01_intro.mp4").write_bytes(b"x")
+        with mock.patch.dict(os.environ, {"COURSE_PIPELINE_FFMPEG_SINGLE_PASS": "1", "COURSE_PIPELINE_TRANSCODE_CACHE": "0"}):
+            payload = ops.execute_step_ffmpeg(self._task(["01"]), self.runtime)
+        lesson_dir = Path(payload["lessons"][0]["media"]).parent
+        self.assertEqual(payload["mode"], "single_pass")
+        self.assertEqual(payload["lessons"][0]["duration_ms"], 1500)
+        calls = (lesson_dir / "ffmpeg_calls.log").read_text().splitlines()
+        self.assertEqual(len(set(calls)), 1)
+        self.assertFalse((lesson_dir / "ffprobe_calls.log").exists())
+
+    def test_two_pass_mode_matches_legacy_path(self):
+        (self.raw / "01_intro.mp4").write_bytes(b"x")
+        with mock.patch.dict(os.environ, {"COURSE_PIPELINE_FFMPEG_SINGLE_PASS": "0", "COURSE_PIPELINE_TRANSCODE_CACHE": "0"}):
+            payload = ops.execute_step_ffmpeg(self._task(["01"]), self.runtime)
+        lesson_dir = Path(payload["lessons"][0]["media"]).parent
+        self.assertEqual(payload["mode"], "two_pass")
+        self.assertEqual(len((lesson_dir / "ffmpeg_calls.log").read_text().splitlines()), 2)
+        self.assertTrue((lesson_dir / "ffprobe_calls.log").exists())
+
+    def test_compliant_source_is_remuxed(self):
+        (self.raw / "01_ios.mp4").write_bytes(b"x")
+        (self.raw / "02_old.mp4").write_bytes(b"x")
+        payload = ops.execute_step_ffmpeg(self._task(["01", "02"]), self.runtime)
+        paths = [l["path"] for l in payload["lessons"]]
+        self.assertEqual(paths, ["remux", "transcode"])
+        self.assertEqual(payload["media_paths"], {"remux": 1, "transcode": 1})
+        calls = (Path(payload["lessons"][0]["media"]).parent / "ffmpeg_calls.log").read_text()
+        self.assertIn("-c copy -movflags +faststart", calls)
+        self.assertNotIn("libx264", calls)
+
+    def test_stream_copy_compatibility_rules(self):
+        def probe(**video):
+            base = {"codec_type": "video", "codec_name": "h264", "profile": "High", "level": 41, "pix_fmt": "yuv420p"}
+            return {"streams": [{**base, **video}, {"codec_type": "audio", "codec_name": "aac"}]}
+
+        self.assertTrue(ops.stream_copy_compatible(probe()))
+        self.assertFalse(ops.stream_copy_compatible(probe(level=42)))
+        self.assertFalse(ops.stream_copy_compatible(probe(profile="High 10")))
+        self.assertFalse(ops.stream_copy_compatible(probe(pix_fmt="yuv444p")))
+        self.assertFalse(ops.stream_copy_compatible(probe(codec_name="hevc")))
+        no_audio = {"streams": probe()["streams"][:1]}
+        self.assertFalse(ops.stream_copy_compatible(no_audio))
+
+
+class TestMediaProbe(FakeFfmpegTestCase):
+    def _lesson_media(self, content: bytes) -> Path:
+        lesson_dir = self.runtime / "task_0000test" / "artifacts" / "01"
+        lesson_dir.mkdir(parents=True)
+        media = lesson_dir / "media.mp4"
+        media.write_bytes(content)
+        return media
+
+    def test_probe_is_cached_until_file_changes(self):
+        media = self._lesson_media(b"video")
+        cache_file = media.parent / ops.MEDIA_PROBE_FILE
+        probe = ops.media_probe(media, cache_file)
+        self.assertEqual(ops.media_probe(media, cache_file), probe)
+        self.assertEqual(ops.probe_duration_ms(probe), 1500)
+        self.assertEqual(ops.probe_codecs(probe), {"video": ["mpeg4"], "audio": ["aac"]})
+        self.assertEqual(len((media.parent / "ffprobe_calls.log").read_text().splitlines()), 1)
+
+        media.write_bytes(b"subs and video")
+        probe = ops.media_probe(media, cache_file)
+        self.assertEqual(ops.probe_subtitle_streams(probe), [{"index": 2, "codec": "mov_text", "language": "eng"}])
+        self.assertEqual(len((media.parent / "ffprobe_calls.log").read_text().splitlines()), 2)
+
+    def test_asr_skips_extraction_without_subtitle_streams(self):
+        media = self._lesson_media(b"video")
+        with mock.patch.object(ops.subprocess, "run", wraps=subprocess.run) as run:
+            for _ in range(2):
+                payload = ops.execute_step_asr(self._task(["01"]), self.runtime)
+                self.assertEqual(payload["lessons"][0]["source"], "embedded_not_found")
+        commands = [call.args[0][0] for call in run.call_args_list]
+        self.assertEqual(commands, ["ffprobe"])
+        self.assertEqual(len((media.parent / "ffprobe_calls.log").read_text().splitlines()), 1)
+
+    def test_asr_extracts_when_probe_finds_subtitles(self):
+        self._lesson_media(b"subs and video")
+        with mock.patch.object(ops.subprocess, "run", wraps=subprocess.run) as run:
+            ops.execute_step_asr(self._task(["01"]), self.runtime)
+        extract = [call.args[0] for call in run.call_args_list if call.args[0][0] == "ffmpeg"]
+        self.assertEqual(len(extract), 1)
+        self.assertIn("0:2", extract[0])
+
+
+class TestTranscodeCache(FakeFfmpegTestCase):
+    def test_rerun_for_new_task_hits_cache(self):
+        (self.raw / "01_intro.mp4").write_bytes(b"video")
+        first = ops.execute_step_ffmpeg(self._task(["01"], "task_first000"), self.runtime)
+        self.assertEqual(first["lessons"][0]["cache"], "miss")
+
+        second = ops.execute_step_ffmpeg(self._task(["01"], "task_second00"), self.runtime)
+        lesson = second["lessons"][0]
+        self.assertEqual(lesson["cache"], "hit")
+        self.assertEqual(second["cache_hits"], 1)
+        self.assertEqual(lesson["duration_ms"], 1500)
+        self.assertEqual(Path(lesson["media"]).read_bytes(), b"fake")
+        self.assertTrue(Path(lesson["audio_16k"]).exists())
+        self.assertFalse((Path(lesson["media"]).parent / "ffmpeg_calls.log").exists())
+
+    def test_changed_source_misses_cache(self):
+        media = self.raw / "01_intro.mp4"
+        media.write_bytes(b"video")
+        ops.execute_step_ffmpeg(self._task(["01"]), self.runtime)
+        media.write_bytes(b"another video")
+        payload = ops.execute_step_ffmpeg(self._task(["01"]), self.runtime)
+        self.assertEqual(payload["lessons"][0]["cache"], "miss")
+
+    def test_fingerprint_reuses_hash_when_stat_unchanged(self):
+        media = self.raw / "01_intro.mp4"
+        media.write_bytes(b"video")
+        cache_dir = self.root / "cache"
+        digest = ops.source_fingerprint(media, cache_dir)
+        with mock.patch.object(ops, "file_sha256", side_effect=AssertionError("rehashed")):
+            self.assertEqual(ops.source_fingerprint(media, cache_dir), digest)
+
+    def test_eviction_drops_least_recently_used(self):
+        cache_dir = self.root / "cache"
+        for idx, name in enumerate(["old", "new"]):
+            src = self.root / f"{name}.bin"
+            src.write_bytes(b"x" * 10)
+            ops.transcode_cache_store(cache_dir, name, [src], {"duration_ms": 0})
+            meta = cache_dir / "transcode" / name / "meta.json"
+            os.utime(meta, (1000 + idx, 1000 + idx))
+        evicted = ops.evict_transcode_cache(cache_dir, 15)
+        self.assertEqual(evicted, ["old"])
+        self.assertTrue((cache_dir / "transcode" / "new").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+# Import project script functions directly for unit checks.
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import course_pipeline_ops as ops  # noqa: E402
+
+
+class TestIncrementalSteps(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        root = Path(self._td.name)
+        self.raw = root / "raw"
+        self.raw.mkdir()
+        self.runtime = ops.project_runtime_dir(root)
+        self.task = {"task_id": "task_inc00001", "course_path": str(self.raw), "lesson_keys": ["01", "02", "03"]}
+        self.work_dir = self.runtime / self.task["task_id"] / "hitl"
+        self.work_dir.mkdir(parents=True)
+        for key in self.task["lesson_keys"]:
+            sentences = [{"sentence_id": f"{key}-0001", "en": "Where is the station?", "zh": "车站在哪里？", "ipa": "/x/"}]
+            (self.work_dir / f"{key}_translate_effective.json").write_text(
+                json.dumps({"lesson_id": key, "sentences": sentences}, ensure_ascii=False), encoding="utf-8"
+            )
+
+    def tearDown(self):
+        self._td.cleanup()
+
+    def test_unchanged_lessons_are_skipped(self):
+        first = ops.execute_step_incremental("grammar", self.task, self.runtime)
+        self.assertEqual(first["incremental"]["executed"], ["01", "02", "03"])
+
+        second = ops.execute_step_incremental("grammar", self.task, self.runtime)
+        self.assertEqual(second["incremental"]["executed"], [])
+        self.assertEqual(second["incremental"]["skipped"], ["01", "02", "03"])
+        # Reused results keep everything but the metrics of the run that produced them.
+        without_metrics = [{k: v for k, v in l.items() if k != "metrics"} for l in first["lessons"]]
+        self.assertEqual(second["lessons"], without_metrics)
+        self.assertTrue(all("metrics" in l for l in first["lessons"]))
+
+    def test_only_edited_hitl_lesson_reruns(self):
+        ops.execute_step_incremental("grammar", self.task, self.runtime)
+        override = {"sentences": [{"sentence_id": "02-0001", "grammar": {"pattern": "手工"}, "usage": {}}]}
+        (self.work_dir / "02_grammar_output.json").write_text(json.dumps(override, ensure_ascii=False), encoding="utf-8")
+
+        payload = ops.execute_step_incremental("grammar", self.task, self.runtime)
+        self.assertEqual(payload["incremental"]["executed"], ["02"])
+        self.assertEqual([l["lesson_id"] for l in payload["lessons"]], ["01", "02", "03"])
+        self.assertEqual(payload["lessons"][1]["source"], "hitl_override")
+
+    def test_deleted_output_and_force_rerun(self):
+        ops.execute_step_incremental("summary", self.task, self.runtime)
+        (self.work_dir / "03_summary_effective.json").unlink()
+        payload = ops.execute_step_incremental("summary", self.task, self.runtime)
+        self.assertEqual(payload["incremental"]["executed"], ["03"])
+
+        forced = ops.execute_step_incremental("summary", self.task, self.runtime, force=True)
+        self.assertEqual(forced["incremental"]["executed"], ["01", "02", "03"])
+
+    def test_placeholder_asr_is_not_frozen(self):
+        ops.execute_step_incremental("asr", self.task, self.runtime)
+        again = ops.execute_step_incremental("asr", self.task, self.runtime)
+        self.assertEqual(again["incremental"]["executed"], ["01", "02", "03"])
+
+        (self.raw / "01.en.srt").write_text("1\n00:00:00,000 --> 00:00:01,000\nHello.\n", encoding="utf-8")
+        ops.execute_step_incremental("asr", self.task, self.runtime)
+        third = ops.execute_step_incremental("asr", self.task, self.runtime)
+        self.assertEqual(third["incremental"]["skipped"], ["01"])
+
+    def test_failed_transcription_placeholder_is_not_frozen(self):
+        out_en = self.runtime / self.task["task_id"] / "artifacts" / "01" / "sub_en.srt"
+        out_en.parent.mkdir(parents=True)
+        ops.write_asr_placeholder(out_en)
+        result = {"lesson_id": "01", "sub_en": str(out_en), "source": "whisper_not_found"}
+        self.assertFalse(ops.lesson_result_reusable("asr", self.task, self.runtime, result))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import random
+import unittest
+from pathlib import Path
+
+# Import project script functions directly for unit checks.
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+import course_pipeline_ops as ops  # noqa: E402
+import bench_inference_rules as legacy  # noqa: E402
+
+EDGE_CASES = [
+    "",
+    "   ",
+    "Also was late.",
+    "This is it.",
+    "Shave and go",
+    "it was ",
+    "  It was fine, so were we  ",
+    "Have you been there?!",
+    "Wow!",
+    "Was it?",
+    "Hello, welcome to the station.",
+    "Which one is very good",
+    "We are going to walk into town because it is quite far and really worth it today.",
+    "İstanbul was big.",
+]
+
+
+class TestRuleEngineMatchesBaseline(unittest.TestCase):
+    def test_sentences_classify_as_before(self):
+        texts = EDGE_CASES + legacy.synthetic_corpus(3000, random.Random(3))
+        sentences = [{"en": en, "zh": "中文" if i % 2 else ""} for i, en in enumerate(texts)]
+        self.assertEqual(ops.classify_sentences(sentences), legacy.legacy_classify(sentences))
+        for s in sentences[:len(EDGE_CASES)]:
+            self.assertEqual(ops.infer_grammar(s["en"]), legacy.legacy_infer_grammar(s["en"]))
+            self.assertEqual(ops.infer_usage(s["en"], s["zh"]), legacy.legacy_infer_usage(s["en"], s["zh"]))
+
+    def test_lesson_highlights_as_before(self):
+        lessons = [
+            [],
+            [{"en": "It was", "zh": ""}, {"en": "fine.", "zh": "好"}],
+            [{"en": "Good morning."}],
+            [{"en": s} for s in EDGE_CASES],
+        ]
+        rng = random.Random(5)
+        lessons += [[{"en": en} for en in legacy.synthetic_corpus(rng.randint(1, 8), rng)] for _ in range(300)]
+        for lesson in lessons:
+            self.assertEqual(ops.generate_summary_and_highlights(lesson), legacy.legacy_generate_summary_and_highlights(lesson))
+
+
+class TestRuleConfig(unittest.TestCase):
+    def test_priority_prefix_keywords_and_defaults(self):
+        rules = ops.InferenceRules(
+            {
+                "rule_sets": {
+                    "topic": {
+                        "select": "all",
+                        "rules": [
+                            {"name": "low", "priority": 1, "keywords": ["hi"], "output": {"tag": "hi"}},
+                            {"name": "high", "priority": 9, "keywords": ["history"], "output": {"tag": "history"}},
+                        ],
+                    },
+                    "mood": {
+                        "select": "first",
+                        "rules": [{"name": "sad", "priority": 1, "keywords": ["story"], "output": {"tag": "sad"}}],
+                        "default": {"tag": "calm"},
+                    },
+                }
+            }
+        )
+        fired = rules.scan(["A HISTORY book", "plain"])
+        self.assertEqual(rules.select("topic", fired[0]), [{"tag": "history"}, {"tag": "hi"}])
+        self.assertEqual(rules.select("mood", fired[0]), [{"tag": "sad"}])
+        self.assertEqual(rules.select("topic", fired[1]), [])
+        self.assertEqual(rules.select("mood", fired[1]), [{"tag": "calm"}])
+
+    def test_first_rule_set_needs_default(self):
+        with self.assertRaises(ValueError):
+            ops.InferenceRules({"rule_sets": {"mood": {"select": "first", "rules": []}}})
+
+
+if __name__ == "__main__":
+    unittest.main()
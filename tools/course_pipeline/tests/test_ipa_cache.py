@@ -0,0 +1,151 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+from urllib.error import HTTPError, URLError
+
+# Import project script functions directly for unit checks.
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+import course_pipeline_ops as ops  # noqa: E402
+from stub_servers import StubDictionaryServer  # noqa: E402
+
+
+class TestIpaCacheStore(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        self.root = Path(self._td.name)
+        self.db = self.root / "cache" / "ipa_cache.sqlite3"
+        ops.IPA_CACHE.clear()
+
+    def tearDown(self):
+        ops.IPA_CACHE.clear()
+        self._td.cleanup()
+
+    def test_results_persist_across_connections(self):
+        conn = ops.open_ipa_cache(self.db)
+        with mock.patch.object(ops, "lookup_word_ipa_online", return_value=("/həˈləʊ/", True)) as online:
+            self.assertEqual(ops.fetch_word_ipa("Hello", conn), "/həˈləʊ/")
+            self.assertEqual(online.call_count, 1)
+        conn.close()
+
+        ops.IPA_CACHE.clear()
+        conn = ops.open_ipa_cache(self.db)
+        with mock.patch.object(ops, "lookup_word_ipa_online", side_effect=AssertionError("network")):
+            self.assertEqual(ops.fetch_word_ipa("hello", conn), "/həˈləʊ/")
+        conn.close()
+
+    def test_negative_entries_expire_on_their_own_ttl(self):
+        conn = ops.open_ipa_cache(self.db)
+        old = time.time() - 10 * 86400
+        ops.ipa_cache_put(conn, "zzyzx", None, fetched_at=old)
+        ops.ipa_cache_put(conn, "hello", "/həˈləʊ/", fetched_at=old)
+        self.assertEqual(ops.ipa_cache_get(conn, "zzyzx"), (False, None))
+        self.assertEqual(ops.ipa_cache_get(conn, "hello"), (True, "/həˈləʊ/"))
+        with mock.patch.dict(os.environ, {"COURSE_PIPELINE_IPA_NEGATIVE_TTL_DAYS": "30"}):
+            self.assertEqual(ops.ipa_cache_get(conn, "zzyzx"), (True, None))
+        conn.close()
+
+    def test_network_errors_are_not_persisted(self):
+        conn = ops.open_ipa_cache(self.db)
+        with mock.patch.object(ops, "urlopen", side_effect=URLError("offline")):
+            self.assertIsNone(ops.fetch_word_ipa("offline", conn))
+        self.assertEqual(ops.ipa_cache_get(conn, "offline"), (False, None))
+
+        not_found = HTTPError("url", 404, "Not Found", {}, None)
+        with mock.patch.object(ops, "urlopen", side_effect=not_found):
+            self.assertIsNone(ops.fetch_word_ipa("qwxz", conn))
+        self.assertEqual(ops.ipa_cache_get(conn, "qwxz"), (True, None))
+        conn.close()
+
+    def test_export_import_roundtrip(self):
+        src_root = self.root / "src"
+        dst_root = self.root / "dst"
+        src_conn = ops.open_ipa_cache(ops.ipa_cache_path(ops.project_runtime_dir(src_root)))
+        ops.ipa_cache_put(src_conn, "hello", "/həˈləʊ/")
+        ops.ipa_cache_put(src_conn, "qwxz", None)
+        src_conn.close()
+
+        export_file = self.root / "ipa.json"
+        with mock.patch("builtins.print"):
+            ops.cmd_ipa_export(argparse.Namespace(project_root=str(src_root), file=str(export_file), positive_only=True))
+            ops.cmd_ipa_import(argparse.Namespace(project_root=str(dst_root), file=str(export_file)))
+
+        dst_conn = ops.open_ipa_cache(ops.ipa_cache_path(ops.project_runtime_dir(dst_root)))
+        self.assertEqual(ops.ipa_cache_get(dst_conn, "hello"), (True, "/həˈləʊ/"))
+        self.assertEqual(ops.ipa_cache_get(dst_conn, "qwxz"), (False, None))
+        dst_conn.close()
+
+
+def write_srt_file(path: Path, texts: list[str]) -> None:
+    ops.write_srt(path, [{"start_ms": i * 1000, "end_ms": i * 1000 + 900, "text": t} for i, t in enumerate(texts)])
+
+
+class TestBatchIpaResolution(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        self.runtime = ops.project_runtime_dir(Path(self._td.name))
+        ops.IPA_CACHE.clear()
+
+    def tearDown(self):
+        ops.IPA_CACHE.clear()
+        self._td.cleanup()
+
+    def test_translate_fetches_each_unique_word_once_concurrently(self):
+        task = {"task_id": "task_ipa00001", "lesson_keys": ["01", "02"]}
+        for key, lines in [("01", ["Hello world.", "Hello again!"]), ("02", ["World, hello.", "Good night"])]:
+            lesson_dir = self.runtime / task["task_id"] / "artifacts" / key
+            lesson_dir.mkdir(parents=True)
+            write_srt_file(lesson_dir / "sub_en.srt", lines)
+            write_srt_file(lesson_dir / "sub_zh.srt", ["中文"] * len(lines))
+
+        entries = {"hello": "/həˈləʊ/", "world": "/wɜːld/", "good": "/ɡʊd/", "night": "/naɪt/"}
+        with StubDictionaryServer(latency=0.05, entries=entries) as stub:
+            env = {"COURSE_PIPELINE_IPA_ENDPOINT": stub.endpoint, "COURSE_PIPELINE_IPA_CONCURRENCY": "4"}
+            with mock.patch.dict(os.environ, env):
+                payload = ops.execute_step_translate(task, self.runtime)
+
+        self.assertEqual(sorted(stub.words), ["again", "good", "hello", "night", "world"])
+        self.assertGreater(stub.max_in_flight, 1)
+        self.assertEqual(payload["ipa_unique_words"], 5)
+        effective = json.loads(Path(payload["lessons"][0]["output_file"]).read_text(encoding="utf-8"))
+        self.assertEqual(effective["sentences"][0]["ipa"], "/həˈləʊ/ /wɜːld/")
+        self.assertEqual(effective["sentences"][1]["ipa"], "/həˈləʊ/ again!")
+
+    def test_second_run_is_served_from_persistent_cache(self):
+        entries = {"hello": "/həˈləʊ/"}
+        with StubDictionaryServer(entries=entries) as stub:
+            with mock.patch.dict(os.environ, {"COURSE_PIPELINE_IPA_ENDPOINT": stub.endpoint}):
+                conn = ops.open_ipa_cache(ops.ipa_cache_path(self.runtime))
+                ops.resolve_ipa_words(["hello", "zzz"], conn)
+                ops.IPA_CACHE.clear()
+                table = ops.resolve_ipa_words(["Hello", "zzz"], conn)
+                conn.close()
+        self.assertEqual(table, {"hello": "/həˈləʊ/", "zzz": None})
+        self.assertEqual(sorted(stub.words), ["hello", "zzz"])
+
+    def test_failed_lookup_is_retried_by_the_next_call(self):
+        class FlakyDictionary(StubDictionaryServer):
+            failures = 1
+
+            def respond(self, url):
+                status, body = super().respond(url)
+                if self.failures:
+                    self.failures -= 1
+                    return 503, {"title": "Service Unavailable"}
+                return status, body
+
+        with FlakyDictionary(entries={"hello": "/həˈləʊ/"}) as stub:
+            with mock.patch.dict(os.environ, {"COURSE_PIPELINE_IPA_ENDPOINT": stub.endpoint}):
+                self.assertEqual(ops.resolve_ipa_words(["hello"]), {"hello": None})
+                self.assertEqual(ops.resolve_ipa_words(["hello"]), {"hello": "/həˈləʊ/"})
+        self.assertEqual(stub.words, ["hello", "hello"])
+
+
+if __name__ == "__main__":
+    unittest.main()
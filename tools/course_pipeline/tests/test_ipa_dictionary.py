@@ -0,0 +1,82 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Import project script functions directly for unit checks.
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import course_pipeline_ops as ops  # noqa: E402
+
+CMUDICT_SAMPLE = """;;; # CMUdict  --  Major Version: 0.07
+A  AH0
+ABOUT  AH0 B AW1 T
+COMPUTER  K AH0 M P Y UW1 T ER0
+HELLO  HH AH0 L OW1
+HELLO(1)  HH EH0 L OW1
+STREET  S T R IY1 T
+WORLD  W ER1 L D
+'BOUT  B AW1 T
+"""
+
+
+class TestIpaDictionary(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        self.root = Path(self._td.name)
+        self.source = self.root / "cmudict.dict"
+        self.source.write_text(CMUDICT_SAMPLE, encoding="utf-8")
+        self.index = self.root / "ipa_dict.bin"
+        ops.IPA_CACHE.clear()
+
+    def tearDown(self):
+        ops.IPA_CACHE.clear()
+        self._td.cleanup()
+
+    def test_build_and_lookup(self):
+        self.assertEqual(ops.build_ipa_dictionary(self.source, self.index), 6)
+        dictionary = ops.open_ipa_dictionary(self.index)
+        try:
+            self.assertEqual(dictionary.lookup("Hello"), "/həˈloʊ/")
+            self.assertEqual(dictionary.lookup("about"), "/əˈbaʊt/")
+            self.assertEqual(dictionary.lookup("street"), "/ˈstɹit/")
+            self.assertEqual(dictionary.lookup("computer"), "/kəmˈpjutɚ/")
+            self.assertEqual(dictionary.lookup("a"), "/ə/")
+            self.assertIsNone(dictionary.lookup("zebra"))
+            self.assertIsNone(dictionary.lookup("aaa"))
+        finally:
+            dictionary.close()
+
+    def test_ipa_table_lines_are_kept_verbatim(self):
+        self.source.write_text("hello\t/həˈləʊ/\nworld\t/wɜːld/\n", encoding="utf-8")
+        ops.build_ipa_dictionary(self.source, self.index)
+        dictionary = ops.open_ipa_dictionary(self.index)
+        try:
+            self.assertEqual(dictionary.lookup("world"), "/wɜːld/")
+        finally:
+            dictionary.close()
+
+    def test_invalid_index_is_ignored(self):
+        self.index.write_bytes(b"not an index at all")
+        self.assertIsNone(ops.open_ipa_dictionary(self.index))
+        self.assertIsNone(ops.open_ipa_dictionary(self.root / "missing.bin"))
+
+    def test_dictionary_is_tried_before_network(self):
+        ops.build_ipa_dictionary(self.source, self.index)
+        dictionary = ops.open_ipa_dictionary(self.index)
+        try:
+            with mock.patch.object(ops, "lookup_word_ipa_online", return_value=("/ˈzibɹə/", True)) as online:
+                ipa = ops.generate_sentence_ipa("Hello, zebra world.", dictionary=dictionary)
+            online.assert_called_once_with("zebra")
+        finally:
+            dictionary.close()
+        self.assertEqual(ipa, "/həˈloʊ/ /ˈzibɹə/ /ˈwɝld/")
+
+    def test_offline_mode_skips_network(self):
+        with mock.patch.dict("os.environ", {"COURSE_PIPELINE_IPA_OFFLINE": "1"}):
+            with mock.patch.object(ops, "lookup_word_ipa_online", side_effect=AssertionError("network")):
+                self.assertEqual(ops.resolve_ipa_words(["zebra"]), {"zebra": None})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Import project script functions directly for unit checks.
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import course_pipeline_ops as ops  # noqa: E402
+
+
+class TestPlaceFile(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        self.root = Path(self._td.name)
+        self.src = self.root / "src.bin"
+        self.src.write_bytes(b"media" * 1000)
+
+    def tearDown(self):
+        self._td.cleanup()
+
+    def test_hardlink_then_skip(self):
+        dst = self.root / "dst.bin"
+        self.assertEqual(ops.place_file(self.src, dst), ("hardlink", 5000))
+        self.assertEqual(dst.stat().st_ino, self.src.stat().st_ino)
+        self.assertEqual(ops.place_file(self.src, dst), ("skipped", 5000))
+
+    def test_unlinked_copy_keeps_mtime_for_next_skip(self):
+        dst = self.root / "dst.bin"
+        method, _ = ops.place_file(self.src, dst, link=False)
+        self.assertIn(method, {"reflink", "copy_file_range", "copy"})
+        self.assertNotEqual(dst.stat().st_ino, self.src.stat().st_ino)
+        self.assertEqual(dst.stat().st_mtime_ns, self.src.stat().st_mtime_ns)
+        with mock.patch.object(ops, "file_sha256", side_effect=AssertionError("rehashed")):
+            self.assertEqual(ops.place_file(self.src, dst, link=False)[0], "skipped")
+
+    def test_same_bytes_with_other_mtime_skips_after_hash(self):
+        dst = self.root / "dst.bin"
+        dst.write_bytes(self.src.read_bytes())
+        os.utime(dst, (1000, 1000))
+        self.assertEqual(ops.place_file(self.src, dst, link=False)[0], "skipped")
+        self.assertEqual(dst.stat().st_mtime_ns, self.src.stat().st_mtime_ns)
+
+    def test_changed_destination_is_replaced(self):
+        dst = self.root / "dst.bin"
+        dst.write_bytes(b"stale")
+        self.assertEqual(ops.place_file(self.src, dst)[0], "hardlink")
+        self.assertEqual(dst.read_bytes(), self.src.read_bytes())
+
+    def test_streamed_fallback_when_fast_paths_fail(self):
+        dst = self.root / "dst.bin"
+        with mock.patch.object(ops, "_reflink", return_value=False), mock.patch.object(ops, "_copy_file_range", return_value=False):
+            self.assertEqual(ops.place_file(self.src, dst, link=False), ("copy", 5000))
+        self.assertEqual(dst.read_bytes(), self.src.read_bytes())
+
+
+class TestPackagePlacement(unittest.TestCase):
+    def test_package_links_media_and_copies_subtitles(self):
+        with tempfile.TemporaryDirectory() as td:
+            runtime = Path(td)
+            task = {"task_id": "task_0000test", "course_id": "demo", "status": "running", "lesson_keys": ["01"]}
+            lesson = runtime / task["task_id"] / "artifacts" / "01"
+            lesson.mkdir(parents=True)
+            (lesson / "media.mp4").write_bytes(b"v" * 4096)
+            (lesson / "sub_en.srt").write_text("1\n00:00:00,000 --> 00:00:01,000\nHi\n", encoding="utf-8")
+
+            payload = ops.execute_step_package(task, runtime)
+            placed = runtime / task["task_id"] / "package" / "lessons" / "01"
+            self.assertEqual((placed / "media.mp4").stat().st_ino, (lesson / "media.mp4").stat().st_ino)
+            self.assertNotEqual((placed / "sub_en.srt").stat().st_ino, (lesson / "sub_en.srt").stat().st_ino)
+            self.assertEqual(payload["placement"]["bytes_linked"], 4096)
+            self.assertEqual(payload["placement"]["files"]["hardlink"], 1)
+            self.assertEqual((placed / "sub_en.vtt").read_text(encoding="utf-8"), "WEBVTT\n\n00:00:00.000 --> 00:00:01.000\nHi\n")
+
+            again = ops.execute_step_package(task, runtime)
+            self.assertEqual(again["placement"]["files"], {"skipped": 2})
+            self.assertEqual(again["placement"]["bytes_copied"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Import project script functions directly for unit checks.
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import course_pipeline_ops as ops  # noqa: E402
+from task_fixtures import make_task  # noqa: E402
+
+
+class TestStepMetrics(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        root = Path(self._td.name)
+        self.raw = root / "raw"
+        self.raw.mkdir()
+        self.runtime = ops.project_runtime_dir(root)
+        self._env = mock.patch.dict(os.environ, {"COURSE_PIPELINE_TASK_STORE": "sqlite"})
+        self._env.start()
+
+    def tearDown(self):
+        self._env.stop()
+        self._td.cleanup()
+
+    def _seed(self, task_id: str) -> None:
+        ops.save_task(self.runtime, make_task(
+                task_id,
+                steps=dict(ffmpeg="done", asr="done", align="done", translate="done"),
+                lesson_keys=["01", "02"],
+                course_path=str(self.raw),
+            ))
+        work_dir = self.runtime / task_id / "hitl"
+        work_dir.mkdir(parents=True)
+        for key in ["01", "02"]:
+            sentences = [{"sentence_id": f"{key}-0001", "en": "Where is the station?", "zh": "车站在哪里？", "ipa": "/x/"}]
+            (work_dir / f"{key}_translate_effective.json").write_text(
+                json.dumps({"lesson_id": key, "sentences": sentences}, ensure_ascii=False), encoding="utf-8"
+            )
+
+    def test_step_output_records_step_and_lesson_metrics(self):
+        self._seed("task_0000met1")
+        code, payload = ops._run_single_step(self.runtime, "task_0000met1", "grammar")
+        self.assertEqual(code, 0)
+        output = json.loads(Path(payload["output_file"]).read_text(encoding="utf-8"))
+        metrics = output["metrics"]
+        for field in ["wall_ms", "cpu_ms", "child_cpu_ms", "bytes_in", "bytes_out", "network", "process_high_water"]:
+            self.assertIn(field, metrics)
+        self.assertEqual(metrics["steps_in_flight"], 1)
+        lessons = output["payload"]["lessons"]
+        self.assertEqual([l["lesson_id"] for l in lessons], ["01", "02"])
+        self.assertFalse(any("rss" in field for l in lessons for field in l["metrics"]))
+        self.assertTrue(all(l["metrics"]["bytes_in"] > 0 and l["metrics"]["bytes_out"] > 0 for l in lessons))
+        self.assertEqual(metrics["bytes_out"], sum(l["metrics"]["bytes_out"] for l in lessons))
+
+    def test_steps_in_flight_keeps_the_peak_each_step_saw(self):
+        counter = ops.StepsInFlight()
+        first = counter.enter()
+        second = counter.enter()
+        self.assertEqual(counter.leave(second), 2)
+        third = counter.enter()
+        self.assertEqual(counter.leave(first), 2)
+        self.assertEqual(counter.leave(third), 2)
+        self.assertEqual(counter.leave(counter.enter()), 1)
+
+    def test_network_counter_deltas(self):
+        mark = ops.NETWORK.mark()
+        for latency in [0.010, 0.020, 0.030, 0.200]:
+            ops.NETWORK.record(latency)
+        ops.NETWORK.record(0.5, ok=False)
+        delta = ops.NETWORK.since(mark)
+        self.assertEqual(delta["requests"], 5)
+        self.assertEqual(delta["errors"], 1)
+        self.assertEqual(delta["latency_ms_p50"], 30.0)
+        self.assertEqual(delta["latency_ms_max"], 500.0)
+
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(ops.percentile(values, 50), 50.0)
+        self.assertEqual(ops.percentile(values, 99), 99.0)
+        self.assertEqual(ops.percentile([], 90), 0.0)
+
+    def test_stats_aggregate_across_tasks(self):
+        for task_id in ["task_0000met1", "task_0000met2"]:
+            self._seed(task_id)
+            ops._run_single_step(self.runtime, task_id, "grammar")
+        stats = ops.aggregate_step_stats(self.runtime, ops.list_tasks(self.runtime))
+        self.assertEqual(list(stats), ["grammar"])
+        self.assertEqual(stats["grammar"]["runs"], 2)
+        self.assertEqual(stats["grammar"]["lessons"]["wall_ms"]["count"], 4)
+        self.assertEqual(list(stats["grammar"]["wall_ms"]), ["count", "mean", "p50", "p90", "p99", "max", "total"])
+        self.assertEqual(ops.distribution([1.0, 2.0, 6.0])["mean"], 3.0)
+        self.assertGreater(stats["grammar"]["bytes_in"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+# Import project script functions directly for unit checks.
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import course_pipeline_ops as ops  # noqa: E402
+
+CUES = [
+    {"start_ms": 0, "end_ms": 1500, "text": "Hello."},
+    {"start_ms": 3_601_002, "end_ms": 3_605_999, "text": "Fish & chips <b>now</b>"},
+]
+
+
+class TestSubtitleIo(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        self.root = Path(self._td.name)
+
+    def tearDown(self):
+        self._td.cleanup()
+
+    def test_writer_keeps_srt_layout(self):
+        path = self.root / "a.srt"
+        self.assertEqual(ops.write_srt(path, iter(CUES)), 2)
+        self.assertEqual(
+            path.read_text(encoding="utf-8"),
+            "1\n00:00:00,000 --> 00:00:01,500\nHello.\n\n2\n01:00:01,002 --> 01:00:05,999\nFish & chips <b>now</b>\n",
+        )
+        self.assertEqual(ops.parse_srt(path), CUES)
+
+    def test_parser_tolerates_bom_crlf_dot_separators_and_missing_indices(self):
+        path = self.root / "b.srt"
+        content = "﻿1\r\n00:00:01.000 --> 00:00:02.000\r\nFirst\r\nline\r\n\r\n\r\n0:00:03,000-->0:00:04,250\r\nSecond\r\n\r\nnot a cue\r\n"
+        path.write_bytes(content.encode("utf-8"))
+        self.assertEqual(
+            ops.parse_srt(path),
+            [
+                {"start_ms": 1000, "end_ms": 2000, "text": "First line"},
+                {"start_ms": 3000, "end_ms": 4250, "text": "Second"},
+            ],
+        )
+        self.assertEqual(ops.parse_srt(self.root / "missing.srt"), [])
+
+    def test_parser_yields_before_reading_everything(self):
+        consumed = []
+
+        def lines():
+            for line in ["1", "00:00:00,000 --> 00:00:01,000", "One", "", "2", "00:00:01,000 --> 00:00:02,000", "Two", ""]:
+                consumed.append(line)
+                yield line
+
+        cues = ops.iter_srt_cues(lines())
+        self.assertEqual(next(cues)["text"], "One")
+        self.assertEqual(len(consumed), 4)
+
+    def test_vtt_output(self):
+        path = self.root / "c.vtt"
+        ops.write_vtt(path, CUES)
+        self.assertEqual(
+            path.read_text(encoding="utf-8"),
+            "WEBVTT\n\n00:00:00.000 --> 00:00:01.500\nHello.\n\n01:00:01.002 --> 01:00:05.999\nFish &amp; chips &lt;b>now&lt;/b>\n",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
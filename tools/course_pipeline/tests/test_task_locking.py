@@ -0,0 +1,130 @@
+import fcntl
+import json
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Import project script functions directly for unit checks.
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import course_pipeline_ops as ops  # noqa: E402
+from task_fixtures import make_task  # noqa: E402
+
+WORKERS = 6
+UPDATES_PER_WORKER = 25
+
+
+def hammer(runtime: str, backend: str, worker: int) -> None:
+    os.environ["COURSE_PIPELINE_TASK_STORE"] = backend
+    for i in range(UPDATES_PER_WORKER):
+        ops.update_task(Path(runtime), "task_0000lock", lambda t: t["lesson_keys"].append(f"{worker}-{i}"))
+
+
+class TestTaskLocking(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        self.runtime = Path(self._td.name)
+        self._env = mock.patch.dict(os.environ, {"COURSE_PIPELINE_TASK_STORE": "sqlite", "COURSE_PIPELINE_TASK_JSON_MIRROR": "1"})
+        self._env.start()
+
+    def tearDown(self):
+        self._env.stop()
+        self._td.cleanup()
+
+    def _assert_no_lost_updates(self, backend: str, shared_fs: bool = False) -> None:
+        env = {"COURSE_PIPELINE_TASK_STORE": backend, "COURSE_PIPELINE_SHARED_FS": "1" if shared_fs else "0"}
+        with mock.patch.dict(os.environ, env):
+            ops.save_task(self.runtime, make_task("task_0000lock", lesson_keys=[]))
+            ctx = multiprocessing.get_context("spawn")
+            procs = [ctx.Process(target=hammer, args=(str(self.runtime), backend, w)) for w in range(WORKERS)]
+            for p in procs:
+                p.start()
+            for p in procs:
+                p.join(60)
+                self.assertEqual(p.exitcode, 0)
+
+            task = ops.load_task(self.runtime, "task_0000lock")
+            expected = {f"{w}-{i}" for w in range(WORKERS) for i in range(UPDATES_PER_WORKER)}
+            self.assertEqual(len(task["lesson_keys"]), len(expected))
+            self.assertEqual(set(task["lesson_keys"]), expected)
+            self.assertEqual(task["version"], 1 + WORKERS * UPDATES_PER_WORKER)
+            mirror = json.loads(ops.task_file(self.runtime, "task_0000lock").read_text(encoding="utf-8"))
+            self.assertEqual(mirror, task)
+        self.assertEqual([p.name for p in self.runtime.glob(".*.tmp")], [])
+
+    def test_concurrent_processes_lose_nothing_sqlite(self):
+        self._assert_no_lost_updates("sqlite")
+
+    def test_concurrent_processes_lose_nothing_json(self):
+        self._assert_no_lost_updates("json")
+
+    def test_concurrent_processes_lose_nothing_on_shared_fs_sqlite(self):
+        self._assert_no_lost_updates("sqlite", shared_fs=True)
+        conn = sqlite3.connect(str(ops.task_store_path(self.runtime)))
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "delete")
+        conn.close()
+
+    def test_concurrent_processes_lose_nothing_on_shared_fs_json(self):
+        self._assert_no_lost_updates("json", shared_fs=True)
+
+    def test_shared_fs_locks_with_lockf(self):
+        ops.save_task(self.runtime, make_task("task_0000lock", lesson_keys=[]))
+        with mock.patch.dict(os.environ, {"COURSE_PIPELINE_SHARED_FS": "1"}):
+            with mock.patch.object(fcntl, "flock", side_effect=AssertionError("flock used on a shared filesystem")):
+                with mock.patch.object(fcntl, "lockf", wraps=fcntl.lockf) as lockf:
+                    ops.update_task(self.runtime, "task_0000lock", lambda t: t["lesson_keys"].append("a"))
+        self.assertEqual([c.args[1] for c in lockf.call_args_list], [fcntl.LOCK_EX, fcntl.LOCK_UN])
+
+    def test_concurrent_threads_lose_nothing(self):
+        ops.save_task(self.runtime, make_task("task_0000lock", lesson_keys=[]))
+        threads = [
+            threading.Thread(
+                target=lambda w=w: [
+                    ops.update_task(self.runtime, "task_0000lock", lambda t, i=i: t["lesson_keys"].append(f"{w}-{i}"))
+                    for i in range(UPDATES_PER_WORKER)
+                ]
+            )
+            for w in range(WORKERS)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        task = ops.load_task(self.runtime, "task_0000lock")
+        self.assertEqual(len(set(task["lesson_keys"])), WORKERS * UPDATES_PER_WORKER)
+
+    def test_stale_save_is_rejected(self):
+        ops.save_task(self.runtime, make_task("task_0000lock", lesson_keys=[]))
+        first = ops.load_task(self.runtime, "task_0000lock")
+        second = ops.load_task(self.runtime, "task_0000lock")
+        first["status"] = "paused"
+        ops.save_task(self.runtime, first)
+        second["status"] = "ready"
+        with self.assertRaises(ops.TaskConflictError):
+            ops.save_task(self.runtime, second)
+        self.assertEqual(ops.load_task(self.runtime, "task_0000lock")["status"], "paused")
+
+    def test_pause_during_step_survives_step_completion(self):
+        raw = self.runtime / "raw"
+        raw.mkdir()
+        task = make_task("task_0000lock", course_path=str(raw))
+        ops.save_task(self.runtime, task)
+
+        def pausing_step(step, task, runtime_dir, jobs=None, force=False):
+            ops.update_task(runtime_dir, task["task_id"], lambda t: t.update(status="paused"))
+            return {"lessons": []}
+
+        with mock.patch.object(ops, "execute_step_incremental", side_effect=pausing_step):
+            code, payload = ops._run_single_step(self.runtime, "task_0000lock", "ffmpeg")
+        self.assertEqual(code, 0)
+        self.assertEqual(payload["task"]["status"], "paused")
+        self.assertEqual(payload["task"]["steps"]["ffmpeg"], "done")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Import project script functions directly for unit checks.
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import course_pipeline_ops as ops  # noqa: E402
+from task_fixtures import make_task  # noqa: E402
+
+
+class TestTaskStore(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        self.runtime = Path(self._td.name) / "tasks"
+        self.runtime.mkdir()
+        self._env = mock.patch.dict(os.environ, {"COURSE_PIPELINE_TASK_STORE": "sqlite", "COURSE_PIPELINE_TASK_JSON_MIRROR": "1"})
+        self._env.start()
+
+    def tearDown(self):
+        self._env.stop()
+        self._td.cleanup()
+
+    def test_existing_json_tasks_are_migrated_on_first_open(self):
+        for task in [make_task("task_a"), make_task("task_b", status="ready")]:
+            ops.task_file(self.runtime, task["task_id"]).write_text(json.dumps(task), encoding="utf-8")
+        self.assertEqual([t["task_id"] for t in ops.list_tasks(self.runtime, status="ready")], ["task_b"])
+        self.assertTrue(ops.task_store_path(self.runtime).exists())
+
+    def test_save_mirrors_json_and_list_filters(self):
+        ops.save_task(self.runtime, make_task("task_a"))
+        ops.save_task(self.runtime, make_task("task_b", course_id="course_other"))
+        ops.save_task(self.runtime, make_task("task_c", status="failed"))
+        self.assertEqual([t["task_id"] for t in ops.list_tasks(self.runtime, status="processing")], ["task_a", "task_b"])
+        self.assertEqual([t["task_id"] for t in ops.list_tasks(self.runtime, course_id="course_other")], ["task_b"])
+        mirrored = json.loads(ops.task_file(self.runtime, "task_c").read_text(encoding="utf-8"))
+        self.assertEqual(mirrored["status"], "failed")
+
+    def test_store_is_authoritative_without_mirror(self):
+        with mock.patch.dict(os.environ, {"COURSE_PIPELINE_TASK_JSON_MIRROR": "0"}):
+            ops.save_task(self.runtime, make_task("task_a"))
+            self.assertFalse(ops.task_file(self.runtime, "task_a").exists())
+            self.assertEqual(ops.load_task(self.runtime, "task_a")["status"], "processing")
+            self.assertEqual(ops.export_task_json(self.runtime), ["task_a"])
+        self.assertTrue(ops.task_file(self.runtime, "task_a").exists())
+
+    def test_delete_removes_row_and_mirror(self):
+        ops.save_task(self.runtime, make_task("task_a"))
+        self.assertTrue(ops.delete_task(self.runtime, "task_a"))
+        self.assertFalse(ops.task_file(self.runtime, "task_a").exists())
+        with self.assertRaises(FileNotFoundError):
+            ops.load_task(self.runtime, "task_a")
+        self.assertFalse(ops.delete_task(self.runtime, "task_a"))
+
+    def test_migrate_only_replaces_older_rows(self):
+        ops.save_task(self.runtime, make_task("task_a"))
+        stale = make_task("task_a", status="failed")
+        ops.task_file(self.runtime, "task_a").write_text(json.dumps(stale), encoding="utf-8")
+        result = ops.migrate_task_json(self.runtime)
+        self.assertEqual(result["skipped"], ["task_a"])
+        self.assertEqual(ops.load_task(self.runtime, "task_a")["status"], "processing")
+
+    def test_json_backend_keeps_file_layout(self):
+        with mock.patch.dict(os.environ, {"COURSE_PIPELINE_TASK_STORE": "json"}):
+            ops.save_task(self.runtime, make_task("task_a"))
+            self.assertEqual([t["task_id"] for t in ops.list_tasks(self.runtime)], ["task_a"])
+        self.assertFalse(ops.task_store_path(self.runtime).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Import project script functions directly for unit checks.
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import course_pipeline_ops as ops  # noqa: E402
+from task_fixtures import make_task  # noqa: E402
+
+
+class TestTaskWatch(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        self.runtime = Path(self._td.name)
+        self._env = mock.patch.dict(os.environ, {"COURSE_PIPELINE_TASK_STORE": "sqlite", "COURSE_PIPELINE_EVENT_FLUSH_SECONDS": "0"})
+        self._env.start()
+
+    def tearDown(self):
+        self._env.stop()
+        self._td.cleanup()
+
+    def _change(self, task_id: str, event: str, mutate, delay: float = 0.2) -> None:
+        def run():
+            time.sleep(delay)
+            ops.update_task(self.runtime, task_id, mutate)
+            ops.append_event(self.runtime, task_id, event, {})
+
+        threading.Thread(target=run).start()
+
+    def _watch(self, task_ids, status=None, timeout=10):
+        changes = []
+        started = time.time()
+        # A long fallback interval: only events can wake the watch in time.
+        code, payload = ops.watch_tasks(self.runtime, task_ids, status, interval=30, timeout=timeout, emit=changes.append)
+        return code, payload, changes, time.time() - started
+
+    def test_event_wakes_watch_without_polling(self):
+        ops.save_task(self.runtime, make_task("task_0000000a"))
+        self._change("task_0000000a", "task.stop", lambda t: t.update(status="stopped"))
+        code, payload, changes, elapsed = self._watch(["task_0000000a"])
+        self.assertEqual(code, 0)
+        self.assertEqual(payload["final"]["status"], "stopped")
+        self.assertLess(elapsed, 3)
+        self.assertEqual([c["status"] for c in changes if "status" in c], ["processing", "stopped"])
+
+    def test_step_transitions_are_reported(self):
+        ops.save_task(self.runtime, make_task("task_0000000a"))
+
+        def advance(t):
+            t["steps"]["ffmpeg"] = "done"
+            t["steps"]["asr"] = "running"
+
+        self._change("task_0000000a", "task.run_step.start", advance)
+        self._change("task_0000000a", "task.stop", lambda t: t.update(status="stopped"), delay=0.5)
+        _, _, changes, _ = self._watch(["task_0000000a"])
+        steps = [(c["step"], c["from"], c["to"]) for c in changes if "step" in c]
+        self.assertIn(("ffmpeg", "pending", "done"), steps)
+        self.assertIn(("asr", "pending", "running"), steps)
+
+    def test_many_ids_end_when_all_terminal(self):
+        for task_id in ["task_0000000a", "task_0000000b"]:
+            ops.save_task(self.runtime, make_task(task_id))
+        self._change("task_0000000a", "task.stop", lambda t: t.update(status="stopped"))
+        self._change("task_0000000b", "task.stop", lambda t: t.update(status="failed"), delay=0.4)
+        code, payload, _, _ = self._watch(["task_0000000a", "task_0000000b"])
+        self.assertEqual(code, 0)
+        self.assertEqual([t["status"] for t in payload["final"]], ["stopped", "failed"])
+
+    def test_status_class_ends_when_empty(self):
+        for task_id in ["task_0000000a", "task_0000000b"]:
+            ops.save_task(self.runtime, make_task(task_id))
+        ops.save_task(self.runtime, make_task("task_0000000c", status="paused"))
+        self._change("task_0000000a", "task.ready", lambda t: t.update(status="ready"))
+        self._change("task_0000000b", "task.pause", lambda t: t.update(status="paused"), delay=0.4)
+        code, _, changes, elapsed = self._watch([], status="processing")
+        self.assertEqual(code, 0)
+        self.assertLess(elapsed, 3)
+        statuses = {(c["task_id"], c["status"]) for c in changes if "status" in c}
+        self.assertIn(("task_0000000a", "ready"), statuses)
+        self.assertIn(("task_0000000b", "paused"), statuses)
+        self.assertNotIn("task_0000000c", {c["task_id"] for c in changes})
+
+    def test_timeout(self):
+        ops.save_task(self.runtime, make_task("task_0000000a"))
+        code, payload, _, _ = self._watch(["task_0000000a"], timeout=1)
+        self.assertEqual(code, 3)
+        self.assertEqual(payload["error"]["code"], "WATCH_TIMEOUT")
+
+
+if __name__ == "__main__":
+    unittest.main()
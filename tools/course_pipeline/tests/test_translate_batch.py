@@ -0,0 +1,151 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Import project script functions directly for unit checks.
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+import course_pipeline_ops as ops  # noqa: E402
+from stub_servers import StubTranslateServer  # noqa: E402
+
+
+class TestBatchPacking(unittest.TestCase):
+    def test_batches_respect_char_and_item_limits(self):
+        texts = ["a" * 10, "b" * 10, "c" * 10, "d" * 30, "e"]
+        self.assertEqual(ops.pack_translation_batches(texts, 25, 10), [[0, 1], [2], [3], [4]])
+        self.assertEqual(ops.pack_translation_batches(texts, 1000, 2), [[0, 1], [2, 3], [4]])
+
+
+class TestBatchTranslation(unittest.TestCase):
+    def test_provider_must_implement_translate_batch(self):
+        class Incomplete(ops.TranslationProvider):
+            name = "incomplete"
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_batches_reuse_keepalive_connections(self):
+        texts = [f"Sentence number {i}." for i in range(40)] + ["[ASR pending] x", ""]
+        with StubTranslateServer(latency=0.01) as stub:
+            provider = ops.GoogleGtxProvider(endpoint=stub.endpoint)
+            try:
+                result = ops.translate_batch_en_to_zh(texts, provider, concurrency=2, max_chars=200, max_items=50)
+            finally:
+                provider.close()
+        self.assertEqual(result[:40], [f"译:Sentence number {i}." for i in range(40)])
+        self.assertEqual(result[40:], [None, None])
+        self.assertLess(stub.requests, 10)
+        self.assertLessEqual(stub.connections, 2)
+        self.assertEqual(provider.stats()["split_fallbacks"], 0)
+
+    def test_falls_back_per_sentence_when_lines_merge(self):
+        with StubTranslateServer(keep_newlines=False) as stub:
+            provider = ops.GoogleGtxProvider(endpoint=stub.endpoint)
+            try:
+                result = ops.translate_batch_en_to_zh(["One.", "Two."], provider, concurrency=1)
+            finally:
+                provider.close()
+        self.assertEqual(result, ["译:One.", "译:Two."])
+        self.assertEqual(stub.requests, 3)
+        self.assertEqual(provider.stats()["split_fallbacks"], 1)
+
+    def test_translate_step_uses_one_batch_for_the_course(self):
+        with tempfile.TemporaryDirectory() as td:
+            runtime = ops.project_runtime_dir(Path(td))
+            task = {"task_id": "task_tr000001", "lesson_keys": ["01", "02"]}
+            for key in task["lesson_keys"]:
+                lesson_dir = runtime / task["task_id"] / "artifacts" / key
+                lesson_dir.mkdir(parents=True)
+                ops.write_srt(
+                    lesson_dir / "sub_en.srt",
+                    [{"start_ms": i * 1000, "end_ms": i * 1000 + 900, "text": f"Line {key}-{i}"} for i in range(5)],
+                )
+            with StubTranslateServer() as stub:
+                env = {"COURSE_PIPELINE_TRANSLATE_ENDPOINT": stub.endpoint, "COURSE_PIPELINE_IPA_OFFLINE": "1"}
+                with mock.patch.dict(os.environ, env):
+                    payload = ops.execute_step_translate(task, runtime)
+            self.assertEqual(stub.requests, 1)
+            self.assertEqual(payload["translation"]["sentences"], 10)
+            effective = json.loads(Path(payload["lessons"][1]["output_file"]).read_text(encoding="utf-8"))
+            self.assertEqual(effective["source"], "ai_online")
+            self.assertEqual(effective["sentences"][4]["zh"], "译:Line 02-4")
+
+
+class TestTranslationMemory(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        self.runtime = ops.project_runtime_dir(Path(self._td.name))
+
+    def tearDown(self):
+        self._td.cleanup()
+
+    def _task(self, task_id: str, lines: list[str]) -> dict:
+        lesson_dir = self.runtime / task_id / "artifacts" / "01"
+        lesson_dir.mkdir(parents=True)
+        ops.write_srt(
+            lesson_dir / "sub_en.srt",
+            [{"start_ms": i * 1000, "end_ms": i * 1000 + 900, "text": t} for i, t in enumerate(lines)],
+        )
+        return {"task_id": task_id, "lesson_keys": ["01"]}
+
+    def _run(self, task: dict) -> tuple[dict, list[dict], int]:
+        with StubTranslateServer() as stub:
+            env = {"COURSE_PIPELINE_TRANSLATE_ENDPOINT": stub.endpoint, "COURSE_PIPELINE_IPA_OFFLINE": "1"}
+            with mock.patch.dict(os.environ, env):
+                payload = ops.execute_step_translate(task, self.runtime)
+        effective = json.loads(Path(payload["lessons"][0]["output_file"]).read_text(encoding="utf-8"))
+        return payload, effective["sentences"], stub.requests
+
+    def test_repeated_sentences_are_served_from_memory(self):
+        self._run(self._task("task_tm000001", ["Good morning, class.", "Open your books."]))
+        payload, sentences, requests = self._run(
+            self._task("task_tm000002", ["good  morning, class.", "Open your books.", "A new line."])
+        )
+        self.assertEqual(requests, 1)
+        self.assertEqual([s["source"] for s in sentences], ["tm_exact", "tm_exact", "machine"])
+        self.assertEqual(sentences[0]["zh"], "译:Good morning, class.")
+        self.assertEqual(payload["translation_memory"]["hits"], 2)
+        self.assertAlmostEqual(payload["translation_memory"]["hit_rate"], 2 / 3, places=3)
+
+    def test_hitl_override_outranks_machine_output(self):
+        task = self._task("task_tm000003", ["Open your books."])
+        self._run(task)
+        override = {"sentences": [{"sentence_id": "01-0001", "en": "Open your books.", "zh": "请打开书。"}]}
+        (self.runtime / task["task_id"] / "hitl" / "01_translate_output.json").write_text(
+            json.dumps(override, ensure_ascii=False), encoding="utf-8"
+        )
+        payload, _, _ = self._run(task)
+        self.assertEqual(payload["translation_memory"]["recorded_hitl"], 1)
+
+        conn = ops.open_translation_memory(ops.translation_memory_path(self.runtime))
+        ops.tm_record(conn, [("Open your books.", "机器翻译")], "machine")
+        self.assertEqual(ops.tm_lookup(conn, ["open your books."]), {"open your books.": "请打开书。"})
+        conn.close()
+
+        _, sentences, requests = self._run(self._task("task_tm000004", ["Open your books."]))
+        self.assertEqual(requests, 0)
+        self.assertEqual(sentences[0]["zh"], "请打开书。")
+
+    def test_only_rows_a_reviewer_changed_are_recorded_as_hitl(self):
+        task = self._task("task_tm000005", ["Sit down.", "Stand up."])
+        _, sentences, _ = self._run(task)
+        # The reviewer copies the effective output and edits only the second line.
+        rows = [dict(sentences[0]), {**sentences[1], "zh": "起立。"}]
+        (self.runtime / task["task_id"] / "hitl" / "01_translate_output.json").write_text(
+            json.dumps({"sentences": rows}, ensure_ascii=False), encoding="utf-8"
+        )
+        payload, _, _ = self._run(task)
+        self.assertEqual(payload["translation_memory"]["recorded_hitl"], 1)
+
+        conn = ops.open_translation_memory(ops.translation_memory_path(self.runtime))
+        ops.tm_record(conn, [("Sit down.", "请坐。")], "machine")
+        self.assertEqual(ops.tm_lookup(conn, ["sit down.", "stand up."]), {"sit down.": "请坐。", "stand up.": "起立。"})
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Import project script functions directly for unit checks.
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import course_pipeline_ops as ops  # noqa: E402
+from task_fixtures import make_task  # noqa: E402
+from test_ffmpeg_step import install_fake_ffmpeg  # noqa: E402
+
+
+class FakeSteps:
+    """Stands in for execute_step_incremental and records per-class concurrency."""
+
+    def __init__(self, delay: float = 0.05, fail: set | None = None):
+        self.delay = delay
+        self.fail = fail or set()
+        self.lock = threading.Lock()
+        self.running = {cls: 0 for cls in set(ops.STEP_RESOURCE_CLASS.values())}
+        self.peak = dict(self.running)
+        self.calls = []
+
+    def __call__(self, step, task, runtime_dir, jobs=None, force=False):
+        cls = ops.STEP_RESOURCE_CLASS[step]
+        with self.lock:
+            self.running[cls] += 1
+            self.peak[cls] = max(self.peak[cls], self.running[cls])
+            self.calls.append((task["task_id"], step))
+        time.sleep(self.delay)
+        with self.lock:
+            self.running[cls] -= 1
+        if (task["task_id"], step) in self.fail:
+            raise RuntimeError(f"STEP_FAILED:{step}")
+        return {"lessons": []}
+
+
+class TestWorker(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        self.runtime = Path(self._td.name)
+        self._env = mock.patch.dict(os.environ, {"COURSE_PIPELINE_TASK_STORE": "sqlite"})
+        self._env.start()
+
+    def tearDown(self):
+        self._env.stop()
+        self._td.cleanup()
+
+    def _run(self, fake: FakeSteps, **kwargs) -> dict:
+        limits = {"cpu": 2, "network": 1, "io": 1}
+        with mock.patch.object(ops, "execute_step_incremental", side_effect=fake):
+            return ops.run_worker(self.runtime, limits, interval=0.01, once=True, **kwargs)
+
+    def test_drains_tasks_to_hitl_within_class_limits(self):
+        for i in range(5):
+            ops.save_task(self.runtime, make_task(f"task_{i:08d}"))
+        fake = FakeSteps()
+        summary = self._run(fake)
+        self.assertEqual(len(summary["executed"]), 5 * 3)
+        self.assertEqual(fake.peak["cpu"], 2)
+        self.assertLessEqual(fake.peak["io"], 1)
+        for i in range(5):
+            task = ops.load_task(self.runtime, f"task_{i:08d}")
+            self.assertEqual(task["current_step"], "translate")
+            self.assertEqual(task["status"], "processing")
+
+    def test_returns_with_events_written_and_flusher_stopped(self):
+        ops.save_task(self.runtime, make_task("task_00000001"))
+        with mock.patch.dict(os.environ, {"COURSE_PIPELINE_EVENT_FLUSH_SECONDS": "30"}):
+            self._run(FakeSteps(delay=0))
+        self.assertEqual([t for t in threading.enumerate() if t.name == "event-log"], [])
+        written = ops.events_file(self.runtime).read_text(encoding="utf-8")
+        self.assertEqual(written.count('"task.run_step.done"'), 3)
+
+    def test_hitl_mode_runs_to_ready(self):
+        ops.save_task(self.runtime, make_task("task_00000001"))
+        fake = FakeSteps(delay=0)
+        self._run(fake, include_hitl=True)
+        self.assertEqual(ops.load_task(self.runtime, "task_00000001")["status"], "ready")
+        self.assertEqual([step for _, step in fake.calls], ops.STEP_ORDER)
+
+    def test_paused_and_uploaded_tasks_are_left_alone(self):
+        ops.save_task(self.runtime, make_task("task_00000001", status="paused"))
+        ops.save_task(self.runtime, make_task("task_00000002", status="uploaded"))
+        fake = FakeSteps(delay=0)
+        summary = self._run(fake)
+        self.assertEqual(summary["executed"], [])
+        self.assertEqual(fake.calls, [])
+
+    def test_failed_step_is_reported_and_task_stops(self):
+        ops.save_task(self.runtime, make_task("task_00000001"))
+        fake = FakeSteps(delay=0, fail={("task_00000001", "asr")})
+        summary = self._run(fake)
+        self.assertEqual([f["step"] for f in summary["failed"]], ["asr"])
+        self.assertEqual(ops.load_task(self.runtime, "task_00000001")["status"], "failed")
+
+    def test_stop_lets_in_flight_steps_finish(self):
+        ops.save_task(self.runtime, make_task("task_00000001"))
+        stop = threading.Event()
+        fake = FakeSteps(delay=0.2)
+        limits = {"cpu": 1, "network": 1, "io": 1}
+        with mock.patch.object(ops, "execute_step_incremental", side_effect=fake):
+            timer = threading.Timer(0.05, stop.set)
+            timer.start()
+            summary = ops.run_worker(self.runtime, limits, interval=0.01, stop=stop)
+        self.assertEqual([e["step"] for e in summary["executed"]], ["ffmpeg"])
+        task = ops.load_task(self.runtime, "task_00000001")
+        self.assertEqual(task["steps"]["ffmpeg"], "done")
+        self.assertEqual(task["steps"]["asr"], "pending")
+
+    def test_cpu_steps_with_process_pools_run_side_by_side(self):
+        root = Path(self._td.name)
+        install_fake_ffmpeg(root / "bin")
+        for task_id in ["task_00000001", "task_00000002"]:
+            raw = root / "raw" / task_id
+            raw.mkdir(parents=True)
+            for key in ["01", "02"]:
+                (raw / f"{key}_lesson.mp4").write_bytes(b"x")
+                (raw / f"{key}.en.srt").write_text("1\n00:00:00,000 --> 00:00:01,000\nHello.\n", encoding="utf-8")
+            ops.save_task(self.runtime, make_task(task_id, lesson_keys=["01", "02"], course_path=str(raw)))
+
+        real_step = ops.execute_step_incremental
+        lock = threading.Lock()
+        running = {"cpu": 0, "peak": 0}
+
+        def tracked(step, task, runtime_dir, jobs=None, force=False):
+            cpu = ops.STEP_RESOURCE_CLASS[step] == "cpu"
+            with lock:
+                running["cpu"] += cpu
+                running["peak"] = max(running["peak"], running["cpu"])
+            try:
+                return real_step(step, task, runtime_dir, jobs=jobs, force=force)
+            finally:
+                with lock:
+                    running["cpu"] -= cpu
+
+        result = {}
+        env = {"PATH": f"{root / 'bin'}{os.pathsep}{os.environ.get('PATH', '')}"}
+        with mock.patch.dict(os.environ, env), mock.patch.object(ops, "execute_step_incremental", side_effect=tracked):
+            limits = {"cpu": 2, "network": 1, "io": 1}
+            worker = threading.Thread(
+                target=lambda: result.update(ops.run_worker(self.runtime, limits, jobs=2, interval=0.01, once=True))
+            )
+            worker.start()
+            worker.join(timeout=60)
+        self.assertFalse(worker.is_alive(), "worker hung with process pools on worker threads")
+        self.assertEqual(result["failed"], [])
+        self.assertEqual(running["peak"], 2)
+        for task_id in ["task_00000001", "task_00000002"]:
+            task = ops.load_task(self.runtime, task_id)
+            self.assertEqual([task["steps"][s] for s in ["ffmpeg", "asr", "align"]], ["done"] * 3)
+
+    def test_class_limits_from_env(self):
+        with mock.patch.dict(os.environ, {"COURSE_PIPELINE_WORKER_NETWORK_SLOTS": "7"}):
+            limits = ops.worker_class_limits({"cpu": 3, "network": None, "io": None})
+        self.assertEqual(limits["cpu"], 3)
+        self.assertEqual(limits["network"], 7)
+
+
+if __name__ == "__main__":
+    unittest.main()